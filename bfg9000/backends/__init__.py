@@ -1,6 +1,7 @@
+import os
 from collections import OrderedDict
-from pkg_resources import iter_entry_points, DistributionNotFound
 
+from ..entry_points import iter_entry_points
 from ..objutils import memoize
 
 
@@ -11,15 +12,44 @@ def list_backends():
         try:
             backend = i.load()
             backends.append((i.name, backend))
-        # An ImportError can be thrown by the MSBuild backend when bfg9000 was
-        # installed as a Wheel with setuptools < 34.0.2. We'd require 34.0.2 or
-        # better, but setuptools < 11.0 won't let you upgrade setuptools during
-        # bfg's installation. Since Ubuntu 14.04 is supported until 2019 and
-        # has setuptools 2.2 by default, we're stuck with this for a while.
-        except (DistributionNotFound, ImportError):  # pragma: no cover
+        # An ImportError can be thrown by the MSBuild backend when its optional
+        # dependencies (e.g. lxml) aren't installed.
+        except ImportError:  # pragma: no cover
             pass
 
-    def sort_key(x):
-        return x[1].priority if x[1].version() else 0
-    backends.sort(key=sort_key, reverse=True)
+    # Don't check the backends' versions here; doing so would require running
+    # every build tool, even though we only need one of them.
+    backends.sort(key=lambda x: x[1].priority, reverse=True)
     return OrderedDict(backends)
+
+
+def program_identity(backend, env=os.environ):
+    try:
+        program = backend.command(env)[0]
+        stat = os.stat(program)
+    except OSError:
+        return None
+    return [program, stat.st_size, stat.st_mtime_ns]
+
+
+def check_version(backend, env=os.environ, cached=None):
+    # Only re-run the backend's version check if its program has changed since
+    # the last time we looked; `cached` is a (version, identity) pair.
+    identity = program_identity(backend, env)
+    if cached and identity is not None and identity == cached[1]:
+        return cached
+    return backend.version(env), identity
+
+
+def choose_backend(name=None, env=os.environ):
+    # If no backend was requested, use the highest-priority one that's actually
+    # installed, falling back to the highest-priority one overall if none are.
+    # Returns the backend's name and its (version, identity) pair.
+    backends = list_backends()
+    if name is None:
+        for k, v in backends.items():
+            result = check_version(v, env)
+            if result[0]:
+                return k, result
+        name = next(iter(backends))
+    return name, check_version(backends[name], env)
@@ -359,6 +359,10 @@ class Makefile:
         if isinstance(rule.recipe, Entity):
             out.write_literal(' ; ')
             out.write_shell(rule.recipe)
+        elif rule.recipe == []:
+            # An empty recipe, which (unlike no recipe at all) makes Make check
+            # whether the target was changed by updating its dependencies.
+            out.write_literal(' ;')
         elif rule.recipe is not None:
             for cmd in rule.recipe:
                 out.write_literal('\n\t')
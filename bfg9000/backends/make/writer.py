@@ -2,15 +2,21 @@ import os
 import re
 
 from ... import path
+from ... import profiler
 from ... import shell
 from .syntax import *
 from ...iterutils import listify, uniques
 from ...versioning import Version
 
 
+def command(env=os.environ):
+    return shell.which(env.get('MAKE', ['make', 'gmake']), env,
+                       resolve=True)
+
+
 def version(env=os.environ):
     try:
-        make = shell.which(env.get('MAKE', ['make', 'gmake']), env)
+        make = command(env)
         output = shell.execute(make + ['--version'], stdout=shell.Mode.pipe,
                                stderr=shell.Mode.devnull)
         m = re.match(r'GNU Make ([\d\.]+)', output)
@@ -23,6 +29,9 @@ def version(env=os.environ):
 
 priority = 2
 filepath = path.Path('Makefile')
+# Updated every time the Makefile is regenerated, even if its contents (and so
+# its modification time) stay the same.
+stamppath = filepath.addext('.stamp')
 
 _rule_handlers = {}
 _pre_rules = []
@@ -55,13 +64,17 @@ def write(env, build_inputs):
     buildfile.variable(path_vars[path.Root.srcdir], env.srcdir, Section.path)
 
     for i in _pre_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'rule'):
+            i(build_inputs, buildfile, env)
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, buildfile, env)
+        with profiler.span(type(e).__name__, 'rule'):
+            _rule_handlers[type(e)](e, build_inputs, buildfile, env)
     for i in _post_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'rule'):
+            i(build_inputs, buildfile, env)
 
-    with open(filepath.string(env.base_dirs), 'w') as out:
+    with path.write_if_changed(filepath.string(env.base_dirs)) as out, \
+         profiler.span('write', 'backend'):  # noqa
         buildfile.write(out)
 
 
@@ -2,15 +2,21 @@ import os
 import re
 
 from ... import path
+from ... import profiler
 from ... import shell
 from .solution import Solution, UuidMap
 from .syntax import *  # noqa
 from ...versioning import Version
 
 
+def command(env=os.environ):
+    return shell.which(env.get('MSBUILD', ['msbuild', 'xbuild']), env,
+                       resolve=True)
+
+
 def version(env=os.environ):
     try:
-        msbuild = shell.which(env.get('MSBUILD', ['msbuild', 'xbuild']), env)
+        msbuild = command(env)
         output = shell.execute(msbuild + ['/version'], stdout=shell.Mode.pipe,
                                stderr=shell.Mode.devnull)
         m = re.search(r'([\d\.]+)$', output)
@@ -39,16 +45,20 @@ def write(env, build_inputs):
     solution = Solution(uuids)
 
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, solution, env)
+        with profiler.span(type(e).__name__, 'rule'):
+            _rule_handlers[type(e)](e, build_inputs, solution, env)
 
     # XXX: Handle default builds. Default builds go first in the solution. This
     # also means we'd need to support aliases so that we can have multiple
     # builds be the default.
     sln_file = path.Path(build_inputs['project'].name + '.sln')
-    with open(sln_file.string(env.base_dirs), 'w') as out:
-        solution.write(out)
-    for p in solution:
-        path.makedirs(p.path.parent().string(env.base_dirs), exist_ok=True)
-        with open(p.path.string(env.base_dirs), 'wb') as out:
-            p.write(out)
-    uuids.save()
+    with profiler.span('write', 'backend'):
+        with path.write_if_changed(sln_file.string(env.base_dirs)) as out:
+            solution.write(out)
+        for p in solution:
+            path.makedirs(p.path.parent().string(env.base_dirs),
+                          exist_ok=True)
+            with path.write_if_changed(p.path.string(env.base_dirs),
+                                       'wb') as out:
+                p.write(out)
+        uuids.save()
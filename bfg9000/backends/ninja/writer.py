@@ -2,14 +2,20 @@ import os
 
 from ... import iterutils
 from ... import path
+from ... import profiler
 from ... import shell
 from .syntax import *
 from ...versioning import SpecifierSet, Version
 
 
+def command(env=os.environ):
+    return shell.which(env.get('NINJA', ['ninja', 'ninja-build']), env,
+                       resolve=True)
+
+
 def version(env=os.environ):
     try:
-        ninja = shell.which(env.get('NINJA', ['ninja', 'ninja-build']), env)
+        ninja = command(env)
         output = shell.execute(ninja + ['--version'], stdout=shell.Mode.pipe,
                                stderr=shell.Mode.devnull)
         return Version(output.strip())
@@ -49,13 +55,17 @@ def write(env, build_inputs):
     buildfile.variable(path_vars[path.Root.srcdir], env.srcdir, Section.path)
 
     for i in _pre_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'rule'):
+            i(build_inputs, buildfile, env)
     for e in build_inputs.edges():
-        _rule_handlers[type(e)](e, build_inputs, buildfile, env)
+        with profiler.span(type(e).__name__, 'rule'):
+            _rule_handlers[type(e)](e, build_inputs, buildfile, env)
     for i in _post_rules:
-        i(build_inputs, buildfile, env)
+        with profiler.span(i.__name__, 'rule'):
+            i(build_inputs, buildfile, env)
 
-    with open(filepath.string(env.base_dirs), 'w') as out:
+    with path.write_if_changed(filepath.string(env.base_dirs)) as out, \
+         profiler.span('write', 'backend'):  # noqa
         buildfile.write(out)
 
 
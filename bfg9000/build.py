@@ -1,15 +1,26 @@
 import errno
+import gc
+import io
+import multiprocessing
+import os
 from itertools import chain
 
+from . import log, profiler
 from .arguments.parser import ArgumentParser
 from .builtins import builtin, init as builtin_init
-from .build_inputs import BuildInputs
+from .build_inputs import BuildInputs, Edge
+from .cache import CodeCache
+from .file_types import DualUseLibrary, Node
 from .path import exists, Path, pushd, Root
 from .iterutils import listify
+from .languages import known_langs
+from .options import Option, option_list
+from .snapshot import KnownObjects, Snapshot
 from .tools import init as tools_init
 
 bfgfile = 'build.bfg'
 optsfile = 'options.bfg'
+code_cache_name = '.bfg_code_cache'
 
 user_description = """
 These arguments are defined by the options.bfg file in the project's source
@@ -27,8 +38,17 @@ def _execute_script(f, context, path, run_post=False):
     filename = path.realize({Root.srcdir: None, Root.builddir: builddir})
 
     with pushd(path.parent().string(context.env.base_dirs)), \
-         context.push_path(path) as p:  # noqa
-        code = compile(f.read(), filename, 'exec')
+         context.push_path(path) as p, \
+         profiler.span(filename, 'script'):  # noqa
+        # Only cache scripts in real build directories; we might just be
+        # showing help, where the "build directory" is wherever we happen to
+        # be.
+        if builddir and os.path.exists(os.path.join(builddir,
+                                                    context.env.envfile)):
+            cache = CodeCache(os.path.join(builddir, code_cache_name))
+            code = cache.compile(f.read(), filename)
+        else:
+            code = compile(f.read(), filename, 'exec')
         try:
             exec(code, context.builtins)
         except SystemExit:
@@ -44,6 +64,97 @@ def execute_file(context, path, run_post=False):
         return _execute_script(f, context, path, run_post)
 
 
+# The state shared with worker processes forked by `execute_files`.
+_worker_state = None
+
+# The types of the objects in the build that a worker process can't change
+# without the parent executing its submodules again itself. Only additions to
+# the build's containers can be merged back in.
+_watched_types = (Node, Edge, DualUseLibrary, Option, option_list)
+
+
+def _execute_worker(chunk):
+    context, chunks, known, snapshot = _worker_state
+    # Hold onto our log output so the parent can show it in order.
+    output = io.StringIO()
+    try:
+        with log.redirect(output):
+            exports = [execute_file(context, i).exports for i in chunks[chunk]]
+        return output.getvalue(), known.dumps((exports, snapshot.changes()))
+    except Exception:
+        # Let the parent process execute these files itself, so that any
+        # errors are reported just as usual.
+        return None
+
+
+def _can_fork():
+    try:
+        multiprocessing.get_context('fork')
+        return True
+    except ValueError:  # pragma: no cover
+        return False
+
+
+def execute_files(context, paths):
+    """Execute the build scripts at `paths`, which must be independent of one
+    another, and return a list of their exports. If `--jobs` is greater than
+    1, the scripts are split into that many chunks, each executed in its own
+    worker process, and the results are merged back into the build in
+    order."""
+    env, build = context.env, context.build
+    jobs = min(env.jobs, len(paths))
+    if jobs <= 1 or not _can_fork():
+        return [execute_file(context, i).exports for i in paths]
+
+    global _worker_state
+    size = -(-len(paths) // jobs)
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+
+    env.wait_for_builders()
+    roots = build.state() + [context.seen_paths, env.programs]
+    known = KnownObjects(roots + [context, env])
+    _worker_state = (context, chunks, known, Snapshot(roots, _watched_types))
+    if hasattr(gc, 'freeze'):
+        # Keep the garbage collector in each worker from touching (and so
+        # copying) all of the objects it inherited from us.
+        gc.freeze()
+    try:
+        # Fork a fresh worker for each chunk so that each one starts from the
+        # state we have now.
+        pool = multiprocessing.get_context('fork').Pool(
+            len(chunks), maxtasksperchild=1
+        )
+        with pool:
+            results = pool.map(_execute_worker, range(len(chunks)), 1)
+    finally:
+        _worker_state = None
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+
+    outputs = {i.path: i for i in build.targets()}
+    exports = []
+    for chunk, result in zip(chunks, results):
+        if result is None:
+            for i in chunk:
+                log.debug('executing {} serially'.format(
+                    i.string(env.base_dirs)
+                ))
+                exports.append(execute_file(context, i).exports)
+            outputs = {i.path: i for i in build.targets()}
+            continue
+
+        output, data = result
+        log.write_output(output)
+        chunk_exports, changes = known.loads(data)
+        for i in build.merge(changes):
+            if outputs.get(i.path, i) is not i:
+                raise ValueError('{!r} is built by more than one submodule'
+                                 .format(i.path))
+            outputs[i.path] = i
+        exports.extend(chunk_exports)
+    return exports
+
+
 def load_toolchain(env, path, reload=False):
     builtin_init()
     tools_init()
@@ -51,7 +162,8 @@ def load_toolchain(env, path, reload=False):
         env.init_variables()
 
     context = builtin.ToolchainContext(env, reload)
-    execute_file(context, path, run_post=True)
+    with profiler.span('load_toolchain', 'phase'):
+        execute_file(context, path, run_post=True)
 
     if not reload:
         env.toolchain.path = path
@@ -82,15 +194,31 @@ def fill_user_help(env, parent):
     return _execute_options(env, parent, usage='help')[0]
 
 
+def declared_langs(env):
+    # Get all the languages whose compilers have been explicitly chosen, either
+    # by a toolchain file or by the user's environment.
+    for i in known_langs:
+        try:
+            if env.getvar(i.var('compiler')):
+                yield i.name
+        except ValueError:
+            pass
+
+
 def configure_build(env):
     builtin_init()
-    parser, opts_paths = _execute_options(env)
+    with profiler.span('execute_options', 'phase'):
+        parser, opts_paths = _execute_options(env)
     argv = parser.parse_args(env.extra_args)
 
     bfgpath = Path(builtin.BuildContext.filename, Root.srcdir)
     build = BuildInputs(env, bfgpath)
+    env.preload_builders(chain([build['project']['lang']],
+                               declared_langs(env)))
     context = builtin.BuildContext(env, build, argv)
-    execute_file(context, bfgpath, run_post=True)
+    with profiler.span('execute_build', 'phase'):
+        execute_file(context, bfgpath, run_post=True)
+    env.wait_for_builders()
 
     # Add all the bfg files as bootstrap entries (except for the main
     # build.bfg, which is already included).
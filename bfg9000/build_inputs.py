@@ -3,8 +3,9 @@ from itertools import chain
 
 from .path import Path, Root
 from .file_types import File, Node
-from .iterutils import iterate, listify, unlistify
+from .iterutils import empty_list, iterate, listify, unlistify
 from .objutils import objectify
+from .snapshot import Snapshot
 
 _build_inputs = {}
 
@@ -19,6 +20,9 @@ def build_input(name):
 
 
 class Edge:
+    __slots__ = ('description', 'raw_output', 'output', 'public_output',
+                 'extra_deps')
+
     def __init__(self, build, output, final_output=None, extra_deps=None,
                  description=None):
         self.description = description
@@ -38,7 +42,7 @@ class Edge:
             return f
 
         self.extra_deps = [objectify(i, Node, make, (str, Path))
-                           for i in iterate(extra_deps)]
+                           for i in iterate(extra_deps)] or empty_list
         build.add_edge(self)
 
 
@@ -85,6 +89,24 @@ class BuildInputs:
     def edges(self):
         return iter(self._edges)
 
+    def state(self):
+        # The containers holding everything that executing a build script can
+        # add to this object. Submodules executed in another process report
+        # their changes to these so that they can be merged back in.
+        return [vars(self)] + [vars(i) for i in self._extra_inputs.values()
+                               if hasattr(i, '__dict__')]
+
+    def merge(self, changes):
+        # Apply the `changes` to our `state()`, and return any new targets.
+        Snapshot.apply(changes)
+        targets = []
+        for value, op, *args in changes:
+            if value is self._edges:
+                targets.extend(chain.from_iterable(i.output for i in args[0]))
+            elif value is self._extra_targets:
+                targets.extend(args[0])
+        return targets
+
     def __getitem__(self, key):
         return self._extra_inputs[key]
 
@@ -6,6 +6,8 @@ from ..file_types import Phony
 
 
 class Alias(Edge):
+    __slots__ = ()
+
     def __init__(self, context, name, deps=None):
         super().__init__(context.build, Phony(name), extra_deps=deps)
 
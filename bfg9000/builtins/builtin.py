@@ -1,8 +1,10 @@
 import functools
 import inspect
+import sys
 from contextlib import contextmanager
 from itertools import chain
 
+from .. import profiler
 from ..iterutils import iterate, listify
 from ..platforms.basepath import BasePath
 
@@ -27,8 +29,9 @@ class Builtins:
         return builtins
 
     def run_post(self, context):
-        for v in self._post.values():
-            v(context=context)
+        for k, v in self._post.items():
+            with profiler.span(k, 'post'):
+                v(context=context)
 
 
 build = Builtins()
@@ -142,7 +145,15 @@ class _PartialFunctionBinder(_Binder):
     def bind(self, context):
         @functools.wraps(self._fn)
         def wrapper(*args, **kwargs):
-            return self._fn(context, *args, **kwargs)
+            if not profiler.is_enabled():
+                return self._fn(context, *args, **kwargs)
+
+            # Record where this builtin was called from so that users can
+            # tell which lines of their bfg files are slow.
+            caller = sys._getframe(1)
+            site = '{}:{}'.format(caller.f_code.co_filename, caller.f_lineno)
+            with profiler.span(self._fn.__name__, 'builtin', site=site):
+                return self._fn(context, *args, **kwargs)
 
         sig = inspect.signature(wrapper)
         params = list(sig.parameters.values())[self.builtin_bound:]
@@ -53,6 +53,8 @@ Output = Placeholder('output')
 
 
 class BaseCommand(Edge):
+    __slots__ = ('name', 'files', 'phony', 'cmds', 'env')
+
     def __init__(self, context, name, outputs, cmds, files, environment=None,
                  phony=False, extra_deps=None, description=None):
         self.name = name
@@ -97,6 +99,7 @@ class BaseCommand(Edge):
 
 
 class Command(BaseCommand):
+    __slots__ = ()
     console = True
 
     def __init__(self, context, name, **kwargs):
@@ -113,6 +116,7 @@ command.input = Input
 
 
 class BuildStep(BaseCommand):
+    __slots__ = ()
     console = False
     msbuild_output = True
 
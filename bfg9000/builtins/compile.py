@@ -8,7 +8,7 @@ from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..build_inputs import build_input, Edge
 from ..file_types import *
-from ..iterutils import first, iterate
+from ..iterutils import empty_list, first, iterate
 from ..languages import known_langs
 from ..objutils import convert_each, convert_one
 from ..path import Path
@@ -18,6 +18,7 @@ build_input('compile_options')(lambda build_inputs, env: defaultdict(list))
 
 
 class BaseCompile(Edge):
+    __slots__ = ('file', 'compiler', 'user_options', '_internal_options')
     desc_verb = 'compile'
 
     def __init__(self, context, name, internal_options, directory=None,
@@ -66,12 +67,14 @@ class BaseCompile(Edge):
 
 
 class Compile(BaseCompile):
+    __slots__ = ('includes', 'include_deps', 'packages', 'pch', 'libs')
+
     def __init__(self, context, name, includes, include_deps, pch, libs,
                  packages, options, lang=None, directory=None, extra_deps=None,
                  description=None):
         self.includes = includes
-        self.include_deps = include_deps
-        self.packages = packages
+        self.include_deps = include_deps or empty_list
+        self.packages = packages or empty_list
         self.user_options = options
 
         internal_options = opts.option_list(
@@ -129,6 +132,8 @@ class Compile(BaseCompile):
 
 
 class CompileSource(Compile):
+    __slots__ = ()
+
     def __init__(self, context, name, file, lang=None, **kwargs):
         self.file = file
         if self.file.lang is None:
@@ -146,6 +151,7 @@ class CompileSource(Compile):
 
 
 class CompileHeader(Compile):
+    __slots__ = ('pch_source',)
     desc_verb = 'compile-header'
 
     def __init__(self, context, name, file, source, lang=None, **kwargs):
@@ -169,6 +175,7 @@ class CompileHeader(Compile):
 
 
 class GenerateSource(BaseCompile):
+    __slots__ = ()
     desc_verb = 'generate'
 
     def __init__(self, context, name, file, options, lang=None,
@@ -12,6 +12,7 @@ from ..versioning import SpecifierSet
 
 
 class CopyFile(Edge):
+    __slots__ = ('mode', 'copier', 'file')
     __modes = {'copy', 'symlink', 'hardlink'}
     msbuild_output = True
 
@@ -2,6 +2,7 @@ import warnings
 
 from . import builtin
 from .. import build, exceptions, log, safe_str
+from ..iterutils import isiterable, iterate
 
 
 @builtin.getter(name='env', context=('build', 'options'))
@@ -34,9 +35,14 @@ for i in (safe_str.safe_str, safe_str.safe_format):
 
 
 @builtin.function(context=('build', 'options'))
-def submodule(context, path):
-    path = context['relpath'](path).append(context.filename)
-    return build.execute_file(context, path).exports
+def submodule(context, path, *, independent=False):
+    paths = [context['relpath'](i).append(context.filename)
+             for i in iterate(path)]
+    if independent and context.kind == 'build':
+        exports = build.execute_files(context, paths)
+    else:
+        exports = [build.execute_file(context, i).exports for i in paths]
+    return exports if isiterable(path) else exports[0]
 
 
 @builtin.function(context=('build', 'options'))
@@ -5,7 +5,7 @@ from .find import exclude_globs
 from ..file_types import *
 from ..iterutils import iterate, uniques
 from ..languages import known_langs
-from ..path import Path, Root, makedirs as _makedirs
+from ..path import Path, Root, makedirs as _makedirs, write_if_changed
 
 _kind_to_file_type = {
     'header': HeaderFile,
@@ -56,7 +56,9 @@ def make_immediate_file(context, file, mode='w', makedirs=True):
         _makedirs(file.path.parent().string(context.env.base_dirs),
                   exist_ok=True)
 
-    yield open(file.path.string(context.env.base_dirs), mode)
+    with write_if_changed(file.path.string(context.env.base_dirs),
+                          mode) as out:
+        yield out
     context.build['regenerate'].outputs.append(file)
 
 
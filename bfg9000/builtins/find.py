@@ -1,20 +1,27 @@
 import fnmatch
+import hashlib
 import os
 import re
 from enum import IntEnum
+from itertools import chain
 
 from . import builtin
 from ..file_types import File
-from ..iterutils import iterate
+from ..iterutils import iterate, listify
 from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..backends.make.syntax import Writer, Syntax
 from ..build_inputs import build_input
-from ..path import exists, isdir, islink, Path, Root
+from ..cache import ListingCache
+from ..path import exists, Path, Root, write_if_changed
 from ..platforms import known_platforms
 
 build_input('find_dirs')(lambda build_inputs, env: set())
+build_input('find_cache')(lambda build_inputs, env: ListingCache(
+    os.path.join(env.builddir.string(), cache_name)
+))
 depfile_name = '.bfg_find_deps'
+cache_name = '.bfg_find_cache'
 exclude_globs = ['.*#', '*~', '#*#']
 
 
@@ -26,7 +33,7 @@ class FindResult(IntEnum):
 
 
 def write_depfile(env, path, output, seen_dirs, makeify=False):
-    with open(path.string(env.base_dirs), 'w') as f:
+    with write_if_changed(path.string(env.base_dirs)) as f:
         # Since this file is in the build dir, we can use relative dirs for
         # deps also in the build dir.
         roots = env.base_dirs.copy()
@@ -45,53 +52,145 @@ def write_depfile(env, path, output, seen_dirs, makeify=False):
                 out.write_literal(':\n')
 
 
-def _listdir(path, variables=None):
-    dirs, nondirs = [], []
+def _scandir(dirname):
+    # Use the type information `os.scandir` gives us so that we usually don't
+    # need to stat each entry. We also note which directories are symlinks so
+    # that recursive walks can skip them without stat-ing them again.
+    dirs, nondirs, links = [], [], []
+    for i in os.scandir(dirname):
+        try:
+            is_dir = i.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            dirs.append(i.name)
+            if i.is_symlink():
+                links.append(i.name)
+        else:
+            nondirs.append(i.name)
+    return [dirs, nondirs, links]
+
+
+def _listdir(path, variables=None, cache=None):
+    # Entries are returned as names, not `Path`s, so that callers only pay to
+    # build paths for the entries they actually keep.
+    dirname = path.string(variables)
     try:
-        names = os.listdir(path.string(variables))
-        for name in names:
-            curpath = path.append(name)
-            if isdir(curpath, variables):
-                dirs.append(curpath)
-            else:
-                nondirs.append(curpath)
+        if cache:
+            dirs, nondirs, links = cache.listdir(dirname, _scandir)
+        else:
+            dirs, nondirs, links = _scandir(dirname)
     except OSError:
-        pass
-    return dirs, nondirs
+        return [], [], set()
+    return dirs, nondirs, set(links)
 
 
-def _walk_flat(top, variables=None):
+def _walk_flat(top, variables=None, prune=None, cache=None):
     if exists(top, variables):
-        yield (top,) + _listdir(top, variables)
+        dirs, nondirs, _ = _listdir(top, variables, cache)
+        yield top, dirs, nondirs
 
 
-def _walk_recursive(top, variables=None):
-    if not exists(top, variables):
-        return
-    dirs, nondirs = _listdir(top, variables)
+def _walk_tree(top, variables=None, prune=None, cache=None):
+    dirs, nondirs, links = _listdir(top, variables, cache)
     yield top, dirs, nondirs
     for d in dirs:
-        if not islink(d, variables):
-            for i in _walk_recursive(d, variables):
-                yield i
+        if d not in links:
+            path = top.append(d)
+            if not prune or not prune(path):
+                yield from _walk_tree(path, variables, prune, cache)
 
 
-def _make_filter_from_glob(match_type, matches, extra, exclude):
-    matches = [re.compile(fnmatch.translate(i)) for i in iterate(matches)]
-    extra = [re.compile(fnmatch.translate(i)) for i in iterate(extra)]
-    exclude = [re.compile(fnmatch.translate(i)) for i in iterate(exclude)]
-
-    def fn(path, type):
-        name = path.basename()
-        if match_type in {type, '*'}:
-            if any(ex.match(name) for ex in exclude):
+def _walk_recursive(top, variables=None, prune=None, cache=None):
+    if exists(top, variables):
+        yield from _walk_tree(top, variables, prune, cache)
+
+
+def _match_segments(pattern, path, partial=False):
+    # Match a list of path segments against a list of compiled glob segments,
+    # where `**` matches zero or more segments. If `partial` is true, check
+    # whether `path` could be extended by one or more segments to match.
+    if not pattern:
+        return not path and not partial
+    if not path:
+        return partial or all(i == '**' for i in pattern)
+
+    if pattern[0] == '**':
+        return (_match_segments(pattern[1:], path, partial) or
+                _match_segments(pattern, path[1:], partial))
+    return (pattern[0].match(path[0]) is not None and
+            _match_segments(pattern[1:], path[1:], partial))
+
+
+def _compile_glob(pattern):
+    return re.compile(fnmatch.translate(pattern))
+
+
+class _Glob:
+    # A glob without a `/` matches an entry's name, like `find -name`. With a
+    # `/`, it matches the entry's path relative to the directory being
+    # searched, and `**` matches any number of directories.
+    def __init__(self, pattern):
+        pattern = pattern.strip('/')
+        if '/' in pattern:
+            self.name = None
+            self.segments = [i if i == '**' else _compile_glob(i)
+                             for i in pattern.split('/')]
+        else:
+            self.name = _compile_glob(pattern)
+            self.segments = None
+
+    def match(self, name, parent):
+        if self.name:
+            return self.name.match(name) is not None
+        # The root of the search has no parent, and no path to match against.
+        return (parent is not None and
+                _match_segments(self.segments, parent + [name]))
+
+    def match_below(self, path):
+        return (self.segments is None or
+                _match_segments(self.segments, path, partial=True))
+
+    def match_all_below(self, path):
+        return (self.segments is not None and self.segments[-1] == '**' and
+                _match_segments(self.segments[:-1], path))
+
+
+class _GlobMatcher:
+    def __init__(self, match_type, matches, extra, exclude):
+        matches, extra = list(iterate(matches)), list(iterate(extra))
+        # `!glob` in the included globs is another way to exclude something.
+        negated = [i[1:] for i in matches + extra if i.startswith('!')]
+
+        self.match_type = match_type
+        self.matches = [_Glob(i) for i in matches if not i.startswith('!')]
+        self.extra = [_Glob(i) for i in extra if not i.startswith('!')]
+        self.exclude = [_Glob(i) for i in chain(iterate(exclude), negated)]
+
+        included = self.matches + self.extra
+        self.has_paths = any(i.segments for i in included + self.exclude)
+        self._only_paths = all(i.segments for i in included)
+
+    def __call__(self, name, type, parent=None):
+        if self.match_type in {type, '*'}:
+            if any(i.match(name, parent) for i in self.exclude):
                 return FindResult.exclude
-            if any(ex.match(name) for ex in matches):
+            if any(i.match(name, parent) for i in self.matches):
                 return FindResult.include
-            elif any(ex.match(name) for ex in extra):
+            elif any(i.match(name, parent) for i in self.extra):
                 return FindResult.not_now
         return FindResult.exclude
-    return fn
+
+    def can_match_below(self, path):
+        # Check if anything under the directory at `path` (a list of segments
+        # relative to the search root) could be found. Only globs with a `/`
+        # can tell us this, since a name-only glob could match anywhere.
+        if any(i.match_all_below(path) for i in self.exclude):
+            return False
+        if self._only_paths:
+            return any(i.match_below(path) for i in self.matches + self.extra)
+        return True
 
 
 @builtin.function()
@@ -105,34 +204,78 @@ def filter_by_platform(context, path, type):
             else FindResult.include)
 
 
-def _combine_filters(*args):
-    return lambda path, type: max(f(path, type) for f in args)
+def _relative_segments(path, top):
+    suffix = path.suffix[len(top.suffix):].lstrip('/')
+    return suffix.split('/') if suffix else []
 
 
-def _find_files(env, paths, filter, flat, seen_dirs=None):
+def _search(base_dirs, paths, glob, flat, seen_dirs=None, cache=None):
     # "Does the walker choose the path, or the path the walker?" - Garth Nix
     walker = _walk_flat if flat else _walk_recursive
 
+    # Yield the directory and name of each entry the glob might include (with
+    # a name of None for the search paths themselves), leaving it to the
+    # caller to decide whether to build a `Path` for it.
     for p in paths:
-        yield p, 'd', filter(p, 'd')
+        yield p, None, 'd', glob(p.basename(), 'd')
     for p in paths:
-        for base, dirs, files in walker(p, env.base_dirs):
+        # Don't bother reading directories where nothing could match.
+        def prune(path, top=p):
+            return not glob.can_match_below(_relative_segments(path, top))
+
+        for base, dirs, files in walker(p, base_dirs, prune, cache):
             if seen_dirs is not None:
                 seen_dirs.append(base)
 
-            for p in dirs:
-                yield p, 'd', filter(p, 'd')
-            for p in files:
-                yield p, 'f', filter(p, 'f')
+            parent = _relative_segments(base, p) if glob.has_paths else None
+            for entries, type in ((dirs, 'd'), (files, 'f')):
+                for name in entries:
+                    matched = glob(name, type, parent)
+                    if matched != FindResult.exclude:
+                        yield base, name, type, matched
+
+
+def _digest_entry(hasher, base, name, type, matched):
+    hasher.update('{}\0{}\0{}\0{}\0{}\n'.format(
+        int(matched), type, base.root.name, base.suffix, name or ''
+    ).encode('utf-8'))
+
+
+def _find_files(env, paths, glob, filter, flat, seen_dirs=None, cache=None,
+                hasher=None):
+    for base, name, type, matched in _search(env.base_dirs, paths, glob, flat,
+                                             seen_dirs, cache):
+        if hasher:
+            _digest_entry(hasher, base, name, type, matched)
+
+        path = base if name is None else base.append(name)
+        # Combining filters picks the "most excluded" result, so once the glob
+        # excludes something, there's no need to call the user's filter.
+        if filter and matched != FindResult.exclude:
+            matched = max(matched, filter(path, type))
+        yield path, type, matched
+
+
+def find_digest(base_dirs, paths, name='*', type='*', extra=None,
+                exclude=exclude_globs, flat=False, cache=None):
+    """Return a digest of the results of searching `paths` (relative to
+    `base_dirs`) as `find_files` would. This lets us tell whether a search's
+    results have changed without running the build script that performed
+    it."""
+    glob = _GlobMatcher(type, name, extra, exclude)
+    hasher = hashlib.sha1()
+    for i in _search(base_dirs, paths, glob, flat, cache=cache):
+        _digest_entry(hasher, *i)
+    return hasher.hexdigest()
 
 
 def find(env, path='.', name='*', type='*', extra=None, exclude=exclude_globs,
          flat=False):
-    glob_filter = _make_filter_from_glob(type, name, extra, exclude)
+    glob = _GlobMatcher(type, name, extra, exclude)
     paths = [Path.ensure(i, Root.srcdir) for i in iterate(path)]
 
     results = []
-    for path, type, matched in _find_files(env, paths, glob_filter, flat):
+    for path, type, matched in _find_files(env, paths, glob, None, flat):
         if matched == FindResult.include:
             results.append(path)
     return results
@@ -142,10 +285,7 @@ def find(env, path='.', name='*', type='*', extra=None, exclude=exclude_globs,
 def find_files(context, path='.', name='*', type='*', extra=None,
                exclude=exclude_globs, filter=None, flat=False, file_type=None,
                dir_type=None, *, dist=True, cache=True):
-    final_filter = _make_filter_from_glob(type, name, extra, exclude)
-    if filter:
-        final_filter = _combine_filters(final_filter, filter)
-
+    glob = _GlobMatcher(type, name, extra, exclude)
     types = {'f': file_type or context['auto_file'],
              'd': dir_type or context['directory']}
     extra_types = {'f': context['generic_file'], 'd': context['directory']}
@@ -153,9 +293,19 @@ def find_files(context, path='.', name='*', type='*', extra=None,
     paths = [i.path if isinstance(i, File) else context['relpath'](i)
              for i in iterate(path)]
 
+    # When the results are cached (and so will be found again when
+    # regenerating), reuse any listings from last time that are still valid.
+    listing_cache = context.build['find_cache'] if cache else None
+
+    # Digest the results so that regenerating can check whether they've
+    # changed. We can't call the user's filter outside of the build script, so
+    # searches using one always require the script to be run again.
+    hasher = hashlib.sha1() if cache and not filter else None
+
     found, seen_dirs = [], []
-    for path, type, matched in _find_files(context.env, paths, final_filter,
-                                           flat, seen_dirs):
+    for path, type, matched in _find_files(context.env, paths, glob, filter,
+                                           flat, seen_dirs, listing_cache,
+                                           hasher):
         if matched == FindResult.include:
             found.append(types[type](path, dist=dist))
         elif matched == FindResult.not_now and dist:
@@ -164,6 +314,15 @@ def find_files(context, path='.', name='*', type='*', extra=None,
     if cache:
         context.build['find_dirs'].update(seen_dirs)
         context.build['regenerate'].depfile = depfile_name
+        context.build['regenerate'].searches.append(hasher and {
+            'path': [i.to_json() for i in paths],
+            'name': listify(name),
+            'type': glob.match_type,
+            'extra': listify(extra),
+            'exclude': listify(exclude),
+            'flat': flat,
+            'digest': hasher.hexdigest(),
+        })
     return found
 
 
@@ -175,8 +334,9 @@ def find_paths(context, *args, **kwargs):
 @make.post_rule
 def make_find_dirs(build_inputs, buildfile, env):
     if build_inputs['find_dirs']:
-        write_depfile(env, Path(depfile_name), make.filepath,
+        write_depfile(env, Path(depfile_name), make.stamppath,
                       build_inputs['find_dirs'], makeify=True)
+        build_inputs['find_cache'].save()
         buildfile.include(depfile_name)
 
 
@@ -185,3 +345,4 @@ def ninja_find_dirs(build_inputs, buildfile, env):
     if build_inputs['find_dirs']:
         write_depfile(env, Path(depfile_name), ninja.filepath,
                       build_inputs['find_dirs'])
+        build_inputs['find_cache'].save()
@@ -7,7 +7,8 @@ from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..build_inputs import build_input
 from ..file_types import Directory, File, file_install_path, installify
-from ..iterutils import flatten, iterate, iterate_each, map_iterable, unlistify
+from ..iterutils import (flatten, iterate, iterate_each, map_iterable,
+                         transitive_closure, unlistify)
 
 
 @build_input('install')
@@ -15,25 +16,27 @@ class InstallOutputs:
     def __init__(self, build_inputs, env):
         self.explicit = []
         self.implicit = []
+        self._implicit_set = set()
 
     def add(self, item):
         if item not in self.explicit:
             self.explicit.append(item)
 
-        for i in item.all:
-            self._add_implicit(i)
+        for i in transitive_closure(item.all, self._install_deps):
+            if i not in self._implicit_set:
+                self._implicit_set.add(i)
+                self.implicit.append(i)
 
-    def _add_implicit(self, item):
+    def _install_deps(self, item):
         if not isinstance(item, File):
             raise TypeError('expected a file or directory')
         if item.path.root not in (path.Root.srcdir, path.Root.builddir):
             raise ValueError('external files are not installable')
 
-        if item not in self.implicit:
-            self.implicit.append(item)
-
-        for i in item.install_deps:
-            self._add_implicit(i)
+        # Anything we've already added had its dependencies added with it.
+        if item in self._implicit_set:
+            return []
+        return item.install_deps
 
     def __bool__(self):
         return bool(self.implicit)
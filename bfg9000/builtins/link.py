@@ -12,7 +12,8 @@ from ..backends.ninja import writer as ninja
 from ..build_inputs import build_input, Edge
 from ..file_types import *
 from ..iterutils import (first, flatten, iterate, listify, merge_dicts,
-                         merge_into_dict, slice_dict, uniques)
+                         merge_into_dict, slice_dict, transitive_closure,
+                         uniques)
 from ..languages import known_langs
 from ..objutils import convert_each, convert_one
 from ..shell import posix as pshell
@@ -22,7 +23,26 @@ build_input('link_options')(lambda build_inputs, env: {
 })
 
 
+def _forwarded_libs(lib):
+    return getattr(lib, 'forward_opts', {}).get('libs', [])
+
+
+def forwarded_libs(libs):
+    # Return all the libraries that `libs` forward on to whatever links to them
+    # (i.e. the dependencies of static libraries), each only once and with
+    # every library before the ones it depends on. Since a static library's
+    # forwarded libs are already its full closure, this only needs to look at
+    # each library once.
+    return transitive_closure(
+        chain.from_iterable(_forwarded_libs(i) for i in libs), _forwarded_libs
+    )
+
+
 class Link(Edge):
+    # `manifest` is set by the JAR maker's `pre_build`.
+    __slots__ = ('name', 'user_libs', 'libs', 'user_packages', 'packages',
+                 'user_files', 'files', 'user_options', 'entry_point', 'langs',
+                 'linker', 'manifest', '_internal_options')
     msbuild_output = True
     extra_kwargs = ()
 
@@ -34,8 +54,8 @@ class Link(Edge):
         self.name = self.__name(name)
 
         self.user_libs = libs
-        forward_opts = self.__get_forward_opts(self.user_libs)
-        self.libs = self.user_libs + forward_opts.get('libs', [])
+        self.libs = self.user_libs + forwarded_libs(self.user_libs)
+        forward_opts = self.__get_forward_opts(uniques(self.libs))
 
         self.user_packages = packages
         self.packages = self.user_packages + forward_opts.get('packages', [])
@@ -83,7 +103,7 @@ class Link(Edge):
         output = self.linker.output_file(name, self)
         primary = first(output)
 
-        primary.package_deps.extend(self.packages)
+        primary.package_deps += self.packages
 
         self._fill_options(context.env, extra_options, forward_opts, output)
 
@@ -129,15 +149,14 @@ class Link(Edge):
 
     @staticmethod
     def __get_forward_opts(libs):
+        # `libs` already holds every forwarded library (once), so we just need
+        # to merge each one's own options.
         result = {}
-
-        def accumulate(libs):
-            for i in libs:
-                if hasattr(i, 'forward_opts'):
-                    merge_into_dict(result, i.forward_opts)
-                    accumulate(i.forward_opts.get('libs', []))
-
-        accumulate(libs)
+        for i in libs:
+            if hasattr(i, 'forward_opts'):
+                merge_into_dict(result, {
+                    k: v for k, v in i.forward_opts.items() if k != 'libs'
+                })
         return result
 
     def __find_linker(self, env, format, langs):
@@ -149,6 +168,7 @@ class Link(Edge):
 
 
 class DynamicLink(Link):
+    __slots__ = ('module_defs',)
     desc_verb = 'link'
     base_mode = 'dynamic'
     mode = 'executable'
@@ -196,12 +216,13 @@ class DynamicLink(Link):
             extra_options, forward_opts.get('link_options', [])
         )
 
-        first(output).runtime_deps.extend(
+        first(output).runtime_deps += [
             i.runtime_file for i in self.libs if i.runtime_file
-        )
+        ]
 
 
 class SharedLink(DynamicLink):
+    __slots__ = ('version', 'soversion')
     desc_verb = 'shared-link'
     mode = 'shared_library'
     msbuild_mode = 'DynamicLibrary'
@@ -218,6 +239,7 @@ class SharedLink(DynamicLink):
 
 
 class StaticLink(Link):
+    __slots__ = ('user_static_options',)
     desc_verb = 'static-link'
     base_mode = 'static'
     mode = 'static_library'
@@ -266,7 +288,7 @@ class StaticLink(Link):
                 self.linker.forwarded_compile_options(self)
             )
 
-        primary.linktime_deps.extend(self.user_libs)
+        primary.linktime_deps += self.user_libs
 
 
 @builtin.function()
@@ -4,10 +4,11 @@ from itertools import chain
 from . import builtin
 from .file_types import make_immediate_file
 from .install import can_install
+from .link import forwarded_libs
 from .. import options as opts, path
 from ..build_inputs import build_input
 from ..file_types import *
-from ..iterutils import flatten, iterate, uniques, recursive_walk
+from ..iterutils import flatten, iterate, transitive_closure, uniques
 from ..objutils import objectify
 from ..packages import CommonPackage
 from ..safe_str import literal, shell_literal
@@ -266,17 +267,14 @@ class PkgConfigInfo:
                                            [RequirementSet(), []])
         conflicts = self.conflicts or RequirementSet()
 
+        fwd = forwarded_libs(chain(libs, libs_private))
         fwd_ldflags = opts.option_list(
             getattr(i, 'forward_opts', {}).get('link_options', [])
-            for i in chain(libs, libs_private)
+            for i in uniques(chain(libs, libs_private, fwd))
         )
 
         # Add all the (unique) dependent libs to libs_private, unless they're
         # already in libs.
-        fwd = chain.from_iterable(
-            i.forward_opts['libs'] if hasattr(i, 'forward_opts') else []
-            for i in chain(libs, libs_private)
-        )
         libs_private = uniques(chain(
             (i for i in fwd if i not in libs), libs_private
         ))
@@ -284,8 +282,9 @@ class PkgConfigInfo:
         # Get the package dependencies for all the libs (public and private)
         # that were passed in.
         auto_requires, auto_extra = self._filter_packages(chain.from_iterable(
-            recursive_walk(i, 'package_deps', 'install_deps')
-            for i in chain(libs, libs_private)
+            i.package_deps for i in transitive_closure(
+                chain(libs, libs_private), lambda i: i.install_deps
+            )
         ))
 
         requires_private.update(auto_requires)
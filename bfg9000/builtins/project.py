@@ -33,3 +33,5 @@ def project(context, name=default_sentinel, version=default_sentinel,
 
     for k, v in kwargs.items():
         info[k] = v
+    if 'lang' in kwargs:
+        context.env.preload_builders([info['lang']])
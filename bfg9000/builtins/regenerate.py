@@ -1,8 +1,18 @@
+import json
+import os
+
+from . import find
+from .. import shell
+from ..app_version import version as bfg_version
 from ..backends.make import writer as make
 from ..backends.ninja import writer as ninja
 from ..build_inputs import build_input
+from ..cache import ListingCache
 from ..iterutils import listify
-from ..path import Path
+from ..path import Path, Root, write_if_changed
+from ..regen_state import (file_digest, inputs_unchanged, listings_unchanged,
+                           load_state, program_identity, state_name,
+                           state_version, touch_outputs)
 
 
 @build_input('regenerate')
@@ -10,18 +20,163 @@ class Regenerate:
     def __init__(self, build_inputs, env):
         self.outputs = []
         self.depfile = None
+        # The `find_files` searches performed by the build script, or None for
+        # any that can't be re-run without the script (e.g. due to a filter).
+        self.searches = []
+
+
+def _program_identities(env):
+    result = [env.backend_identity] if env.backend_identity else []
+    for i in sorted(env.programs):
+        try:
+            fullpath = shell.which(i, env.variables, resolve=True)[0]
+            result.append(program_identity(fullpath))
+        except OSError:
+            pass
+    return result
+
+
+def _listings(searches, dirs, base_dirs, cache):
+    # Record when each directory the searches read (including the search roots
+    # themselves, which might not exist) was listed. As long as none of them
+    # change, we can tell that the searches' results haven't either without
+    # running them again.
+    roots = {Path.from_json(j).string(base_dirs)
+             for i in searches if i for j in i['path']}
+    return [[i, cache.listed_mtime(i)] for i in sorted(roots.union(dirs))]
+
+
+def environment_digest(env):
+    """Return a digest of the saved environment for `env` and its toolchain
+    file (if any), used to tell when the environment needs to be reloaded."""
+    files = [os.path.join(env.builddir.string(), env.envfile)]
+    if env.toolchain.path:
+        files.append(env.toolchain.path.string(env.base_dirs))
+
+    result = []
+    for i in files:
+        try:
+            result.append(file_digest(i))
+        except OSError:
+            result.append(None)
+    return result
+
+
+def _touch(filename):
+    open(filename, 'a').close()
+    os.utime(filename)
+
+
+def _write_state_file(builddir, state):
+    with write_if_changed(os.path.join(builddir, state_name)) as out:
+        json.dump(state, out)
+
+
+def write_state(build_inputs, env, touch):
+    """Record what's needed to tell if the build files are still current
+    without running the build script again: digests of the script's inputs and
+    the saved environment, the identities of the programs we ran, the searches
+    the script made (with a digest of their results and when the directories
+    they read were listed), and the files to touch if nothing has changed.
+    Since we're regenerating now, touch those files too."""
+    searches = build_inputs['regenerate'].searches
+    builddir = env.builddir.string()
+    inputs = [i.string(env.base_dirs) for i in
+              build_inputs.bootstrap_paths + listify(env.toolchain.path)]
+    dirs = [i.string(env.base_dirs) for i in build_inputs['find_dirs']]
+
+    touch = [i.string(env.base_dirs) for i in touch]
+    for i in touch:
+        _touch(i)
+
+    _write_state_file(builddir, {
+        'version': state_version,
+        'bfg_version': bfg_version,
+        'environ': [env.envfile,
+                    file_digest(os.path.join(builddir, env.envfile))],
+        'inputs': [[i, file_digest(i)] for i in inputs],
+        'programs': _program_identities(env),
+        'searches': None if None in searches else searches,
+        'base_dirs': {k.name: env.base_dirs[k].to_json()
+                      for k in (Root.srcdir, Root.builddir)},
+        'listings': _listings(searches, dirs, env.base_dirs,
+                              build_inputs['find_cache']),
+        'dirs': sorted(dirs),
+        'touch': touch,
+    })
+
+
+def _searches_unchanged(builddir, state):
+    base_dirs = {Root[k]: Path.from_json(v)
+                 for k, v in state['base_dirs'].items()}
+    cache = ListingCache(os.path.join(builddir, find.cache_name))
+    for i in state['searches']:
+        paths = [Path.from_json(j) for j in i['path']]
+        digest = find.find_digest(base_dirs, paths, i['name'], i['type'],
+                                  i['extra'], i['exclude'], i['flat'], cache)
+        if digest != i['digest']:
+            return False
+    cache.save()
+
+    # The searches haven't changed, so remember when we listed their
+    # directories this time. That way, the next check can skip running them
+    # if nothing's been modified since.
+    state['listings'] = [[i, cache.listed_mtime(i)]
+                         for i, _ in state['listings']]
+    _write_state_file(builddir, state)
+    return True
+
+
+def is_current(builddir):
+    """Check if the build files in `builddir` are still current. This is the
+    case when none of the build script's inputs, the saved environment, or the
+    programs it ran have changed since it was last run, and every `find_files`
+    search it made still finds the same results. If so, touch any outputs that
+    the backend expects to be updated and return True."""
+    try:
+        state = load_state(builddir)
+        # We can't re-run some searches (e.g. those with a filter) without the
+        # build script, so we have no choice but to run it.
+        if state['searches'] is None:
+            return False
+        if not inputs_unchanged(builddir, state):
+            return False
+        if ( state['searches'] and not listings_unchanged(state) and
+             not _searches_unchanged(builddir, state) ):
+            return False
+        touch_outputs(state)
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
+
+
+def watched_paths(builddir):
+    """Return the files and directories whose changes might require the build
+    files in `builddir` to be regenerated."""
+    try:
+        state = load_state(builddir)
+        return [i[0] for i in state['inputs']] + state['dirs']
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
 
 
 @make.post_rule
 def make_regenerate_rule(build_inputs, buildfile, env):
     bfg9000 = env.tool('bfg9000')
+    outputs = [make.filepath] + build_inputs['regenerate'].outputs
 
-    make.multitarget_rule(
-        buildfile,
-        targets=[Path('Makefile')] + build_inputs['regenerate'].outputs,
+    # Regenerating only rewrites the outputs whose contents changed, so make
+    # them depend on a stamp file that `write_state` (and `is_current`) always
+    # update instead. That way, Make knows the outputs are current without us
+    # touching them, which would make it re-read the Makefile for nothing. (The
+    # empty recipe makes Make check whether the outputs did change, though.)
+    buildfile.rule(target=outputs, deps=[make.stamppath], recipe=[])
+    buildfile.rule(
+        target=make.stamppath,
         deps=build_inputs.bootstrap_paths + listify(env.toolchain.path),
         recipe=[bfg9000(Path('.'))]
     )
+    write_state(build_inputs, env, [make.stamppath])
 
 
 @ninja.post_rule
@@ -33,9 +188,13 @@ def ninja_regenerate_rule(build_inputs, buildfile, env):
         command=bfg9000(Path('.')),
         generator=True,
         depfile=build_inputs['regenerate'].depfile,
+        restat=True,
     )
     buildfile.build(
         output=[Path('build.ninja')] + build_inputs['regenerate'].outputs,
         rule='regenerate',
         implicit=build_inputs.bootstrap_paths + listify(env.toolchain.path)
     )
+    # With `restat`, Ninja notices when the outputs weren't modified, so
+    # there's nothing to touch.
+    write_state(build_inputs, env, [])
@@ -0,0 +1,342 @@
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import threading
+import time
+
+from . import shell
+from .app_version import version as bfg_version
+from .path import write_if_changed
+
+__all__ = ['CodeCache', 'DirectoryCache', 'DirectoryIndex', 'ListingCache',
+           'ProbeCache', 'user_cache_dir']
+
+
+def user_cache_dir(env=os.environ):
+    base = env.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(base, 'bfg9000')
+
+
+def _digest(data):
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+def _is_racy(mtime, window):
+    # A listing taken this soon after its directory was last modified might
+    # have missed changes made within the same timestamp tick (e.g. on
+    # filesystems with coarse timestamps), so it can't be trusted later on.
+    return int(time.time() * 10**9) - mtime <= window
+
+
+def _write_json(filename, data):
+    # This writes to a temporary file and renames it into place so that
+    # concurrent configures never see a partially-written file.
+    with write_if_changed(filename) as out:
+        json.dump(data, out)
+
+
+class ProbeCache:
+    version = 2
+    dirname = 'probes'
+
+    # Environment variables that can alter the output of a compiler probe
+    # without appearing on its command line. `PATH`, `COMPILER_PATH`, and
+    # `GCC_EXEC_PREFIX` determine which subprograms (e.g. the assembler or
+    # linker) the compiler driver ends up running.
+    variables = ('PATH', 'COMPILER_PATH', 'GCC_EXEC_PREFIX', 'CPPFLAGS',
+                 'LDFLAGS', 'CPATH', 'LIBRARY_PATH', 'LD')
+
+    def __init__(self, path=None):
+        self.path = os.path.join(path or user_cache_dir(), self.dirname)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _identity(env, program):
+        fullpath = shell.which(program, env.variables, resolve=True)[0]
+        stat = os.stat(fullpath)
+        return [os.path.realpath(fullpath), stat.st_size, stat.st_mtime_ns]
+
+    def _key(self, env, args):
+        try:
+            programs = [self._identity(env, args[0])]
+        except OSError:
+            return None
+
+        # Wrapper programs (e.g. `ccache gcc`) pass the rest of the command
+        # on to another program, so identify any other words that name a
+        # program too. Otherwise, upgrading the wrapped program would leave
+        # us with stale results.
+        for i in args[1:]:
+            try:
+                programs.append(self._identity(env, i))
+            except OSError:
+                pass
+
+        return _digest({
+            'version': self.version,
+            'bfg_version': bfg_version,
+            'programs': programs,
+            'target_platform': env.target_platform.to_json(),
+            'variables': {i: env.getvar(i) for i in self.variables},
+        })
+
+    def _load(self, key):
+        if key not in self._entries:
+            try:
+                with open(os.path.join(self.path, key + '.json')) as inp:
+                    self._entries[key] = json.load(inp)
+            except (OSError, ValueError):
+                self._entries[key] = {}
+        return self._entries[key]
+
+    def _save(self, key):
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            _write_json(os.path.join(self.path, key + '.json'),
+                        self._entries[key])
+        except OSError:
+            # The cache is only an optimization, so if we can't write it
+            # (e.g. because $HOME is read-only), just carry on.
+            pass
+
+    def execute(self, env, args, stdout=shell.Mode.normal,
+                stderr=shell.Mode.normal, returncode=0):
+        kwargs = {'stdout': stdout, 'stderr': stderr,
+                  'returncode': returncode}
+        key = (self._key(env, args) if all(isinstance(i, str) for i in args)
+               else None)
+        if key is None:
+            return env.execute(args, **kwargs)
+
+        probe = json.dumps([args[1:], stdout.name, stderr.name, returncode])
+        with self._lock:
+            entries = self._load(key)
+            result = entries.get(probe)
+
+        if result is None:
+            # Don't hold the lock while running the probe so that builders
+            # being initialized in parallel don't wait on each other.
+            try:
+                result = {'output': env.execute(args, **kwargs)}
+            except shell.CalledProcessError as e:
+                result = {'returncode': e.returncode}
+            with self._lock:
+                entries[probe] = result
+                self._save(key)
+
+        if 'returncode' in result:
+            raise shell.CalledProcessError(result['returncode'], args)
+        output = result['output']
+        return tuple(output) if isinstance(output, list) else output
+
+
+class DirectoryCache:
+    version = 1
+    dirname = 'dirs'
+
+    # Don't save listings of recently-modified directories; see
+    # `ListingCache.racy_window`.
+    racy_window = 2 * 10**9
+
+    def __init__(self, path=None):
+        self.path = os.path.join(path or user_cache_dir(), self.dirname)
+
+    def _filename(self, dirname):
+        return os.path.join(self.path, _digest([self.version, dirname]) +
+                            '.json')
+
+    def load(self, dirname, mtime):
+        try:
+            with open(self._filename(dirname)) as inp:
+                data = json.load(inp)
+            if data['dirname'] == dirname and data['mtime'] == mtime:
+                return data['files']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def save(self, dirname, mtime, files):
+        if _is_racy(mtime, self.racy_window):
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            _write_json(self._filename(dirname), {
+                'dirname': dirname, 'mtime': mtime, 'files': sorted(files),
+            })
+        except OSError:
+            pass
+
+
+class DirectoryIndex:
+    """An in-memory index of the names of the files in a set of directories,
+    used to look for headers and libraries without stat-ing every candidate
+    file. Each directory is listed once, the first time it's needed. If a
+    `DirectoryCache` is supplied, listings are also persisted across builds,
+    keyed on each directory's modification time."""
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self._dirs = {}
+
+    def _list(self, dirname):
+        if self.cache is None:
+            return os.listdir(dirname)
+
+        mtime = os.stat(dirname).st_mtime_ns
+        files = self.cache.load(dirname, mtime)
+        if files is None:
+            files = os.listdir(dirname)
+            self.cache.save(dirname, mtime, files)
+        return files
+
+    @staticmethod
+    def _key(filename):
+        # Fold case so that the index never misses a file on case-insensitive
+        # filesystems; any false hits this causes elsewhere are caught by the
+        # double-check in `exists` below.
+        return filename.casefold()
+
+    def listing(self, dirname):
+        try:
+            return self._dirs[dirname]
+        except KeyError:
+            try:
+                files = {self._key(i) for i in self._list(dirname)}
+            except OSError:
+                # We can't list this directory (e.g. it's executable but not
+                # readable), but it might still hold what we want, so fall
+                # back to checking each candidate directly.
+                files = None
+            self._dirs[dirname] = files
+            return files
+
+    def exists(self, path):
+        dirname, basename = os.path.split(path)
+        # Double-check with the filesystem on a hit, since the listing can't
+        # tell us about e.g. broken symlinks.
+        files = self.listing(dirname)
+        return ((files is None or self._key(basename) in files) and
+                os.path.exists(path))
+
+
+class ListingCache:
+    """A cache of directory listings for `find_files`, stored in the build
+    directory. Each listing is keyed on its directory's modification time, so
+    when regenerating the build files, only the directories that have changed
+    since the last run need to be read again."""
+
+    version = 1
+
+    # Listings this recent might have missed changes made within the same
+    # timestamp tick (e.g. on filesystems with coarse timestamps), so don't
+    # trust them the next time around.
+    racy_window = 2 * 10**9
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._entries = None
+        self._used = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.filename) as inp:
+                    data = json.load(inp)
+                if ( data['version'] == self.version and
+                     data['bfg_version'] == bfg_version ):
+                    self._entries = data['dirs']
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return self._entries
+
+    def listdir(self, dirname, list_fn):
+        # `list_fn` reads the directory for real, returning a list of
+        # JSON-serializable values describing its entries.
+        try:
+            mtime = os.stat(dirname).st_mtime_ns
+        except OSError:
+            return list_fn(dirname)
+
+        with self._lock:
+            entry = self._load().get(dirname)
+        if entry and entry[0] == mtime:
+            result = entry[1]
+        else:
+            result = list_fn(dirname)
+
+        if not _is_racy(mtime, self.racy_window):
+            with self._lock:
+                self._used[dirname] = [mtime, result]
+        return result
+
+    def listed_mtime(self, dirname):
+        # Return the modification time `dirname` had when we listed it, or
+        # None if we haven't listed it (or if the listing was too recent to
+        # trust).
+        entry = self._used.get(dirname)
+        return entry[0] if entry else None
+
+    def save(self):
+        # Only keep the directories we looked at this time, so that the cache
+        # doesn't accumulate directories that are no longer searched.
+        try:
+            _write_json(self.filename, {
+                'version': self.version,
+                'bfg_version': bfg_version,
+                'dirs': self._used,
+            })
+        except OSError:
+            pass
+
+
+class CodeCache:
+    """A cache of compiled build scripts, stored in the build directory much
+    like Python's `__pycache__`. There's one entry per script, which is only
+    used if the script's contents, the Python version, and bfg9000's version
+    all match those it was compiled with."""
+
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+
+    def _filename(self, filename):
+        return os.path.join(self.path, _digest([self.version, filename]) +
+                            '.bin')
+
+    def compile(self, source, filename):
+        header = [self.version, bfg_version,
+                  hashlib.sha1(source.encode('utf-8')).hexdigest()]
+        cachename = self._filename(filename)
+
+        try:
+            with open(cachename, 'rb') as inp:
+                # Check the magic number before unmarshalling anything, since
+                # the marshal format can change between Python versions.
+                if inp.read(4) == importlib.util.MAGIC_NUMBER and \
+                   marshal.load(inp) == header:
+                    return marshal.load(inp)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        code = compile(source, filename, 'exec')
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            tmpname = '{}.{}.tmp'.format(cachename, os.getpid())
+            with open(tmpname, 'wb') as out:
+                out.write(importlib.util.MAGIC_NUMBER)
+                marshal.dump(header, out)
+                marshal.dump(code, out)
+            os.replace(tmpname, cachename)
+        except OSError:
+            pass
+        return code
@@ -1,17 +1,26 @@
 import os
+import subprocess
 import sys
 
 from . import build
 from . import log
 from . import path
+from . import profiler
+from . import server
+from . import trace
 from .arguments import parser as argparse
-from .backends import list_backends
+from .backends import check_version, choose_backend, list_backends
+from .builtins import regenerate
 from .environment import Environment, EnvVersionError
 from .platforms.target import platform_info
+from .watch import make_watcher
 from .app_version import version
 
 logger = log.getLogger(__name__)
 
+# How long to wait for a series of changes to finish before regenerating.
+watch_settle_time = 0.1
+
 description = """
 bfg9000 ("build file generator") is a cross-platform build configuration system
 with an emphasis on making it easy to define how to build your software. It
@@ -34,7 +43,24 @@ file in SRCDIR, and place them in BUILDDIR.
 refresh_desc = """
 Regenerate an existing set of build files needed to perform actual builds. This
 is run automatically if bfg9000 determines that the build files are out of
-date.
+date. If nothing that the build files depend on has changed since they were
+last generated, this does nothing unless `--force` is passed.
+"""
+
+watch_desc = """
+Watch the build scripts of an existing build configuration, along with any
+directories searched by `find_files()`, and regenerate the build files whenever
+they change. This keeps bfg9000 running between changes, so regenerating is
+much faster than with `bfg9000 refresh`. Uses inotify on Linux, and polling
+elsewhere.
+"""
+
+serve_desc = """
+Run a server that regenerates build files on behalf of `bfg9000 refresh` (and
+thus the build files' own regeneration rules), keeping each build
+configuration's environment and compilers loaded between requests. `bfg9000
+refresh` uses the server whenever it's running, and otherwise does the work
+itself. Set `BFG9000_SERVER` to the socket's path if not using the default.
 """
 
 env_desc = """
@@ -56,20 +82,34 @@ def handle_reload_exception(e, suggest_rerun=False):
     return 1
 
 
+def reload_environment(builddir):
+    env = Environment.load(builddir)
+    if env.toolchain.path:
+        build.load_toolchain(env, env.toolchain.path, reload=True)
+
+    backend = list_backends()[env.backend]
+    env.backend_version, env.backend_identity = check_version(
+        backend, cached=(env.backend_version, env.backend_identity)
+    )
+    env.save(builddir)
+    return env, backend
+
+
 def environment_from_args(args):
     # Get the bin directory holding bfg's executables.
     bfgdir = path.abspath(sys.argv[0]).parent()
 
-    backend = list_backends()[args.backend]
+    name, (version, identity) = choose_backend(args.backend)
     env = Environment(
         bfgdir=bfgdir,
-        backend=args.backend,
-        backend_version=backend.version(),
+        backend=name,
+        backend_version=version,
         srcdir=args.srcdir,
         builddir=args.builddir,
+        backend_identity=identity,
     )
 
-    return env, backend
+    return env, list_backends()[name]
 
 
 def finalize_environment(env, args, extra_args=None):
@@ -77,9 +117,45 @@ def finalize_environment(env, args, extra_args=None):
         install_dirs={i: getattr(args, i.name) for i in path.InstallRoot},
         library_mode=(args.shared, args.static),
         extra_args=extra_args,
+        use_probe_cache=args.probe_cache,
+        jobs=args.jobs,
     )
 
 
+def run_traced(args, fn, *fn_args):
+    trace_file = getattr(args, 'trace_file', None)
+    show_trace = getattr(args, 'trace_subprocesses', False)
+    budget = getattr(args, 'subprocess_budget', None)
+    profile = getattr(args, 'profile', None)
+
+    enabled = show_trace or trace_file is not None or budget is not None
+    trace.init(enabled)
+    profiler.init(profile is not None)
+    with profiler.span(fn.__name__, 'phase'):
+        result = fn(*fn_args)
+
+    if profile is not None:
+        with open(profile, 'w') as out:
+            profiler.write(out)
+        profiler.init(False)
+    if not enabled:
+        return result
+
+    records = trace.records()
+    over_budget = budget is not None and len(records) > budget
+    if show_trace or over_budget:
+        sys.stderr.write(trace.format_table(records) + '\n')
+    if trace_file is not None:
+        with open(trace_file, 'w') as out:
+            trace.dump_json(records, out)
+
+    if over_budget:
+        logger.error('ran {} subprocesses, exceeding the budget of {}'
+                     .format(len(records), budget))
+        return result or 1
+    return result
+
+
 def directory_pair(srcname, buildname):
     class DirectoryPair(argparse.Action):
         def __call__(self, parser, namespace, values, option_string=None):
@@ -132,6 +208,20 @@ def add_generic_args(parser):
                         help='only emit a given warning once')
 
 
+def add_trace_args(parser):
+    group = parser.add_argument_group('tracing arguments')
+    group.add_argument('--trace-subprocesses', action='store_true',
+                       help=('print a summary of every subprocess run while ' +
+                             'generating the build files'))
+    group.add_argument('--trace-file', metavar='FILE',
+                       help='write the subprocess trace as JSON to FILE')
+    group.add_argument('--subprocess-budget', metavar='N', type=int,
+                       help='fail if more than N subprocesses are run')
+    group.add_argument('--profile', metavar='FILE',
+                       help=('write a profile of generating the build files ' +
+                             'to FILE, in Chrome\'s trace event format'))
+
+
 def add_configure_args(parser):
     backends = list_backends()
 
@@ -141,9 +231,8 @@ def add_configure_args(parser):
     build = parser.add_argument_group('build arguments')
     build.add_argument('--backend', metavar='BACKEND',
                        choices=list(backends.keys()),
-                       default=list(backends.keys())[0],
                        help=('build backend (one of %(choices)s; default: ' +
-                             '%(default)s)'))
+                             'the first of these that is installed)'))
     build.add_argument('--toolchain', metavar='FILE',
                        type=argparse.File(must_exist=True),
                        help=('a file defining the toolchain to use for this ' +
@@ -152,6 +241,13 @@ def add_configure_args(parser):
                        help='build shared libraries (default: enabled)')
     build.add_argument('--static', action='enable', default=False,
                        help='build static libraries (default: disabled)')
+    build.add_argument('--probe-cache', action='enable', default=True,
+                       help=('reuse compiler probes from other builds ' +
+                             '(default: enabled)'))
+    build.add_argument('-j', '--jobs', metavar='N', type=int, default=1,
+                       help=('number of compilers to initialize (and ' +
+                             'independent submodules to execute) in ' +
+                             'parallel (default: %(default)s)'))
 
     common_path_help = 'installation path for {} (default: {{}})'
     path_help = {
@@ -171,6 +267,8 @@ def add_configure_args(parser):
         install.add_argument(name, type=argparse.Directory(), metavar='PATH',
                              help=help)
 
+    add_trace_args(parser)
+
 
 def configure(parser, subparser, args, extra):
     if ( path.exists(args.builddir) and
@@ -194,12 +292,20 @@ def configure(parser, subparser, args, extra):
         env.save(args.builddir.string())
 
         build_inputs = build.configure_build(env)
-        backend.write(env, build_inputs)
+        with profiler.span('write_backend', 'phase'):
+            backend.write(env, build_inputs)
     except Exception as e:
         logger.exception(e)
         return 1
 
 
+def _use_server(args):
+    # Tracing and profiling need to happen in this process, so don't hand the
+    # work off to a server if they're enabled.
+    return not (args.trace_subprocesses or args.trace_file or
+                args.subprocess_budget is not None or args.profile)
+
+
 def refresh(parser, subparser, args, extra):
     if extra:
         subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
@@ -209,18 +315,143 @@ def refresh(parser, subparser, args, extra):
                         .format(build.bfgfile))
 
     try:
-        env = Environment.load(args.builddir.string())
-        if env.toolchain.path:
-            build.load_toolchain(env, env.toolchain.path, reload=True)
-        env.save(args.builddir.string())
-
-        backend = list_backends()[env.backend]
+        if not args.force and regenerate.is_current(args.builddir.string()):
+            return
+
+        if _use_server(args):
+            result = server.request(server.socket_path(), {
+                'command': 'refresh',
+                'builddir': args.builddir.string(),
+                'force': args.force,
+            }, sys.stderr)
+            if result is not None:
+                return result
+
+        env, backend = reload_environment(args.builddir.string())
         build_inputs = build.configure_build(env)
-        backend.write(env, build_inputs)
+        with profiler.span('write_backend', 'phase'):
+            backend.write(env, build_inputs)
     except Exception as e:
         return handle_reload_exception(e, suggest_rerun=True)
 
 
+class _Session:
+    # A build directory that we regenerate repeatedly in the same process. We
+    # keep its environment (and any builders it's initialized) around between
+    # regenerations, reloading it only when it's changed on disk.
+
+    def __init__(self, builddir):
+        self.builddir = builddir
+        self.env, self.backend = reload_environment(builddir)
+        self.env_digest = regenerate.environment_digest(self.env)
+
+    def regenerate(self, force=False):
+        if not force and regenerate.is_current(self.builddir):
+            return False
+
+        if regenerate.environment_digest(self.env) != self.env_digest:
+            self.env, self.backend = reload_environment(self.builddir)
+            self.env_digest = regenerate.environment_digest(self.env)
+        else:
+            self.env.clear_caches()
+
+        build_inputs = build.configure_build(self.env)
+        self.backend.write(self.env, build_inputs)
+        return True
+
+
+def watch(parser, subparser, args, extra):
+    if extra and not args.build:
+        subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+
+    if build.is_srcdir(args.builddir):
+        subparser.error('build directory must not contain a {} file'
+                        .format(build.bfgfile))
+
+    builddir = args.builddir.string()
+    try:
+        session = _Session(builddir)
+    except Exception as e:
+        return handle_reload_exception(e, suggest_rerun=True)
+
+    logger.info('watching for changes; press Ctrl+C to stop')
+    try:
+        while True:
+            try:
+                if session.regenerate():
+                    logger.info('regenerated build files')
+            except Exception as e:
+                logger.exception(e)
+
+            # Start watching before building so that we don't miss changes
+            # made in the meantime. If we don't know what to watch (e.g. the
+            # build script has never run successfully), watch the script.
+            paths = regenerate.watched_paths(builddir)
+            if not paths:
+                bfgfile = path.Path(build.bfgfile, path.Root.srcdir)
+                paths = [bfgfile.string(session.env.base_dirs)]
+            watcher = make_watcher(paths, args.poll, args.interval)
+            try:
+                if args.build:
+                    subprocess.call(session.backend.command() + extra,
+                                    cwd=builddir)
+                watcher.wait()
+                # Wait for things to settle down so that we don't regenerate
+                # in the middle of a series of changes (e.g. a VCS checkout).
+                while watcher.wait(watch_settle_time):
+                    pass
+            finally:
+                watcher.close()
+    except KeyboardInterrupt:
+        return 0
+
+
+def serve(parser, subparser, args, extra):
+    if extra:
+        subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
+    if not server.is_supported:
+        subparser.error('Unix domain sockets are not supported on this '
+                        'platform')
+
+    sessions = {}
+
+    def handle(message, stream):
+        builddir = message.get('builddir')
+        force = message.get('force', False)
+        if message.get('command') != 'refresh':
+            raise ValueError('unknown command {!r}'
+                             .format(message.get('command')))
+        if not isinstance(builddir, str) or not isinstance(force, bool):
+            raise ValueError('invalid refresh request')
+
+        with log.redirect(stream):
+            try:
+                # Go back to where we were afterwards, so that the next
+                # request isn't resolved relative to this one's build
+                # directory.
+                with path.pushd(builddir):
+                    if builddir not in sessions:
+                        sessions[builddir] = _Session(builddir)
+                    sessions[builddir].regenerate(force)
+            except Exception as e:
+                return handle_reload_exception(e, suggest_rerun=True)
+            return 0
+
+    try:
+        srv = server.Server(args.socket, handle)
+    except OSError as e:
+        logger.error(str(e))
+        return 1
+
+    logger.info('listening on {}; press Ctrl+C to stop'.format(args.socket))
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        srv.close()
+
+
 def env(parser, subparser, args, extra):
     if extra:
         subparser.error('unrecognized arguments: {}'.format(' '.join(extra)))
@@ -289,6 +520,40 @@ def main():
                            type=argparse.Directory(must_exist=True),
                            metavar='BUILDDIR', nargs='?', default='.',
                            help='build directory')
+    refresh_p.add_argument('--force', action='store_true',
+                           help=('regenerate even if nothing appears to have '
+                                 'changed'))
+    add_trace_args(refresh_p)
+
+    watch_p = subparsers.add_parser(
+        'watch', description=watch_desc,
+        help='regenerate build files when they change'
+    )
+    watch_p.set_defaults(func=watch, parser=watch_p)
+    watch_p.add_argument('builddir',
+                         type=argparse.Directory(must_exist=True),
+                         metavar='BUILDDIR', nargs='?', default='.',
+                         help='build directory')
+    watch_p.add_argument('-b', '--build', action='store_true',
+                         help=('run the build after each change, passing any '
+                               'extra arguments to the build tool'))
+    watch_p.add_argument('--poll', action='store_true',
+                         help=('check for changes by polling rather than via '
+                               'inotify'))
+    watch_p.add_argument('--interval', metavar='SECONDS', type=float,
+                         default=0.5,
+                         help=('how often to poll for changes (default: '
+                               '%(default)s)'))
+
+    serve_p = subparsers.add_parser(
+        'serve', description=serve_desc,
+        help='run a server to regenerate build files'
+    )
+    serve_p.set_defaults(func=serve, parser=serve_p)
+    serve_p.add_argument('--socket', metavar='PATH',
+                         default=server.socket_path(),
+                         help=('the socket to listen on (default: '
+                               '%(default)s)'))
 
     env_p = subparsers.add_parser(
         'env', description=env_desc, help='print environment'
@@ -319,7 +584,7 @@ def main():
     args, extra = parser.parse_known_args()
     log.init(args.color, debug=args.debug, warn_once=args.warn_once)
 
-    return args.func(parser, args.parser, args, extra)
+    return run_traced(args, args.func, parser, args.parser, args, extra)
 
 
 def simple_main():
@@ -335,4 +600,4 @@ def simple_main():
     args, extra = parser.parse_known_args()
     log.init(args.color, debug=args.debug, warn_once=args.warn_once)
 
-    return configure(parser, parser, args, extra)
+    return run_traced(args, configure, parser, parser, args, extra)
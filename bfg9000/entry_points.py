@@ -0,0 +1,55 @@
+# Importing `pkg_resources` takes a significant fraction of the time of a
+# no-op `bfg9000 refresh`, so prefer `importlib.metadata` when it's available
+# and only fall back to `pkg_resources` on older versions of Python.
+try:
+    from importlib import metadata as _metadata
+except ImportError:  # pragma: no cover
+    _metadata = None
+
+__all__ = ['get_entry_point', 'iter_entry_points']
+
+
+class _LegacyEntryPoint:  # pragma: no cover
+    def __init__(self, entry_point):
+        self.name = entry_point.name
+        self._entry_point = entry_point
+
+    def load(self):
+        # Like `importlib.metadata`, don't check the entry point's extras
+        # here; missing optional dependencies will raise an ImportError.
+        return self._entry_point.resolve()
+
+
+def _select(entry_points, group):
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=group)
+    elif isinstance(entry_points, dict):
+        return entry_points.get(group, [])
+    return (i for i in entry_points if i.group == group)
+
+
+def iter_entry_points(group):
+    if _metadata is None:  # pragma: no cover
+        from pkg_resources import iter_entry_points
+        yield from (_LegacyEntryPoint(i) for i in iter_entry_points(group))
+        return
+
+    # The same distribution can show up more than once on `sys.path` (e.g.
+    # for development installs), so only yield the first entry for each name.
+    seen = set()
+    for i in _select(_metadata.entry_points(), group):
+        if i.name not in seen:
+            seen.add(i.name)
+            yield i
+
+
+def get_entry_point(dist, group, name):
+    if _metadata is None:  # pragma: no cover
+        from pkg_resources import get_entry_info
+        entry = get_entry_info(dist, group, name)
+        return _LegacyEntryPoint(entry) if entry else None
+
+    for i in _select(_metadata.distribution(dist).entry_points, group):
+        if i.name == name:
+            return i
+    return None
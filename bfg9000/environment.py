@@ -2,14 +2,16 @@ import json
 import os
 import platform
 from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 
 from . import platforms
 from . import tools
 from . import shell
 from .backends import list_backends
+from .cache import DirectoryCache, DirectoryIndex, ProbeCache
 from .file_types import Executable, Node
 from .iterutils import first, isiterable, listify
-from .path import InstallRoot, Path, Root
+from .path import InstallRoot, Path, Root, write_if_changed
 from .tools.common import Command
 from .versioning import Version
 
@@ -53,7 +55,7 @@ class Toolchain:
 
 
 class Environment:
-    version = 14
+    version = 17
     envfile = '.bfg_environ'
 
     Mode = shell.Mode
@@ -63,12 +65,20 @@ class Environment:
         tools.init()
         env.__builders = {}
         env.__tools = {}
+        env.__probe_cache = None
+        env.__directory_index = None
+        env.__pool = None
+        env.__programs = set()
+        env.use_probe_cache = False
+        env.jobs = 1
         return env
 
-    def __init__(self, bfgdir, backend, backend_version, srcdir, builddir):
+    def __init__(self, bfgdir, backend, backend_version, srcdir, builddir,
+                 backend_identity=None):
         self.bfgdir = bfgdir
         self.backend = backend
         self.backend_version = backend_version
+        self.backend_identity = backend_identity
 
         self.host_platform = platforms.host.platform_info()
         self.target_platform = platforms.target.platform_info()
@@ -81,7 +91,8 @@ class Environment:
         self.initial_variables = dict(os.environ)
         self.init_variables()
 
-    def finalize(self, install_dirs, library_mode, extra_args=None):
+    def finalize(self, install_dirs, library_mode, extra_args=None,
+                 use_probe_cache=False, jobs=1):
         # Fill in any install dirs that aren't already set (e.g. by a
         # toolchain file) with defaults from the target platform, but skip
         # absolute paths if this is a cross-compilation build.
@@ -97,6 +108,8 @@ class Environment:
 
         self.library_mode = LibraryMode(*library_mode)
         self.extra_args = extra_args
+        self.use_probe_cache = use_probe_cache
+        self.jobs = jobs
 
     def init_variables(self):
         self.variables = EnvVarDict(self.initial_variables)
@@ -120,8 +133,38 @@ class Environment:
     def builder(self, lang):
         if lang not in self.__builders:
             self.__builders[lang] = tools.get_builder(self, lang)
+        elif isinstance(self.__builders[lang], Future):
+            # This builder was preloaded; wait for it to finish. Any errors
+            # will be raised here, just as if we'd created it lazily.
+            self.__builders[lang] = self.__builders[lang].result()
         return self.__builders[lang]
 
+    def preload_builders(self, langs):
+        if self.jobs <= 1:
+            return
+
+        if self.__pool is None:
+            # Make sure the probe cache exists before any threads use it.
+            self.probe_cache
+            self.__pool = ThreadPoolExecutor(self.jobs)
+        for i in langs:
+            if i not in self.__builders:
+                self.__builders[i] = self.__pool.submit(
+                    tools.get_builder, self, i
+                )
+
+    def wait_for_builders(self):
+        # Wait for any builders that are still being preloaded (e.g. before
+        # forking, so that the child doesn't inherit locks held by our worker
+        # threads). Any errors are left for `builder()` to raise.
+        wait([i for i in self.__builders.values() if isinstance(i, Future)])
+        # Shut the pool down too, so that its idle threads don't outlive
+        # configuration (or get inherited by forked workers). If we preload
+        # any more builders later, we'll just start a new pool.
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+
     def tool(self, name):
         if name not in self.__tools:
             self.__tools[name] = tools.get_tool(self, name)
@@ -169,21 +212,67 @@ class Environment:
 
         if not kwargs.get('shell', False):
             args = Command.convert_args(args, lambda x: x.command)
+            self.__add_program(args)
 
         return shell.execute(args, env=env_vars, base_dirs=self.base_dirs,
                              **kwargs)
 
+    @property
+    def probe_cache(self):
+        if not self.use_probe_cache:
+            return None
+        if self.__probe_cache is None:
+            self.__probe_cache = ProbeCache()
+        return self.__probe_cache
+
+    def clear_caches(self):
+        # Forget what we know about the filesystem (but keep any builders we've
+        # initialized), e.g. before regenerating the build files again in a
+        # long-running process.
+        self.__directory_index = None
+        shell.clear_path_cache()
+
+    @property
+    def directory_index(self):
+        # Share one index for all the header and library lookups in this
+        # build, persisting it along with the probe cache if that's enabled.
+        if self.__directory_index is None:
+            self.__directory_index = DirectoryIndex(
+                DirectoryCache() if self.use_probe_cache else None
+            )
+        return self.__directory_index
+
+    def __add_program(self, args):
+        if args and isinstance(args[0], str):
+            self.__programs.add(args[0])
+
+    @property
+    def programs(self):
+        # The programs we've run, whose identities determine whether the build
+        # files might need to be regenerated.
+        return self.__programs
+
+    def probe(self, args, **kwargs):
+        # Run a command whose output depends only on the program being run
+        # (e.g. `cc --version`), reusing the result from an earlier build if
+        # possible.
+        if self.probe_cache:
+            self.__add_program(args)
+            return self.probe_cache.execute(self, args, **kwargs)
+        return self.execute(args, **kwargs)
+
     def run(self, args, lang=None, *posargs, **kwargs):
         return self.execute(self.run_arguments(args, lang), *posargs, **kwargs)
 
     def save(self, path):
-        with open(os.path.join(path, self.envfile), 'w') as out:
+        with write_if_changed(os.path.join(path, self.envfile)) as out:
             json.dump({
                 'version': self.version,
                 'data': {
                     'bfgdir': self.bfgdir.to_json(),
                     'backend': self.backend,
                     'backend_version': str(self.backend_version),
+                    'backend_identity': self.backend_identity,
 
                     'host_platform': self.host_platform.to_json(),
                     'target_platform': self.target_platform.to_json(),
@@ -198,6 +287,8 @@ class Environment:
 
                     'library_mode': self.library_mode,
                     'extra_args': self.extra_args,
+                    'use_probe_cache': self.use_probe_cache,
+                    'jobs': self.jobs,
 
                     'initial_variables': self.initial_variables,
                     'variables': self.variables,
@@ -271,6 +362,19 @@ class Environment:
                 data[i] = {'genus': genus, 'species': species,
                            'arch': platform.machine()}
 
+        # v15 adds the persistent compiler probe cache.
+        if version < 15:
+            data['use_probe_cache'] = False
+
+        # v16 adds parallel initialization of builders.
+        if version < 16:
+            data['jobs'] = 1
+
+        # v17 adds the identity of the backend's program, used to decide when
+        # to re-check the backend's version.
+        if version < 17:
+            data['backend_identity'] = None
+
         # Now that we've upgraded, initialize the Environment object.
         env = Environment.__new__(Environment)
 
@@ -279,7 +383,8 @@ class Environment:
             data['target_platform']
         )
 
-        for i in ('backend', 'extra_args', 'initial_variables', 'variables'):
+        for i in ('backend', 'backend_identity', 'extra_args',
+                  'use_probe_cache', 'jobs', 'initial_variables', 'variables'):
             setattr(env, i, data[i])
 
         for i in ('bfgdir', 'srcdir', 'builddir'):
@@ -1,5 +1,6 @@
 from . import safe_str as _safe_str
-from .iterutils import listify as _listify
+from .iterutils import empty_list as _empty_list, listify as _listify
+from .objutils import slot_items as _slot_items
 from .path import InstallRoot as _InstallRoot, install_path as _install_path
 
 
@@ -24,11 +25,12 @@ def _clone_traits(exclude=set(), subfiles={}):
 
 
 class Node(_safe_str.safe_string_ops):
-    private = False
+    __slots__ = ('creator', 'path', 'private')
 
     def __init__(self, path):
         self.creator = None
         self.path = path
+        self.private = False
 
     def _safe_str(self):
         return _safe_str.safe_str(self.path)
@@ -53,11 +55,12 @@ class Node(_safe_str.safe_string_ops):
 
 
 class Phony(Node):
-    pass
+    __slots__ = ()
 
 
 class File(Node):
-    _clone_exclude = {'path', 'creator', 'post_install'}
+    __slots__ = ('post_install',)
+    _clone_exclude = {'path', 'creator', 'private', 'post_install'}
     _clone_subfiles = {}
 
     install_kind = None
@@ -73,7 +76,7 @@ class File(Node):
 
     def _clone_args(self, pathfn, recursive):
         args = {'path': pathfn(self)}
-        for k, v in self.__dict__.items():
+        for k, v in _slot_items(self):
             if k in self._clone_exclude:
                 continue
             try:
@@ -101,6 +104,8 @@ class File(Node):
 
 @_clone_traits(exclude={'files'})
 class Directory(File):
+    __slots__ = ('files',)
+
     def __init__(self, path, files=None):
         super().__init__(path)
         self.files = files
@@ -117,34 +122,42 @@ class Directory(File):
 
 
 class CodeFile(File):
+    __slots__ = ('lang',)
+
     def __init__(self, path, lang):
         super().__init__(path)
         self.lang = lang
 
 
 class ResourceFile(CodeFile):
-    pass
+    __slots__ = ()
 
 
 class SourceCodeFile(CodeFile):
-    pass
+    __slots__ = ()
 
 
 class SourceFile(SourceCodeFile):
-    pass
+    __slots__ = ()
 
 
 class HeaderFile(SourceCodeFile):
+    __slots__ = ()
     install_kind = 'data'
     install_root = _InstallRoot.includedir
 
 
 class PrecompiledHeader(HeaderFile):
+    # `object_file` is set when compiling the header also produces an object
+    # file that needs to be linked in (e.g. with MSVC).
+    __slots__ = ('object_file',)
     install_kind = None
 
 
 @_clone_traits(subfiles={'object_file': 'object_path'})
 class MsvcPrecompiledHeader(PrecompiledHeader):
+    __slots__ = ('header_name',)
+
     def __init__(self, path, object_path, header_name, format, lang):
         super().__init__(path, lang)
         self.object_file = ObjectFile(object_path, format, self.lang)
@@ -158,6 +171,7 @@ class MsvcPrecompiledHeader(PrecompiledHeader):
 
 
 class HeaderDirectory(Directory):
+    __slots__ = ('system', 'langs')
     install_kind = 'data'
     install_root = _InstallRoot.includedir
 
@@ -168,10 +182,11 @@ class HeaderDirectory(Directory):
 
 
 class ModuleDefFile(File):
-    pass
+    __slots__ = ()
 
 
 class Binary(File):
+    __slots__ = ('format', 'lang')
     install_kind = 'data'
     install_root = _InstallRoot.libdir
 
@@ -182,12 +197,15 @@ class Binary(File):
 
 
 class ObjectFile(Binary):
-    pass
+    # `extra_objects` holds any other object files that should be linked along
+    # with this one (e.g. the object file for an MSVC precompiled header).
+    __slots__ = ('extra_objects',)
 
 
 # This is used by JVM languages to hold a list of all the object files
 # generated by a particular source file's compilation.
 class ObjectFileList(ObjectFile):
+    __slots__ = ('object_file',)
     install_kind = None
 
     def __init__(self, path, object_name, format, lang=None):
@@ -198,13 +216,17 @@ class ObjectFileList(ObjectFile):
 # This represents any kind of binary data that's been "linked" (or had some
 # similar process applied to it) so that it can be used by a linker/loader,
 # installed to the system, etc.
-@_clone_traits(exclude={'runtime_deps', 'linktime_deps', 'package_deps'})
+@_clone_traits(exclude={'runtime_deps', 'linktime_deps', 'package_deps',
+                        'parent'})
 class LinkedBinary(Binary):
+    # `parent` is only set when this is part of a DualUseLibrary.
+    __slots__ = ('runtime_deps', 'linktime_deps', 'package_deps', 'parent')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.runtime_deps = []
-        self.linktime_deps = []
-        self.package_deps = []
+        self.runtime_deps = _empty_list
+        self.linktime_deps = _empty_list
+        self.package_deps = _empty_list
 
     @property
     def install_deps(self):
@@ -212,12 +234,14 @@ class LinkedBinary(Binary):
 
 
 class Executable(LinkedBinary):
+    __slots__ = ()
     install_kind = 'program'
     install_root = _InstallRoot.bindir
 
 
-@_clone_traits(exclude={'parent'})
 class Library(LinkedBinary):
+    __slots__ = ()
+
     @property
     def runtime_file(self):
         return None
@@ -227,11 +251,13 @@ class Library(LinkedBinary):
 # Multiple inheritance is a sign that we should perhaps switch to a trait-based
 # system though...
 class ExecutableLibrary(Executable, Library):
+    __slots__ = ()
     install_kind = 'program'
     install_root = _InstallRoot.libdir
 
 
 class SharedLibrary(Library):
+    __slots__ = ()
     install_kind = 'program'
 
     @property
@@ -241,6 +267,8 @@ class SharedLibrary(Library):
 
 @_clone_traits(exclude={'format', 'lang'})
 class LinkLibrary(SharedLibrary):
+    __slots__ = ('library',)
+
     def __init__(self, path, library):
         super().__init__(path, library.format, library.lang)
         self.library = library
@@ -258,6 +286,8 @@ class LinkLibrary(SharedLibrary):
 
 @_clone_traits(subfiles={'soname': 'soname', 'link': 'linkname'})
 class VersionedSharedLibrary(SharedLibrary):
+    __slots__ = ('soname', 'link')
+
     def __init__(self, path, format, lang, soname, linkname):
         super().__init__(path, format, lang)
         self.soname = LinkLibrary(soname, self)
@@ -265,12 +295,16 @@ class VersionedSharedLibrary(SharedLibrary):
 
 
 class StaticLibrary(Library):
+    __slots__ = ('forward_opts',)
+
     def __init__(self, path, format, lang=None, forward_opts=None):
         super().__init__(path, format, lang)
         self.forward_opts = forward_opts or {}
 
 
 class WholeArchive(StaticLibrary):
+    __slots__ = ('library',)
+
     def __init__(self, library):
         self.library = library
 
@@ -281,7 +315,11 @@ class WholeArchive(StaticLibrary):
 
 
 class ExportFile(File):
-    private = True
+    __slots__ = ()
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.private = True
 
 
 # This refers specifically to DLL files that have an import library, not just
@@ -291,11 +329,12 @@ class ExportFile(File):
 @_clone_traits(subfiles={'import_lib': 'import_name',
                          'export_file': 'export_name'})
 class DllBinary(LinkedBinary):
+    __slots__ = ('import_lib', 'export_file')
     install_root = _InstallRoot.bindir
-    private = True
 
     def __init__(self, path, format, lang, import_name, export_name=None):
         super().__init__(path, format, lang)
+        self.private = True
         self.import_lib = LinkLibrary(import_name, self)
         self.export_file = ExportFile(export_name) if export_name else None
 
@@ -342,4 +381,5 @@ class DualUseLibrary:
 
 
 class PkgConfigPcFile(File):
+    __slots__ = ()
     install_root = _InstallRoot.libdir
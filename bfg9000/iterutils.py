@@ -1,9 +1,10 @@
+import heapq
 from collections import Iterable
 
-__all__ = ['default_sentinel', 'first', 'flatten', 'isiterable', 'iterate',
-           'iterate_each', 'map_iterable', 'listify', 'merge_dicts',
-           'merge_into_dict', 'recursive_walk', 'slice_dict', 'tween',
-           'uniques', 'unlistify']
+__all__ = ['default_sentinel', 'empty_list', 'first', 'flatten', 'isiterable',
+           'iterate', 'iterate_each', 'map_iterable', 'listify', 'merge_dicts',
+           'merge_into_dict', 'recursive_walk', 'slice_dict',
+           'transitive_closure', 'tween', 'uniques', 'unlistify']
 
 # This could go in a funcutils module if we ever create one...
 default_sentinel = object()
@@ -115,6 +116,61 @@ def recursive_walk(thing, attr, children_attr=None):
             yield j
 
 
+def transitive_closure(things, children):
+    """Return `things` along with everything reachable from them via
+    `children(thing)`, each exactly once. The result is topologically sorted,
+    so every item comes before anything reachable from it (e.g. a static
+    library before the libraries it depends on); otherwise, items keep the
+    order they were first found in. Cycles are broken according to that order
+    too."""
+    order = []
+    edges = {}
+
+    def visit(thing):
+        if thing not in edges:
+            edges[thing] = None
+            order.append(thing)
+
+    for i in things:
+        visit(i)
+    # `order` grows as we find new items, so this walks breadth-first.
+    for i in order:
+        edges[i] = list(children(i))
+        for j in edges[i]:
+            visit(j)
+
+    # Now, sort the items with Kahn's algorithm, always picking the earliest
+    # (by first appearance) of the items whose predecessors are all done.
+    position = {i: n for n, i in enumerate(order)}
+    indegree = dict.fromkeys(order, 0)
+    for i in order:
+        for j in edges[i]:
+            indegree[j] += 1
+
+    ready = [n for n, i in enumerate(order) if indegree[i] == 0]
+    result = []
+    cursor = 0
+    while len(result) < len(order):
+        if not ready:
+            # Everything left is part of (or reachable from) a cycle, so just
+            # take the earliest remaining item.
+            while indegree[order[cursor]] < 0:
+                cursor += 1
+            ready.append(cursor)
+
+        thing = order[heapq.heappop(ready)]
+        if indegree[thing] < 0:
+            continue
+        indegree[thing] = -1
+        result.append(thing)
+        for j in edges[thing]:
+            if indegree[j] > 0:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    heapq.heappush(ready, position[j])
+    return result
+
+
 def merge_into_dict(dst, *args):
     for d in args:
         for k, v in d.items():
@@ -153,3 +209,24 @@ def slice_dict(d, keys):
         if k in d:
             result[k] = d.pop(k)
     return result
+
+
+class _EmptyList(list):
+    # A list that's always empty. Objects that would otherwise each hold their
+    # own (usually empty) list can share `empty_list` instead; `+=` on it
+    # produces a new list rather than modifying the shared one.
+    __slots__ = ()
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError("'empty_list' is immutable")
+
+    append = extend = insert = __setitem__ = __delitem__ = __immutable
+
+    def __iadd__(self, other):
+        return list(other)
+
+    def __reduce__(self):
+        return 'empty_list'
+
+
+empty_list = _EmptyList()
@@ -104,6 +104,9 @@ class Languages:
     def __contains__(self, name):
         return name in self._langs
 
+    def __iter__(self):
+        return iter(self._langs.values())
+
     def _add(self, info):
         self._langs[info.name] = info
         for kind, exts in info._exts.items():
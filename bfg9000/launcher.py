@@ -0,0 +1,29 @@
+import os
+import sys
+
+from . import regen_state
+
+
+def _refresh_builddir(args):
+    # Return the build directory if `args` is a plain `refresh [BUILDDIR]`
+    # (which is how the build files run us), or None for anything else.
+    if not args or args[0] != 'refresh' or len(args) > 2:
+        return None
+    builddir = args[1] if len(args) == 2 else '.'
+    if builddir.startswith('-'):
+        return None
+    return builddir
+
+
+def main():
+    # `bfg9000 refresh` runs on every build, and usually has nothing to do.
+    # Find that out before importing the rest of bfg9000, which takes much
+    # longer than the check itself. If the check can't tell, or there's work
+    # to do, the full driver takes it from here.
+    builddir = _refresh_builddir(sys.argv[1:])
+    if ( builddir is not None and os.path.isdir(builddir) and
+         regen_state.check(builddir) is True ):
+        return 0
+
+    from .driver import main
+    return main()
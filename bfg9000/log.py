@@ -4,6 +4,7 @@ import os
 import sys
 import traceback
 import warnings
+from contextlib import contextmanager
 from logging import getLogger, CRITICAL, ERROR, WARNING, INFO, DEBUG  # noqa
 
 from .safe_str import safe_string
@@ -140,6 +141,32 @@ def init(color='auto', debug=False, warn_once=False, stream=None):
     logging.root.addHandler(stackful)
 
 
+@contextmanager
+def redirect(stream):
+    # Temporarily send all our log output to `stream`, e.g. so a server can
+    # forward it to its client.
+    handlers = [i for i in logging.root.handlers
+                if isinstance(i, logging.StreamHandler)]
+    old_streams = [i.stream for i in handlers]
+    for i in handlers:
+        i.stream = stream
+    try:
+        yield
+    finally:
+        for i, old in zip(handlers, old_streams):
+            i.stream = old
+
+
+def write_output(text):
+    # Write log output that was already formatted elsewhere (e.g. captured
+    # via `redirect` in another process) to wherever our log output goes.
+    for i in logging.root.handlers:
+        if isinstance(i, logging.StreamHandler):
+            i.stream.write(text)
+            i.flush()
+            break
+
+
 def log_stack(level, message, *args, stacklevel=0, show_stack=True, **kwargs):
     extra = {
         'full_stack': traceback.extract_stack()[1:-1 - stacklevel],
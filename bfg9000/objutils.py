@@ -3,7 +3,8 @@ from itertools import chain
 
 from .iterutils import isiterable, iterate
 
-__all__ = ['objectify', 'hashify', 'memoize']
+__all__ = ['objectify', 'hashify', 'memoize', 'memoize_method', 'slot_names',
+           'slot_items']
 
 
 def objectify(thing, valid_type, creator=None, in_type=str, **kwargs):
@@ -56,3 +57,37 @@ def memoize(fn):
 
     wrapper._reset = reset
     return wrapper
+
+
+def memoize_method(fn):
+    # Like `memoize`, but store the results on the instance, so they're freed
+    # along with it and aren't shared with other (equal) instances.
+    cache_name = '_memoize_cache_' + fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        cache = self.__dict__.setdefault(cache_name, {})
+        key = (hashify(args), hashify(kwargs))
+        if key in cache:
+            return cache[key]
+        result = cache[key] = fn(self, *args, **kwargs)
+        return result
+
+    return wrapper
+
+
+@memoize
+def slot_names(cls):
+    return tuple(chain.from_iterable(
+        iterate(getattr(i, '__slots__', ())) for i in reversed(cls.__mro__)
+    ))
+
+
+def slot_items(obj):
+    # Like `vars(obj).items()`, but for objects using `__slots__`. Slots that
+    # haven't been set are skipped.
+    for name in slot_names(type(obj)):
+        try:
+            yield name, getattr(obj, name)
+        except AttributeError:
+            pass
@@ -8,14 +8,85 @@ from .platforms.framework import Framework
 
 
 class option_list:
+    # Most option lists are short, so only build an index of their options
+    # (see `_key()` below) once they get big enough that looking for
+    # duplicates by comparing against every option would be slow.
+    _index_threshold = 16
+
     def __init__(self, *args):
         self._options = []
+        self._index = None
+        self._shared = False
         self.collect(*args)
 
+    @staticmethod
+    def _key(option):
+        # Options that use the default `matches()` match when they have the
+        # same type and values, so we can key them on exactly that.
+        t = type(option)
+        if not ( isinstance(option, Option) and
+                 t.matches is Option.matches and t.__eq__ is Option.__eq__ ):
+            return None
+        return (t,) + tuple(
+            tuple(v) if isinstance(v, list) else v
+            for v in (getattr(option, i) for i in t.__slots__)
+        )
+
+    @staticmethod
+    def _add_key(index, option, key):
+        # The index holds the set of keys for all the keyed options, and a
+        # list of the options without a (hashable) key.
+        if key is not None:
+            try:
+                index[0].add(key)
+                return
+            except TypeError:
+                pass
+        index[1].append(option)
+
+    def _build_index(self):
+        index = (set(), [])
+        for i in self._options:
+            if not isinstance(i, safe_str.stringy_types):
+                self._add_key(index, i, self._key(i))
+        return index
+
+    def _unshare(self):
+        # Copies share their contents until one of them is modified.
+        if self._shared:
+            self._options = list(self._options)
+            if self._index is not None:
+                self._index = (set(self._index[0]), list(self._index[1]))
+            self._shared = False
+
+    def _has_match(self, option, key):
+        if self._index is None:
+            if len(self._options) < self._index_threshold:
+                key = None
+            else:
+                self._index = self._build_index()
+
+        if key is not None:
+            keys, unkeyed = self._index
+            try:
+                return ( key in keys or
+                         any(option.matches(i) for i in unkeyed) )
+            except TypeError:
+                pass
+        return any(option.matches(i) for i in self._options)
+
     def append(self, option):
-        if ( isinstance(option, safe_str.stringy_types) or
-             not any(option.matches(i) for i in self._options) ):
+        if isinstance(option, safe_str.stringy_types):
+            self._unshare()
+            self._options.append(option)
+            return
+
+        key = self._key(option)
+        if not self._has_match(option, key):
+            self._unshare()
             self._options.append(option)
+            if self._index is not None:
+                self._add_key(self._index, option, key)
 
     def extend(self, options):
         for i in options:
@@ -30,7 +101,11 @@ class option_list:
                 self.append(i)
 
     def copy(self):
-        return option_list(self._options)
+        result = option_list()
+        result._options = self._options
+        result._index = self._index
+        result._shared = self._shared = True
+        return result
 
     def filter(self, type):
         return option_list(i for i in self._options if isinstance(i, type))
@@ -47,7 +122,9 @@ class option_list:
         return self._options[key]
 
     def __setitem__(self, key, value):
+        self._unshare()
         self._options[key] = value
+        self._index = None
 
     def __eq__(self, rhs):
         return type(self) == type(rhs) and self._options == rhs._options
@@ -79,6 +79,34 @@ def makedirs(path, mode=0o777, exist_ok=False):
 _makedirs = makedirs
 
 
+def _same_contents(filename1, filename2):
+    try:
+        with open(filename1, 'rb') as f1, open(filename2, 'rb') as f2:
+            return f1.read() == f2.read()
+    except OSError:
+        return False
+
+
+@contextmanager
+def write_if_changed(filename, mode='w'):
+    # Write to a temporary file and only move it into place if its contents
+    # differ from the existing file. This way, regenerating a file with the
+    # same contents leaves its modification time alone, so nothing that
+    # depends on it gets rebuilt.
+    tmpname = '{}.{}.tmp'.format(filename, os.getpid())
+    try:
+        with open(tmpname, mode) as out:
+            yield out
+    except BaseException:
+        os.remove(tmpname)
+        raise
+
+    if _same_contents(tmpname, filename):
+        os.remove(tmpname)
+    else:
+        os.replace(tmpname, filename)
+
+
 @contextmanager
 def pushd(dirname, makedirs=False, mode=0o777, exist_ok=False):
     old = os.getcwd()
@@ -86,5 +114,7 @@ def pushd(dirname, makedirs=False, mode=0o777, exist_ok=False):
         _makedirs(dirname, mode, exist_ok)
 
     os.chdir(dirname)
-    yield
-    os.chdir(old)
+    try:
+        yield
+    finally:
+        os.chdir(old)
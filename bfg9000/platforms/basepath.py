@@ -40,14 +40,23 @@ class BasePath(safe_str.safe_string):
             destdir = root.destdir
             root = root.root
 
-        if ( path == posixpath.pardir or
-             path.startswith(posixpath.pardir + posixpath.sep) ):
-            raise ValueError("too many '..': path cannot escape root")
+        self.__check_escape(path)
 
         self.suffix = drive + path
         self.root = root
         self.destdir = destdir
 
+    @classmethod
+    def __create(cls, suffix, root, destdir):
+        # Create a path from an already-normalized suffix and a plain root.
+        # This skips all the work in `__init__`, which adds up when deriving
+        # lots of paths from existing ones.
+        self = cls.__new__(cls)
+        self.suffix = suffix
+        self.root = root
+        self.destdir = destdir
+        return self
+
     @classmethod
     def abspath(cls, path):
         drive, path = cls.__normalize(path, expand_user=True)
@@ -82,6 +91,12 @@ class BasePath(safe_str.safe_string):
             path = ''
         return drive, path
 
+    @staticmethod
+    def __check_escape(path):
+        if ( path == posixpath.pardir or
+             path.startswith(posixpath.pardir + posixpath.sep) ):
+            raise ValueError("too many '..': path cannot escape root")
+
     @staticmethod
     def __join(path1, path2):
         path = posixpath.normpath(posixpath.join(path1, path2))
@@ -94,31 +109,44 @@ class BasePath(safe_str.safe_string):
 
     def cross(self, env):
         cls = env.target_platform.Path
-        return cls(self.suffix, self.root)
+        return cls.__create(self.suffix, self.root, False)
 
     def parent(self):
         if not self.suffix:
             raise ValueError('already at root')
-        return type(self)(posixpath.dirname(self.suffix), self.root,
-                          self.destdir)
+        parent = posixpath.dirname(self.suffix)
+        if self.root == Root.absolute:
+            return type(self)(parent, self.root)
+        return self.__create(parent, self.root, self.destdir)
 
     def append(self, path):
         drive, path = self.__normalize(path, expand_user=True)
-        if not posixpath.isabs(path):
-            path = self.__join(self.suffix, path)
-        return type(self)(drive + path, self.root, self.destdir)
+        if posixpath.isabs(path):
+            return self.__create(drive + path, Root.absolute, False)
+
+        path = self.__join(self.suffix, path)
+        if self.root == Root.absolute:
+            return type(self)(path, self.root)
+        self.__check_escape(path)
+        return self.__create(path, self.root, self.destdir)
 
     def ext(self):
         return posixpath.splitext(self.suffix)[1]
 
+    def __extend(self, name, extra):
+        # Append `extra` (e.g. a file extension) to `name`, a normalized suffix
+        # for this path's root. Unless `extra` could add a new path component,
+        # the result is still normalized.
+        if ( name and self.root != Root.absolute and
+             '/' not in extra and '\\' not in extra ):
+            return self.__create(name + extra, self.root, self.destdir)
+        return type(self)(name + extra, self.root, self.destdir)
+
     def addext(self, ext):
-        return type(self)(self.suffix + ext, self.root, self.destdir)
+        return self.__extend(self.suffix, ext)
 
     def stripext(self, replace=None):
-        name = posixpath.splitext(self.suffix)[0]
-        if replace:
-            name += replace
-        return type(self)(name, self.root, self.destdir)
+        return self.__extend(posixpath.splitext(self.suffix)[0], replace or '')
 
     def splitleaf(self):
         return self.parent(), self.basename()
@@ -136,15 +164,29 @@ class BasePath(safe_str.safe_string):
         if self.root != start.root:
             raise ValueError('source mismatch')
 
-        rel = posixpath.relpath(self.suffix or posixpath.curdir,
-                                start.suffix or posixpath.curdir)
+        # Both suffixes are normalized and relative to the same root, so we can
+        # just compare their components instead of using `posixpath.relpath`
+        # (which looks up the current directory to make them absolute).
+        bits = self.split() if self.suffix else []
+        start_bits = start.split() if start.suffix else []
+        common = 0
+        for i, j in zip(bits, start_bits):
+            if i != j:
+                break
+            common += 1
+        rel = posixpath.sep.join(
+            [posixpath.pardir] * (len(start_bits) - common) + bits[common:]
+        ) or posixpath.curdir
         if prefix and rel == posixpath.curdir:
             return prefix
         result = posixpath.join(prefix, rel)
         return self.__localize(result) if localize else result
 
     def reroot(self, root=Root.builddir):
-        return type(self)(self.suffix, root, self.destdir)
+        if ( self.root == Root.absolute or root == Root.absolute or
+             isinstance(root, BasePath) or (self.destdir and root in Root) ):
+            return type(self)(self.suffix, root, self.destdir)
+        return self.__create(self.suffix, root, self.destdir)
 
     def to_json(self):
         return (self.suffix, self.root.name, self.destdir)
@@ -2,8 +2,9 @@ import platform
 import re
 import subprocess
 from collections import namedtuple
-from pkg_resources import get_entry_info
 
+from .. import trace
+from ..entry_points import get_entry_point
 from ..objutils import memoize
 from ..versioning import SpecifierSet, Version
 
@@ -52,9 +53,12 @@ def platform_name():
 
     if system == 'windows':
         try:
-            uname = subprocess.check_output(
-                'uname', universal_newlines=True
-            ).lower()
+            with trace.command(['uname']) as record:
+                uname = subprocess.check_output(
+                    'uname', universal_newlines=True
+                ).lower()
+                if record:
+                    record.returncode, record.output_size = 0, len(uname)
             if uname.startswith('cygwin'):
                 return 'cygwin'
         except OSError:
@@ -69,9 +73,12 @@ def platform_name():
         return 'msdos'
     elif system == 'linux':
         try:
-            distro = subprocess.check_output(
-                ['lsb_release', '-is'], universal_newlines=True
-            ).lower()
+            with trace.command(['lsb_release', '-is']) as record:
+                distro = subprocess.check_output(
+                    ['lsb_release', '-is'], universal_newlines=True
+                ).lower()
+                if record:
+                    record.returncode, record.output_size = 0, len(distro)
             if distro == 'android':
                 return 'android'
         except OSError:
@@ -133,11 +140,11 @@ class Platform:
 @memoize
 def _get_platform_info(kind, genus, species, arch):
     entry_point = 'bfg9000.platforms.{}'.format(kind)
-    entry = get_entry_info('bfg9000', entry_point, genus)
+    entry = get_entry_point('bfg9000', entry_point, genus)
     if entry is None:
         # Fall back to a generic POSIX system if we don't recognize the
         # platform name.
-        entry = get_entry_info('bfg9000', entry_point, 'posix')
+        entry = get_entry_point('bfg9000', entry_point, 'posix')
     return entry.load()(genus, species, arch)
 
 
@@ -11,6 +11,9 @@ class Framework:
     def full_name(self):
         return self.name + ',' + self.suffix if self.suffix else self.name
 
+    def __hash__(self):
+        return hash((self.name, self.suffix))
+
     def __eq__(self, rhs):
         return (type(self) == type(rhs) and self.name == rhs.name and
                 self.suffix == rhs.suffix)
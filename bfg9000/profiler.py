@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+import time
+
+__all__ = ['init', 'is_enabled', 'span', 'write']
+
+_events = None
+_lock = threading.Lock()
+_start = time.perf_counter()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_span = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        event = {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': (self.start - _start) * 1000000,
+            'dur': (end - self.start) * 1000000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if self.args:
+            event['args'] = self.args
+
+        with _lock:
+            if _events is not None:
+                _events.append(event)
+
+
+def init(enabled):
+    global _events
+    with _lock:
+        _events = [] if enabled else None
+
+
+def is_enabled():
+    return _events is not None
+
+
+def span(name, category='bfg9000', **args):
+    # When profiling is disabled, return a shared do-nothing span so that
+    # instrumented code stays cheap.
+    if _events is None:
+        return _null_span
+    return _Span(name, category, args)
+
+
+def write(out):
+    with _lock:
+        events = list(_events or [])
+    # Write this in Chrome's trace event format, which can be viewed in
+    # `chrome://tracing`, Perfetto, or speedscope.
+    json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, out)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+from .app_version import version as bfg_version
+
+# This module is used to check whether the build files are current before the
+# rest of bfg9000 is imported (see `launcher`), so it should only depend on
+# the standard library.
+
+__all__ = ['check', 'file_digest', 'inputs_unchanged', 'listings_unchanged',
+           'load_state', 'program_identity', 'state_name', 'state_version',
+           'touch_outputs']
+
+state_name = '.bfg_regenerate'
+state_version = 4
+
+
+def file_digest(filename):
+    with open(filename, 'rb') as inp:
+        return hashlib.sha1(inp.read()).hexdigest()
+
+
+def program_identity(filename):
+    stat = os.stat(filename)
+    return [filename, stat.st_size, stat.st_mtime_ns]
+
+
+def load_state(builddir):
+    with open(os.path.join(builddir, state_name)) as inp:
+        state = json.load(inp)
+    if ( state['version'] != state_version or
+         state['bfg_version'] != bfg_version ):
+        raise ValueError('incompatible state')
+    return state
+
+
+def inputs_unchanged(builddir, state):
+    """Check that the build script's inputs, the saved environment, and the
+    programs the script ran are all the same as when `state` was written."""
+    envfile, digest = state['environ']
+    if file_digest(os.path.join(builddir, envfile)) != digest:
+        return False
+    for name, digest in state['inputs']:
+        if file_digest(name) != digest:
+            return False
+    for i in state['programs']:
+        if program_identity(i[0]) != i:
+            return False
+    return True
+
+
+def listings_unchanged(state):
+    """Check that none of the directories read by the build script's
+    `find_files` searches have been modified since they were listed. If so,
+    the searches would find the same results as before; otherwise, only
+    running the searches again can tell."""
+    try:
+        for dirname, mtime in state['listings']:
+            if mtime is None or os.stat(dirname).st_mtime_ns != mtime:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def touch_outputs(state):
+    for i in state['touch']:
+        os.utime(i)
+
+
+def check(builddir):
+    """Check if the build files in `builddir` are still current without
+    importing the rest of bfg9000. Return True (after touching any outputs the
+    backend expects to be updated) if so, False if not, and None if we can't
+    tell without re-running the build script's `find_files` searches."""
+    try:
+        state = load_state(builddir)
+        # We can't re-run some searches (e.g. those with a filter) without the
+        # build script, so we have no choice but to run it.
+        if state['searches'] is None:
+            return False
+        if not inputs_unchanged(builddir, state):
+            return False
+        if state['searches'] and not listings_unchanged(state):
+            return None
+        touch_outputs(state)
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
@@ -1,4 +1,5 @@
 import string as _string
+from itertools import groupby
 
 from . import iterutils
 
@@ -15,6 +16,8 @@ class safe_string:
 
 
 class safe_string_ops:
+    __slots__ = ()
+
     def __add__(self, rhs):
         return jbos(safe_str(self), safe_str(rhs))
 
@@ -46,6 +49,9 @@ class literal_types(safe_string):
     def __repr__(self):
         return '`{}`'.format(self.string)
 
+    def __hash__(self):
+        return hash(self.string)
+
     def __eq__(self, rhs):
         if type(self) is not type(rhs):
             return NotImplemented
@@ -83,22 +89,21 @@ class jbos(safe_string):  # Just a Bunch of Strings
                 else:
                     raise TypeError(type(i))
 
-        bits = filter(None, flatten_bits(value))
-        try:
-            last = next(bits)
-        except StopIteration:
-            return
-
-        for i in bits:
-            same_type = type(i) == type(last)
-            if same_type and isinstance(i, str):
-                last += i
-            elif same_type and isinstance(i, literal_types):
-                last = type(i)(last.string + i.string)
+        # Merge each run of adjacent strings (or literals) of the same type all
+        # at once so that building a jbos from many bits takes linear time.
+        for kind, run in groupby(filter(None, flatten_bits(value)), type):
+            first = next(run)
+            rest = list(run)
+            if not rest:
+                yield first
+            elif issubclass(kind, str):
+                yield ''.join([first] + rest)
+            elif issubclass(kind, literal_types):
+                yield kind(''.join(i.string for i in [first] + rest))
             else:
-                yield last
-                last = i
-        yield last
+                yield first
+                for i in rest:
+                    yield i
 
     @property
     def bits(self):
@@ -130,7 +135,9 @@ class jbos(safe_string):  # Just a Bunch of Strings
 def join(iterable, delim):
     if delim:
         iterable = iterutils.tween(iterable, delim)
-    return sum(iterable, jbos()).simplify()
+    # Build the result all at once; adding each item to a jbos in turn would
+    # re-canonicalize the whole thing every time.
+    return jbos(*(safe_str(i) for i in iterable)).simplify()
 
 
 def format_field(value, format_spec):
@@ -0,0 +1,153 @@
+import json
+import os
+import socket
+
+from .app_version import version as bfg_version
+from .cache import user_cache_dir
+from .environment import Environment
+
+__all__ = ['Server', 'is_supported', 'request', 'socket_path']
+
+is_supported = hasattr(socket, 'AF_UNIX')
+
+
+def socket_path(env=os.environ):
+    return (env.get('BFG9000_SERVER') or
+            os.path.join(user_cache_dir(env), 'server.sock'))
+
+
+# A server only handles requests from clients running the same version of
+# bfg9000, since otherwise it might e.g. read or write an environment file in a
+# format the client doesn't expect.
+_version = {'bfg9000': bfg_version, 'environment': Environment.version}
+
+
+def _send(sock, message):
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class _ClientStream:
+    # A file-like object that forwards anything written to it (e.g. log
+    # messages) to the client.
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, text):
+        _send(self.sock, {'output': text})
+
+    def flush(self):
+        pass
+
+
+def request(path, message, stream):
+    """Send `message` to the server listening at `path`, writing any output it
+    produces to `stream`. Return the server's result, or None if the server
+    couldn't be reached or refused the request (in which case the caller
+    should do the work itself)."""
+    if not is_supported or not os.path.exists(path):
+        return None
+
+    try:
+        sock = _connect(path)
+    except OSError:
+        return None
+
+    try:
+        _send(sock, {'version': _version, 'message': message})
+        with sock.makefile('r', encoding='utf-8') as f:
+            for line in f:
+                data = json.loads(line)
+                if 'output' in data:
+                    stream.write(data['output'])
+                elif 'result' in data:
+                    return data['result']
+                elif 'error' in data:
+                    return None
+    except (OSError, ValueError):
+        pass
+    finally:
+        sock.close()
+    # The server went away before finishing our request.
+    return None
+
+
+class Server:
+    """A server listening on a Unix domain socket at `path`, which passes each
+    request it receives (one at a time) to `handler` along with a stream for
+    any output to send back to the client. If the request is malformed or
+    `handler` raises an exception, the client is sent an error instead."""
+
+    def __init__(self, path, handler):
+        self.path = path
+        self.handler = handler
+
+        if os.path.exists(path):
+            try:
+                _connect(path).close()
+            except OSError:
+                # Nobody's listening, so this is left over from an earlier
+                # server that didn't shut down cleanly.
+                os.remove(path)
+            else:
+                raise OSError('a server is already listening on {!r}'
+                              .format(path))
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only let the current user connect to the socket, since requests can
+        # run arbitrary build scripts.
+        old_umask = os.umask(0o077)
+        try:
+            self._sock.bind(path)
+        finally:
+            os.umask(old_umask)
+        self._sock.listen(16)
+
+    @staticmethod
+    def _read_request(conn):
+        with conn.makefile('r', encoding='utf-8') as f:
+            data = json.loads(f.readline())
+        if not isinstance(data, dict) or not isinstance(data.get('message'),
+                                                        dict):
+            raise ValueError('malformed request')
+        if data.get('version') != _version:
+            raise ValueError('version mismatch: client is {!r}, server is {!r}'
+                             .format(data.get('version'), _version))
+        return data['message']
+
+    def handle_one(self):
+        conn = self._sock.accept()[0]
+        try:
+            message = self._read_request(conn)
+            reply = {'result': self.handler(message, _ClientStream(conn))}
+        except Exception as e:
+            reply = {'error': str(e) or type(e).__name__}
+
+        try:
+            _send(conn, reply)
+        except OSError:
+            # The client hung up; just move on.
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        while True:
+            self.handle_one()
+
+    def close(self):
+        self._sock.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -3,6 +3,7 @@ import subprocess
 from enum import Enum
 
 from .list import shell_list  # noqa
+from .. import trace
 from ..iterutils import listify
 from ..path import Path
 from ..platforms import platform_name
@@ -19,13 +20,65 @@ Mode = Enum('Mode', ['normal', 'pipe', 'stdout', 'devnull'])
 CalledProcessError = subprocess.CalledProcessError
 
 
+class _PathIndex:
+    """An index of the files in each directory of a PATH. Each directory is
+    only listed once (the first time it's needed), so that looking up a
+    program that *isn't* in a given directory doesn't require touching the
+    filesystem again."""
+
+    def __init__(self):
+        self._dirs = {}
+
+    @staticmethod
+    def _key(filename):
+        # Fold case so that the index never misses a file on case-insensitive
+        # filesystems; any false hits this causes elsewhere are caught by the
+        # double-check in `exists` below.
+        return filename.casefold()
+
+    def _listing(self, path):
+        try:
+            return self._dirs[path]
+        except KeyError:
+            try:
+                files = {self._key(i) for i in os.listdir(path)}
+            except OSError:
+                # We can't list this directory (e.g. it's executable but not
+                # readable), but it might still hold what we want, so fall
+                # back to checking each candidate directly.
+                files = None
+            self._dirs[path] = files
+            return files
+
+    def exists(self, path, filename):
+        # Double-check with the filesystem on a hit, since the listing can't
+        # tell us about e.g. broken symlinks.
+        files = self._listing(path)
+        return ((files is None or self._key(filename) in files) and
+                os.path.exists(os.path.join(path, filename)))
+
+
+_path_indexes = {}
+
+
+def clear_path_cache():
+    _path_indexes.clear()
+
+
 def which(names, env=os.environ, base_dirs=None, resolve=False,
           kind='executable'):
-    paths = env.get('PATH', os.defpath).split(os.pathsep)
+    path_var = env.get('PATH', os.defpath)
+    paths = path_var.split(os.pathsep)
     exts = ['']
     if platform_name() in windows_names + ('cygwin',):
         exts.extend(env.get('PATHEXT', '').split(os.pathsep))
 
+    # Changing PATH or PATHEXT (e.g. in a toolchain file) gets a fresh index.
+    index_key = (path_var, tuple(exts))
+    if index_key not in _path_indexes:
+        _path_indexes[index_key] = _PathIndex()
+    index = _path_indexes[index_key]
+
     names = listify(names)
     if len(names) == 0:
         raise TypeError('must supply at least one name')
@@ -34,18 +87,21 @@ def which(names, env=os.environ, base_dirs=None, resolve=False,
         name = listify(name)
         check = (name[0].string(base_dirs) if isinstance(name[0], Path)
                  else name[0])
-        if os.path.isabs(check):
-            fullpaths = [check]
-        else:
-            search = ['.'] if os.path.dirname(check) else paths
-            fullpaths = [os.path.normpath(os.path.join(path, check))
-                         for path in search]
-
-        for fullpath in fullpaths:
+        if os.path.isabs(check) or os.path.dirname(check):
+            fullpath = (check if os.path.isabs(check) else
+                        os.path.normpath(os.path.join('.', check)))
             for ext in exts:
                 withext = fullpath + ext
                 if os.path.exists(withext):
                     return [withext] + name[1:] if resolve else name
+            continue
+
+        for path in paths:
+            dirname = os.path.normpath(path)
+            for ext in exts:
+                if index.exists(dirname, check + ext):
+                    withext = os.path.normpath(os.path.join(path, check + ext))
+                    return [withext] + name[1:] if resolve else name
 
     raise IOError('unable to find {kind}{filler} {names}'.format(
         kind=kind, filler='; tried' if len(names) > 1 else '',
@@ -68,11 +124,16 @@ def execute(args, shell=False, env=None, base_dirs=None, stdout=Mode.normal,
                  Mode.stdout : subprocess.STDOUT,
                  Mode.devnull: subprocess.DEVNULL}).get(mode, mode)
 
-    proc = subprocess.Popen(
-        args, universal_newlines=True, shell=shell, env=env,
-        stdout=conv(stdout), stderr=conv(stderr)
-    )
-    output = proc.communicate()
+    with trace.command(args) as record:
+        proc = subprocess.Popen(
+            args, universal_newlines=True, shell=shell, env=env,
+            stdout=conv(stdout), stderr=conv(stderr)
+        )
+        output = proc.communicate()
+        if record:
+            record.returncode = proc.returncode
+            record.output_size = sum(len(i) for i in output if i is not None)
+
     if not (returncode == 'any' or
             (returncode == 'fail' and proc.returncode != 0) or
             proc.returncode in listify(returncode)):
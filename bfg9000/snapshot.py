@@ -0,0 +1,177 @@
+import gc
+import io
+import pickle
+import types
+
+from .objutils import slot_items
+
+__all__ = ['KnownObjects', 'Snapshot']
+
+# Objects of these types are usually pickled by name (or can't be pickled at
+# all), so there's no need to look inside them for other objects. We still
+# record the objects themselves, since some (e.g. wrapped builtins) can't be
+# found by name.
+_opaque_types = (type, types.ModuleType, types.FunctionType,
+                 types.BuiltinFunctionType, types.CodeType, types.FrameType)
+
+
+class KnownObjects:
+    """The set of objects reachable from `roots` at some point in time (e.g.
+    just before forking a worker process). When pickling the results from a
+    worker, these objects are stored by reference so that when the parent
+    process unpickles them, they resolve to the parent's original objects
+    instead of copies."""
+
+    def __init__(self, roots=()):
+        objects = {}
+        pending = list(roots)
+        while pending:
+            obj = pending.pop()
+            if id(obj) not in objects:
+                objects[id(obj)] = obj
+                if not isinstance(obj, _opaque_types):
+                    pending.extend(gc.get_referents(obj))
+        self._objects = objects
+
+    def dumps(self, value):
+        f = io.BytesIO()
+        pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+        objects = self._objects
+        pickler.persistent_id = lambda obj: (
+            id(obj) if id(obj) in objects else None
+        )
+        pickler.dump(value)
+        return f.getvalue()
+
+    def loads(self, data):
+        unpickler = pickle.Unpickler(io.BytesIO(data))
+        unpickler.persistent_load = self._objects.__getitem__
+        return unpickler.load()
+
+
+def _shape(value):
+    if isinstance(value, list):
+        return list(value)
+    elif isinstance(value, set):
+        return set(value)
+    elif isinstance(value, dict):
+        return {k: (v, _shape(v)) for k, v in value.items()}
+    return None
+
+
+def _diff(value, shape, changes):
+    if isinstance(value, list):
+        if ( len(value) < len(shape) or
+             any(i is not j for i, j in zip(value, shape)) ):
+            raise ValueError('unable to merge changes to existing items of '
+                             '{!r}'.format(value))
+        if len(value) > len(shape):
+            changes.append((value, 'extend', value[len(shape):]))
+    elif isinstance(value, set):
+        if not value >= shape:
+            raise ValueError('unable to merge removals from {!r}'
+                             .format(value))
+        added = value - shape
+        if added:
+            changes.append((value, 'update', added))
+    elif isinstance(value, dict):
+        if any(k not in value for k in shape):
+            raise ValueError('unable to merge removals from {!r}'
+                             .format(value))
+        for k, v in value.items():
+            if k not in shape or v is not shape[k][0]:
+                changes.append((value, 'setitem', k, v))
+            elif shape[k][1] is not None:
+                _diff(v, shape[k][1], changes)
+
+
+def _contents(value):
+    # Return a shallow copy of what `value` holds: the items of a container,
+    # or the attributes of any other object.
+    if isinstance(value, (list, set)):
+        return type(value)(value)
+    elif isinstance(value, dict):
+        return dict(value)
+    result = dict(slot_items(value))
+    if hasattr(value, '__dict__'):
+        result.update(vars(value))
+    return result
+
+
+def _same_contents(a, b):
+    if isinstance(a, set):
+        return a == b
+    elif isinstance(a, dict):
+        return a.keys() == b.keys() and all(v is b[k] for k, v in a.items())
+    return len(a) == len(b) and all(i is j for i, j in zip(a, b))
+
+
+class Snapshot:
+    """A record of the contents of a set of containers (lists, sets, and dicts,
+    including those nested in dicts). Later, `changes()` returns what's been
+    added to those containers since, and `apply()` makes the same changes
+    to the containers again, e.g. in another process.
+
+    Other changes can't be replayed this way, so `changes()` raises a
+    ValueError if it finds any: removing or replacing the existing items of a
+    container, or modifying an instance of one of `watch_types` (or any other
+    container) reachable from the containers."""
+
+    def __init__(self, roots, watch_types=()):
+        self.roots = list(roots)
+        self._shapes = [_shape(i) for i in self.roots]
+        self._watched = self._watch(watch_types)
+
+    def _watch(self, watch_types):
+        # Record what's held by each object reachable from our containers
+        # whose changes we can't replay, so we can tell later if it's changed.
+        tracked = {}
+
+        def track(value, shape):
+            tracked[id(value)] = value
+            if isinstance(value, dict):
+                for v, s in shape.values():
+                    if s is not None:
+                        track(v, s)
+
+        for value, shape in zip(self.roots, self._shapes):
+            track(value, shape)
+
+        watched, seen = [], set()
+        pending = list(tracked.values())
+        while pending:
+            value = pending.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+
+            if id(value) in tracked or isinstance(value, (tuple, frozenset)):
+                contents = value
+            elif ( isinstance(value, watch_types) or
+                   type(value) in (list, set, dict) ):
+                contents = _contents(value)
+                watched.append((value, contents))
+            else:
+                continue
+            pending.extend(contents.values() if isinstance(contents, dict)
+                           else contents)
+        return watched
+
+    def changes(self):
+        for value, contents in self._watched:
+            if not _same_contents(_contents(value), contents):
+                raise ValueError('unable to merge changes to {!r}'
+                                 .format(value))
+
+        changes = []
+        for value, shape in zip(self.roots, self._shapes):
+            _diff(value, shape, changes)
+        return changes
+
+    @staticmethod
+    def apply(changes):
+        for value, op, *args in changes:
+            if op == 'setitem':
+                value[args[0]] = args[1]
+            else:
+                getattr(value, op)(*args)
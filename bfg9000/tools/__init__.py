@@ -1,6 +1,7 @@
 import importlib
 import pkgutil
 
+from .. import profiler
 from ..objutils import memoize
 
 _builders = {}
@@ -32,7 +33,8 @@ def get_builder(env, lang):
         fn, multi = _builders[lang]
     except KeyError:
         raise ValueError('unknown language {!r}'.format(lang))
-    return fn(env, lang) if multi else fn(env)
+    with profiler.span('get_builder', 'tool', lang=lang):
+        return fn(env, lang) if multi else fn(env)
 
 
 def tool(name, lang=None):
@@ -0,0 +1,343 @@
+import os
+import re
+import shlex
+
+from .. import shell
+from ..exceptions import PackageResolutionError
+from ..iterutils import uniques
+from ..platforms.core import parse_triplet
+
+__all__ = ['BuiltinPkgConfig', 'PcFile', 'PcFileError', 'vercmp']
+
+_line_ex = re.compile(r'^([A-Za-z0-9_.]+)\s*([:=])\s*(.*)$')
+_var_ex = re.compile(r'\$(\$|\{([^}]*)\})')
+_requires_ex = re.compile(r'[<>!=]=?|[^\s,<>!=]+')
+_vercmp_ex = re.compile(r'[0-9]+|[A-Za-z]+')
+
+# Field names are case-insensitive (e.g. `CFlags` is a common spelling), so
+# map them all to their canonical forms.
+_field_names = {i.lower(): i for i in (
+    'Name', 'Description', 'URL', 'Version', 'Requires', 'Requires.private',
+    'Conflicts', 'Cflags', 'Cflags.private', 'Libs', 'Libs.private',
+)}
+
+_compare_ops = {
+    '=': lambda x: x == 0,
+    '!=': lambda x: x != 0,
+    '<': lambda x: x < 0,
+    '<=': lambda x: x <= 0,
+    '>': lambda x: x > 0,
+    '>=': lambda x: x >= 0,
+}
+
+
+class PcFileError(ValueError):
+    pass
+
+
+def vercmp(a, b):
+    # Compare two versions the same way pkg-config does (i.e. like RPM):
+    # split each into runs of digits or letters and compare them pairwise,
+    # with numeric runs always newer than alphabetic ones.
+    a, b = _vercmp_ex.findall(a), _vercmp_ex.findall(b)
+    for x, y in zip(a, b):
+        if x.isdigit() != y.isdigit():
+            return 1 if x.isdigit() else -1
+        if x.isdigit():
+            x, y = int(x), int(y)
+        if x != y:
+            return 1 if x > y else -1
+    return (len(a) > len(b)) - (len(a) < len(b))
+
+
+def _parse_requires(value):
+    tokens = _requires_ex.findall(value)
+    result = []
+    i = 0
+    while i < len(tokens):
+        name, op, version = tokens[i], None, None
+        i += 1
+        if i < len(tokens) and tokens[i] in _compare_ops:
+            if i + 1 == len(tokens):
+                raise PcFileError('expected version after {!r}'
+                                  .format(tokens[i]))
+            op, version = tokens[i:i + 2]
+            i += 2
+        result.append((name, op, version))
+    return result
+
+
+class PcFile:
+    def __init__(self, name, variables, fields):
+        self.name = name
+        self.variables = variables
+        self.fields = fields
+
+    @classmethod
+    def parse(cls, name, lines, variables=None):
+        variables = dict(variables or {})
+        fields = {}
+
+        def expand(value):
+            def sub(m):
+                if m.group(1) == '$':
+                    return '$'
+                try:
+                    return variables[m.group(2)]
+                except KeyError:
+                    raise PcFileError('undefined variable {!r} in {!r}'
+                                      .format(m.group(2), name))
+            return _var_ex.sub(sub, value)
+
+        pending = ''
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if line.endswith('\\'):
+                pending += line[:-1]
+                continue
+            line, pending = pending + line, ''
+
+            line = re.sub(r'(?<!\\)#.*$', '', line).replace('\\#', '#')
+            m = _line_ex.match(line.strip())
+            if not m:
+                continue
+
+            key, kind, value = m.groups()
+            if kind == '=':
+                variables[key] = expand(value.strip())
+            else:
+                fields[_field_names.get(key.lower(), key)] = expand(
+                    value.strip()
+                )
+
+        for i in ('Name', 'Description', 'Version'):
+            if i not in fields:
+                raise PcFileError('missing {!r} field in {!r}'
+                                  .format(i, name))
+        return cls(name, variables, fields)
+
+    @classmethod
+    def load(cls, filename, variables=None):
+        variables = dict(variables or {})
+        variables['pcfiledir'] = os.path.dirname(filename)
+        name = os.path.splitext(os.path.basename(filename))[0]
+        with open(filename) as inp:
+            return cls.parse(name, inp, variables)
+
+    @property
+    def version(self):
+        return self.fields['Version']
+
+    @property
+    def path(self):
+        return self.variables.get('pcfiledir')
+
+    def requires(self, private=False):
+        key = 'Requires.private' if private else 'Requires'
+        return _parse_requires(self.fields.get(key, ''))
+
+    def flags(self, field):
+        try:
+            return shlex.split(self.fields.get(field, ''))
+        except ValueError as e:
+            raise PcFileError('invalid {!r} field in {!r}: {}'
+                              .format(field, self.name, e))
+
+
+class BuiltinPkgConfig:
+    """A pure-Python implementation of the parts of pkg-config bfg9000 needs.
+    This reads `.pc` files directly instead of running a separate process for
+    each query, which can make configuring projects with many packages
+    considerably faster."""
+
+    def __init__(self, env):
+        self.env = env
+        self.command = ['builtin']
+        self._index = None
+        self._packages = {}
+
+    def _split_var(self, variables, name, default=()):
+        value = variables.get(name)
+        if value is None:
+            return list(default)
+        return [i for i in value.split(os.pathsep) if i]
+
+    @property
+    def _multiarch(self):
+        # Debian-style multiarch directories omit the vendor from the triplet,
+        # e.g. `x86_64-linux-gnu`.
+        triplet = parse_triplet(self.env.host_platform.triplet)
+        return '-'.join(i for i in (triplet.arch, triplet.sys, triplet.abi)
+                        if i)
+
+    def search_path(self):
+        variables = self.env.variables
+        result = self._split_var(variables, 'PKG_CONFIG_PATH')
+        if 'PKG_CONFIG_LIBDIR' in variables:
+            return result + self._split_var(variables, 'PKG_CONFIG_LIBDIR')
+
+        # Use the same default search path as pkg-config does on Debian-like
+        # systems (other systems just won't have the multiarch dirs).
+        if self.env.host_platform.family == 'posix':
+            for prefix in ('/usr/local', '/usr'):
+                result.extend([
+                    os.path.join(prefix, 'lib', self._multiarch, 'pkgconfig'),
+                    os.path.join(prefix, 'lib', 'pkgconfig'),
+                    os.path.join(prefix, 'share', 'pkgconfig'),
+                ])
+        return result
+
+    def _system_dirs(self, variables, name, default, extra=()):
+        return set(os.path.normpath(i) for i in (
+            self._split_var(variables, name, default) +
+            [j for i in extra for j in self._split_var(variables, i)]
+        ))
+
+    @property
+    def index(self):
+        # Only list each directory in the search path once; later lookups
+        # (including those for `Requires`) just consult this index.
+        if self._index is None:
+            self._index = {}
+            for path in self.search_path():
+                try:
+                    files = os.listdir(path)
+                except OSError:
+                    continue
+                for i in files:
+                    name, ext = os.path.splitext(i)
+                    if ext == '.pc' and name not in self._index:
+                        self._index[name] = os.path.join(path, i)
+        return self._index
+
+    def package(self, name):
+        if name not in self._packages:
+            try:
+                filename = self.index[name]
+            except KeyError:
+                raise PackageResolutionError("unable to find package '{}'"
+                                             .format(name))
+            sysroot = self.env.getvar('PKG_CONFIG_SYSROOT_DIR', '')
+            try:
+                self._packages[name] = PcFile.load(filename, {
+                    'pc_sysrootdir': sysroot or '/',
+                })
+            except (OSError, PcFileError) as e:
+                raise PackageResolutionError(
+                    "unable to load package '{}': {}".format(name, e)
+                )
+        return self._packages[name]
+
+    def closure(self, name, private):
+        # Return the named package and all of the packages it requires,
+        # sorted so that each package comes before everything it requires (the
+        # same order pkg-config uses), checking any version requirements along
+        # the way.
+        result = []
+        seen = set()
+
+        def visit(pkg):
+            if pkg.name in seen:
+                return
+            seen.add(pkg.name)
+
+            reqs = pkg.requires()
+            if private:
+                reqs += pkg.requires(private=True)
+            for req, op, version in reversed(reqs):
+                dep = self.package(req)
+                if op and not _compare_ops[op](vercmp(dep.version, version)):
+                    raise PackageResolutionError(
+                        ("package '{}' requires '{} {} {}' but version of " +
+                         "'{}' is {}").format(pkg.name, req, op, version, req,
+                                              dep.version)
+                    )
+                visit(dep)
+            result.append(pkg)
+
+        visit(self.package(name))
+        return result[::-1]
+
+    def _rewrite(self, flags, prefix, system_dirs, sysroot):
+        result = []
+        for i in flags:
+            if i.startswith(prefix) and len(i) > len(prefix):
+                path = i[len(prefix):]
+                if os.path.normpath(path) in system_dirs:
+                    continue
+                if sysroot:
+                    i = prefix + sysroot + path
+            result.append(i)
+        return result
+
+    def cflags(self, name, variables, static=False):
+        fields = ['Cflags', 'Cflags.private'] if static else ['Cflags']
+        flags = [i for pkg in self.closure(name, private=True)
+                 for field in fields for i in pkg.flags(field)]
+
+        system_dirs = set()
+        if not variables.get('PKG_CONFIG_ALLOW_SYSTEM_CFLAGS'):
+            system_dirs = self._system_dirs(
+                variables, 'PKG_CONFIG_SYSTEM_INCLUDE_PATH',
+                ['/usr/include'],
+                ['CPATH', 'C_INCLUDE_PATH', 'CPLUS_INCLUDE_PATH']
+            )
+        sysroot = variables.get('PKG_CONFIG_SYSROOT_DIR')
+        return uniques(self._rewrite(flags, '-I', system_dirs, sysroot))
+
+    def libs(self, name, variables, static=False, msvc_syntax=False):
+        fields = ['Libs', 'Libs.private'] if static else ['Libs']
+        flags = [i for pkg in self.closure(name, private=static)
+                 for field in fields for i in pkg.flags(field)]
+
+        system_dirs = set()
+        if not variables.get('PKG_CONFIG_ALLOW_SYSTEM_LIBS'):
+            default = ['/usr/lib', '/lib']
+            system_dirs = self._system_dirs(
+                variables, 'PKG_CONFIG_SYSTEM_LIBRARY_PATH',
+                [os.path.join(i, self._multiarch) for i in default] + default
+            )
+        sysroot = variables.get('PKG_CONFIG_SYSROOT_DIR')
+        flags = self._rewrite(flags, '-L', system_dirs, sysroot)
+
+        # Libraries should come after everything that depends on them, so
+        # keep the *last* occurrence of each.
+        flags = list(reversed(uniques(reversed(flags))))
+        if msvc_syntax:
+            flags = [('/libpath:' + i[2:]) if i.startswith('-L') else
+                     (i[2:] + '.lib') if i.startswith('-l') else i
+                     for i in flags]
+        return flags
+
+    def _query(self, name, type, static, msvc_syntax, variables):
+        if type == 'info':
+            pkg = self.package(name)
+            return [pkg.version, pkg.path]
+        elif type == 'version':
+            return [self.package(name).version]
+        elif type == 'path':
+            return [self.package(name).path]
+        elif type == 'cflags':
+            return [shell.join(self.cflags(name, variables, static))]
+        elif type == 'libs':
+            return [shell.join(self.libs(name, variables, static,
+                                         msvc_syntax))]
+        elif type == 'lib_dirs':
+            prefix = '/libpath:' if msvc_syntax else '-L'
+            return [shell.join(
+                i for i in self.libs(name, variables, static, msvc_syntax)
+                if i.startswith(prefix)
+            )]
+        raise ValueError('unknown query {!r}'.format(type))
+
+    def run(self, name, type, static=False, msvc_syntax=False, env=None,
+            env_update=True):
+        variables = self.env.variables
+        if env:
+            variables = dict(variables, **env) if env_update else env
+        return '\n'.join(
+            self._query(name, type, static, msvc_syntax, variables)
+        ) + '\n'
+
+    def __repr__(self):
+        return '<BuiltinPkgConfig>'
@@ -11,8 +11,8 @@ from .ld import LdLinker
 from ..builtins.copy_file import CopyFile
 from ..exceptions import PackageResolutionError
 from ..file_types import *
-from ..iterutils import (default_sentinel, first, iterate, listify, uniques,
-                         recursive_walk)
+from ..iterutils import (default_sentinel, first, iterate, listify,
+                         transitive_closure, uniques)
 from ..languages import known_formats
 from ..packages import CommonPackage, Framework, PackageKind
 from ..path import abspath, exists, BasePath, InstallRoot, Path, Root
@@ -70,7 +70,7 @@ class CcBuilder(Builder):
         # grab the command line.
         ld_command = None
         try:
-            stdout, stderr = env.execute(
+            stdout, stderr = env.probe(
                 command + ldflags + ['-v', '-Wl,--version'],
                 stdout=shell.Mode.pipe, stderr=shell.Mode.pipe,
                 returncode='any'
@@ -117,7 +117,7 @@ class CcBuilder(Builder):
             brand = 'gcc'
             version = detect_version(version_output)
             if env.is_cross:
-                triplet = parse_triplet(env.execute(
+                triplet = parse_triplet(env.probe(
                     command + ['-dumpmachine'],
                     stdout=shell.Mode.pipe, stderr=shell.Mode.devnull
                 ).rstrip())
@@ -147,8 +147,8 @@ class CcBuilder(Builder):
 
     @staticmethod
     def check_command(env, command):
-        return env.execute(command + ['--version'], stdout=shell.Mode.pipe,
-                           stderr=shell.Mode.devnull)
+        return env.probe(command + ['--version'], stdout=shell.Mode.pipe,
+                         stderr=shell.Mode.devnull)
 
     @property
     def flavor(self):
@@ -373,7 +373,7 @@ class CcLinker(BuildCommand):
     def sysroot(self, strict=False):
         try:
             # XXX: clang doesn't support -print-sysroot.
-            return self.env.execute(
+            return self.env.probe(
                 self.command + self.global_flags + ['-print-sysroot'],
                 stdout=shell.Mode.pipe, stderr=shell.Mode.devnull
             ).rstrip()
@@ -384,7 +384,7 @@ class CcLinker(BuildCommand):
 
     def search_dirs(self, strict=False):
         try:
-            output = self.env.execute(
+            output = self.env.probe(
                 self.command + self.global_flags + ['-print-search-dirs'],
                 stdout=shell.Mode.pipe, stderr=shell.Mode.devnull
             )
@@ -449,8 +449,9 @@ class CcLinker(BuildCommand):
 
             rpath_link = []
             if output and fix_rpath:
-                rpath_link = [i.path.parent() for i in
-                              recursive_walk(runtime_lib, 'runtime_deps')]
+                rpath_link = [i.path.parent() for i in transitive_closure(
+                    runtime_lib.runtime_deps, lambda i: i.runtime_deps
+                )]
 
             return rpath, rpath_link
 
@@ -787,7 +788,7 @@ class CcPackageResolver:
         for base in search_dirs:
             if base.root != Root.absolute:
                 raise ValueError('expected an absolute path')
-            if exists(base.append(name)):
+            if self.env.directory_index.exists(base.append(name).string()):
                 return HeaderDirectory(base, None, system=True)
 
         raise PackageResolutionError("unable to find header '{}'".format(name))
@@ -819,7 +820,7 @@ class CcPackageResolver:
                 raise ValueError('expected an absolute path')
             for libname, libkind, extra_kwargs in libnames:
                 fullpath = base.append(libname)
-                if exists(fullpath):
+                if self.env.directory_index.exists(fullpath.string()):
                     return libkind(fullpath, format=self.builder.object_format,
                                    **extra_kwargs)
 
@@ -552,7 +552,7 @@ class MsvcPackageResolver:
         for base in search_dirs:
             if base.root != Root.absolute:
                 raise ValueError('expected an absolute path')
-            if exists(base.append(name)):
+            if self.env.directory_index.exists(base.append(name).string()):
                 return HeaderDirectory(base, None, system=True)
 
         raise PackageResolutionError("unable to find header '{}'".format(name))
@@ -566,7 +566,7 @@ class MsvcPackageResolver:
             if base.root != Root.absolute:
                 raise ValueError('expected an absolute path')
             fullpath = base.append(libname)
-            if exists(fullpath):
+            if self.env.directory_index.exists(fullpath.string()):
                 # We don't actually know what kind of library this is. It could
                 # be a static library or an import library (which we classify
                 # as a kind of shared lib).
@@ -2,23 +2,32 @@ import argparse
 import subprocess
 
 from . import tool
+from .builtin_pkg_config import BuiltinPkgConfig
 from .common import SimpleCommand
 from .. import log, options as opts, shell
 from ..exceptions import PackageResolutionError, PackageVersionError
-from ..objutils import memoize
+from ..objutils import memoize_method
 from ..packages import Package, PackageKind
 from ..path import Path, Root
 from ..versioning import check_version, Version
 
 
 @tool('pkg_config')
+def pkg_config(env):
+    # Setting `PKG_CONFIG=builtin` reads `.pc` files directly in-process
+    # instead of running an external pkg-config for each query.
+    if env.getvar('PKG_CONFIG') == 'builtin':
+        return BuiltinPkgConfig(env)
+    return PkgConfig(env)
+
+
 class PkgConfig(SimpleCommand):
     _options = {
+        'info': ['--modversion', '--variable=pcfiledir'],
         'version': ['--modversion'],
         'cflags': ['--cflags'],
         'lib_dirs': ['--libs-only-L'],
-        'ldflags': ['--libs-only-L', '--libs-only-other'],
-        'ldlibs': ['--libs-only-l'],
+        'libs': ['--libs'],
         'path': ['--variable=pcfiledir'],
     }
 
@@ -40,7 +49,7 @@ class PkgConfigPackage(Package):
         self._pkg_config = pkg_config
 
         try:
-            version = Version(self._pkg_config.run(name, 'version').strip())
+            version, self._path = self._info(name)
         except subprocess.CalledProcessError:
             raise PackageResolutionError("unable to find package '{}'"
                                          .format(name))
@@ -51,24 +60,49 @@ class PkgConfigPackage(Package):
         self.static = kind == PackageKind.static
         super().__init__(name, format)
 
-    @memoize
+    def _info(self, name):
+        # Try to get the version and the .pc file's directory with a single
+        # call. Not every pkg-config implementation will print both, so if we
+        # don't get two lines of output, ask for each separately.
+        output = self._pkg_config.run(name, 'info').strip().split('\n')
+        if len(output) == 2:
+            return Version(output[0].strip()), output[1].strip()
+        return (Version(self._pkg_config.run(name, 'version').strip()),
+                self._pkg_config.run(name, 'path').strip())
+
+    @memoize_method
     def _call(self, *args, **kwargs):
         return shell.split(self._pkg_config.run(*args, **kwargs).strip(),
                            type=opts.option_list)
 
+    @staticmethod
+    def _is_lib(flag, msvc_syntax):
+        # With `--msvc-syntax`, libraries are written as `foo.lib`, and all
+        # other flags start with `/` or `-`.
+        if msvc_syntax:
+            return not flag.startswith(('/', '-'))
+        return flag.startswith('-l')
+
+    @memoize_method
+    def _link_flags(self, msvc_syntax):
+        # Get all the linker flags at once and split the libraries out from
+        # the rest, instead of asking pkg-config for each kind separately.
+        flags = self._call(self.name, 'libs', self.static, msvc_syntax)
+        return (
+            opts.option_list(i for i in flags
+                             if not self._is_lib(i, msvc_syntax)),
+            opts.option_list(opts.lib_literal(i) for i in flags
+                             if self._is_lib(i, msvc_syntax)),
+        )
+
     def compile_options(self, compiler):
         return self._call(self.name, 'cflags', self.static,
                           compiler.flavor == 'msvc')
 
     def link_options(self, linker):
-        flags = self._call(self.name, 'ldflags', self.static,
-                           linker.flavor == 'msvc')
-
         # XXX: How should we ensure that these libs are linked statically when
         # necessary?
-        libs = self._call(self.name, 'ldlibs', self.static,
-                          linker.flavor == 'msvc')
-        libs = opts.option_list(opts.lib_literal(i) for i in libs)
+        flags, libs = self._link_flags(linker.flavor == 'msvc')
 
         if linker.builder.object_format != 'elf' or self.static:
             return flags + libs
@@ -88,7 +122,7 @@ class PkgConfigPackage(Package):
         return flags + libs + rpaths
 
     def path(self):
-        return self._pkg_config.run(self.name, 'path').strip()
+        return self._path
 
     def __repr__(self):
         return '<PkgConfigPackage({!r}, {!r})>'.format(
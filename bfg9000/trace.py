@@ -0,0 +1,149 @@
+import json
+import os
+import subprocess
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+__all__ = ['command', 'dump_json', 'format_table', 'init', 'is_enabled',
+           'Record', 'records']
+
+_srcdir = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that only pass commands along to be run; the call site of a
+# subprocess is the first frame *outside* of these.
+_plumbing = {os.path.join(_srcdir, *i) for i in (
+    ('trace.py',),
+    ('shell', '__init__.py'),
+    ('environment.py',),
+    ('cache.py',),
+    ('tools', 'common.py'),
+)}
+
+# Commands run before tracing has been enabled or disabled (e.g. when
+# detecting the platform at import time) are held onto, up to this many, so
+# that they show up in the trace too.
+_max_pending = 32
+
+
+class Record:
+    def __init__(self, args, start, site):
+        self.args = [str(i) for i in args] if isinstance(args, list) else args
+        self.cwd = os.getcwd()
+        self.start = start
+        self.duration = None
+        self.returncode = None
+        self.output_size = None
+        self.site = site
+
+    def to_json(self):
+        return {
+            'args': self.args,
+            'cwd': self.cwd,
+            'start': self.start,
+            'duration': self.duration,
+            'returncode': self.returncode,
+            'output_size': self.output_size,
+            'site': self.site,
+        }
+
+
+class _Tracer:
+    def __init__(self):
+        self.enabled = None
+        self.records = []
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+
+
+_tracer = _Tracer()
+
+
+def init(enabled):
+    with _tracer.lock:
+        _tracer.enabled = enabled
+        if not enabled:
+            _tracer.records = []
+
+
+def is_enabled():
+    return bool(_tracer.enabled)
+
+
+def records():
+    return list(_tracer.records)
+
+
+def _site(stack):
+    # Prefer the innermost line of a bfg file, since that's what the user
+    # can actually change. Otherwise, point at the Python code that asked
+    # for the command.
+    for filename, lineno, _, _ in reversed(stack):
+        if filename.endswith('.bfg'):
+            return '{}:{}'.format(filename, lineno)
+    for filename, lineno, _, _ in reversed(stack):
+        if ( filename not in _plumbing and
+             os.path.basename(filename) != 'subprocess.py' ):
+            if filename.startswith(_srcdir):
+                filename = os.path.relpath(filename,
+                                           os.path.dirname(_srcdir))
+            return '{}:{}'.format(filename, lineno)
+    return None
+
+
+def _should_record():
+    if _tracer.enabled is None:
+        return len(_tracer.records) < _max_pending
+    return _tracer.enabled
+
+
+@contextmanager
+def command(args):
+    if not _should_record():
+        yield None
+        return
+
+    record = Record(args, time.perf_counter() - _tracer.start,
+                    _site(traceback.extract_stack()[:-2]))
+    try:
+        yield record
+    except subprocess.CalledProcessError as e:
+        record.returncode = e.returncode
+        raise
+    finally:
+        record.duration = (time.perf_counter() - _tracer.start -
+                           record.start)
+        with _tracer.lock:
+            if _should_record():
+                _tracer.records.append(record)
+
+
+def _format_args(args):
+    if isinstance(args, list):
+        return ' '.join(args)
+    return args
+
+
+def format_table(records):
+    total = sum(i.duration for i in records)
+    lines = ['{} subprocesses in {:.3f}s'.format(len(records), total)]
+    if records:
+        lines.append('{:>8}  {:>4}  {:>8}  {:<32}  {}'.format(
+            'time', 'rc', 'output', 'site', 'command'
+        ))
+    for i in records:
+        lines.append('{:>7.3f}s  {:>4}  {:>8}  {:<32}  {}'.format(
+            i.duration, '-' if i.returncode is None else i.returncode,
+            '-' if i.output_size is None else i.output_size,
+            i.site or '?', _format_args(i.args)
+        ))
+    return '\n'.join(lines)
+
+
+def dump_json(records, out):
+    json.dump({
+        'count': len(records),
+        'total_time': sum(i.duration for i in records),
+        'subprocesses': [i.to_json() for i in records],
+    }, out, indent=2)
@@ -0,0 +1,124 @@
+import ctypes
+import errno
+import os
+import select
+import sys
+import time
+
+__all__ = ['InotifyWatcher', 'PollingWatcher', 'make_watcher']
+
+
+class PollingWatcher:
+    """Watch a set of files and directories for changes by periodically
+    checking their modification times. This works everywhere, but is slower to
+    notice changes than `InotifyWatcher`."""
+
+    def __init__(self, paths, interval=0.5):
+        self.paths = sorted(set(paths))
+        self.interval = interval
+        self._snapshot = self._stat_all()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def _stat_all(self):
+        return [self._stat(i) for i in self.paths]
+
+    def wait(self, timeout=None):
+        # Return True if anything changed, or False if we timed out first.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._stat_all()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+
+            if deadline is None:
+                delay = self.interval
+            else:
+                delay = min(self.interval, deadline - time.monotonic())
+                if delay <= 0:
+                    return False
+            time.sleep(delay)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watch a set of files and directories for changes using Linux's inotify
+    API. To catch editors that save by replacing a file, files are watched via
+    their parent directories, so this may report changes to unrelated files in
+    the same directory."""
+
+    _IN_MODIFY = 0x00000002
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_DELETE_SELF = 0x00000400
+    _IN_MOVE_SELF = 0x00000800
+    _IN_NONBLOCK = 0o4000
+    _IN_CLOEXEC = 0o2000000
+
+    _mask = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+             _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF |
+             _IN_MOVE_SELF)
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(None, use_errno=True)
+        try:
+            init1, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError:
+            raise OSError(errno.ENOSYS, 'inotify is not supported')
+
+        self._fd = init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        dirs = {i if os.path.isdir(i) else os.path.dirname(i) for i in paths}
+        for i in dirs:
+            # Directories that don't exist (e.g. because they were just
+            # deleted) can't be watched, but their parents can be.
+            if add_watch(self._fd, os.fsencode(i), self._mask) < 0:
+                err = ctypes.get_errno()
+                if err not in (errno.ENOENT, errno.ENOTDIR):
+                    self.close()
+                    raise OSError(err, os.strerror(err))
+
+    def wait(self, timeout=None):
+        # Return True if anything changed, or False if we timed out first.
+        ready = select.select([self._fd], [], [], timeout)[0]
+        if not ready:
+            return False
+
+        # We only care that something happened, not what, so just drain the
+        # pending events.
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(paths, poll=False, interval=0.5):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except OSError:
+            pass
+    return PollingWatcher(paths, interval)
@@ -175,7 +175,7 @@ setup(
 
     entry_points={
         'console_scripts': [
-            'bfg9000=bfg9000.driver:main',
+            'bfg9000=bfg9000.launcher:main',
             '9k=bfg9000.driver:simple_main',
             'bfg9000-depfixer=bfg9000.depfixer:main',
             'bfg9000-jvmoutput=bfg9000.jvmoutput:main',
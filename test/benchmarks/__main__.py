@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bfg9000.app_version import version
+
+from .generate import generate_project, shape_for, write_stub_toolchain
+
+this_dir = os.path.abspath(os.path.dirname(__file__))
+root_dir = os.path.join(this_dir, '..', '..')
+
+description = """
+Generate synthetic bfg9000 projects of various sizes and measure the wall time
+and peak memory used to configure them with each backend. Results are written
+as JSON so that they can be compared across releases.
+"""
+
+
+def run_one(srcdir, builddir, backend, env):
+    # Each measurement runs in its own interpreter so that peak memory usage
+    # isn't polluted by earlier runs.
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'test.benchmarks.measure', srcdir, builddir,
+         '--backend', backend, '--disable-probe-cache'],
+        cwd=root_dir, env=env, universal_newlines=True
+    )
+    return json.loads(output)
+
+
+def best_of(runs):
+    result = dict(runs[0])
+    for i in ('configure_time', 'write_time', 'total_time'):
+        result[i] = min(r[i] for r in runs)
+    for i in ('baseline_memory', 'peak_memory'):
+        if result[i] is not None:
+            result[i] = max(r[i] for r in runs)
+    result['runs'] = len(runs)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m test.benchmarks',
+                                     description=description)
+    parser.add_argument('-s', '--size', metavar='EDGES', type=int,
+                        action='append', dest='sizes',
+                        help=('approximate number of build edges to generate '
+                              '(may be repeated; default: 1000, 10000, '
+                              '100000)'))
+    parser.add_argument('-b', '--backend', action='append', dest='backends',
+                        help=('backend to benchmark (may be repeated; '
+                              'default: make, ninja, msbuild)'))
+    parser.add_argument('-r', '--repeat', metavar='N', type=int, default=1,
+                        help=('number of times to run each benchmark, '
+                              'keeping the best time (default: %(default)s)'))
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='write results to FILE (default: stdout)')
+    parser.add_argument('--keep', metavar='DIR',
+                        help='generate projects in DIR and keep them')
+    args = parser.parse_args()
+
+    sizes = args.sizes or [1000, 10000, 100000]
+    backends = args.backends or ['make', 'ninja', 'msbuild']
+    workdir = args.keep or tempfile.mkdtemp(prefix='bfg-bench-')
+
+    results = []
+    try:
+        # MSBuild only supports MSVC, so give it an MSVC-like stub.
+        stub_envs = {flavor: write_stub_toolchain(
+            os.path.join(workdir, 'bin-' + flavor),
+            os.path.join(workdir, 'lib'), flavor
+        ) for flavor in ('gcc', 'msvc')}
+        for size in sizes:
+            srcdir = os.path.join(workdir, 'project-{}'.format(size))
+            shape = shape_for(size)
+            if not os.path.exists(srcdir):
+                pcdir = generate_project(srcdir, shape)
+            else:
+                pcdir = os.path.join(srcdir, 'pkgconfig')
+
+            for backend in backends:
+                flavor = 'msvc' if backend == 'msbuild' else 'gcc'
+                env = dict(os.environ, PKG_CONFIG='builtin',
+                           PKG_CONFIG_LIBDIR=pcdir, **stub_envs[flavor])
+                builddir = os.path.join(workdir, 'build-{}-{}'.format(
+                    size, backend
+                ))
+                runs = []
+                for _ in range(args.repeat):
+                    shutil.rmtree(builddir, ignore_errors=True)
+                    runs.append(run_one(srcdir, builddir, backend, env))
+
+                result = best_of(runs)
+                result.update(size=size, shape=shape._asdict())
+                results.append(result)
+                sys.stderr.write('{backend:>8} {size:>7} edges: '
+                                 '{total_time:.3f}s\n'.format(**result))
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    data = {
+        'bfg9000': version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(data, out, indent=2)
+    else:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
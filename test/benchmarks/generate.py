@@ -0,0 +1,169 @@
+import os
+import stat
+import sys
+from collections import namedtuple
+
+__all__ = ['generate_project', 'Shape', 'shape_for', 'write_stub_toolchain']
+
+Shape = namedtuple('Shape', ['libraries', 'sources_per_library', 'depth',
+                             'wide_files', 'packages'])
+
+stub_compiler = """\
+import sys
+
+# A stand-in for a GCC-like compiler (and ar) or for MSVC that answers just
+# enough of bfg9000's probes to configure a project. It never builds anything.
+flavor, args = sys.argv[1], sys.argv[2:]
+if flavor == 'msvc':
+    if '/?' not in args:
+        sys.exit(1)
+    sys.stdout.write('Microsoft (R) C/C++ Optimizing Compiler Version '
+                     '19.28.29334 for x64\\n')
+elif '--version' in args:
+    sys.stdout.write('stubcc (GCC) 10.2.0\\n'
+                     'Copyright (C) 2020 Free Software Foundation, Inc.\\n'
+                     'GNU ar (stub) 2.35\\n')
+elif '-print-search-dirs' in args:
+    sys.stdout.write('install: /\\nprograms: =/\\nlibraries: ={libdir}\\n')
+elif '-print-sysroot' in args:
+    sys.stdout.write('\\n')
+elif '-dumpmachine' in args:
+    sys.stdout.write('x86_64-linux-gnu\\n')
+"""
+
+pc_file = """\
+prefix={prefix}
+includedir=${{prefix}}/include
+libdir=${{prefix}}/lib
+
+Name: {name}
+Description: synthetic package {name}
+Version: 1.0.{index}
+Requires: {requires}
+Cflags: -I${{includedir}}/{name} -DHAVE_{macro}
+Libs: -L${{libdir}} -l{name}
+"""
+
+
+def shape_for(edges, depth=32):
+    """Return a project shape that produces roughly `edges` build edges: one
+    tenth of the edges come from compiling a single wide directory, with the
+    rest split across libraries of about 100 sources each."""
+    wide_files = max(1, edges // 10)
+    libraries = max(2, edges // 100)
+    sources = max(1, (edges - wide_files) // libraries - 1)
+    return Shape(libraries, sources, min(depth, libraries),
+                 wide_files, max(1, edges // 100))
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(data)
+
+
+def _module_dir(srcdir, level):
+    return os.path.join(srcdir, 'modules', *('m{}'.format(i)
+                                             for i in range(level + 1)))
+
+
+def _write_module(srcdir, shape, level):
+    # Libraries are spread round-robin across a chain of nested submodules.
+    # Each library links the two libraries defined just before it, so the
+    # dependency graph is a ladder of diamonds spanning every submodule.
+    path = _module_dir(srcdir, level)
+    lines = ['# -*- python -*-', '']
+    if level + 1 < shape.depth:
+        lines += ["libs = submodule('m{}')['libs']".format(level + 1)]
+    else:
+        lines += ['libs = []']
+
+    for lib in range(shape.libraries - 1 - level, -1, -shape.depth):
+        name = 'lib{}'.format(lib)
+        sources = ['{}/src{}.c'.format(name, i)
+                   for i in range(shape.sources_per_library)]
+        for i, src in enumerate(sources):
+            _write(os.path.join(path, src),
+                   'int {}_{}(void) {{ return {}; }}\n'.format(name, i, i))
+        _write(os.path.join(path, name, name + '.h'),
+               'int {}_0(void);\n'.format(name))
+
+        lines += [
+            '',
+            "libs.append(library('{name}', [{sources}],".format(
+                name=name, sources=', '.join(repr(i) for i in sources)
+            ),
+            "                    includes=[header_directory('{}')],"
+            .format(name),
+            '                    libs=libs[-2:]))',
+        ]
+
+    lines += ['', 'export(libs=libs)', '']
+    _write(os.path.join(path, 'build.bfg'), '\n'.join(lines))
+
+
+def generate_project(srcdir, shape):
+    """Write a synthetic C project with the given `shape` to `srcdir`. The
+    project needs a stub toolchain (see `write_stub_toolchain`) and the
+    `pkgconfig` directory it creates in `PKG_CONFIG_PATH` to configure."""
+    # A chain of diamond-linked libraries, one submodule level per library
+    # "round", nested `shape.depth` levels deep.
+    for level in range(shape.depth):
+        _write_module(srcdir, shape, level)
+
+    # A single wide directory of sources gathered by `find_files`.
+    for i in range(shape.wide_files):
+        _write(os.path.join(srcdir, 'wide', 'w{}.c'.format(i)),
+               'int w{0}(void) {{ return {0}; }}\n'.format(i))
+
+    # A pile of packages, each requiring the one before it.
+    pcdir = os.path.join(srcdir, 'pkgconfig')
+    for i in range(shape.packages):
+        name = 'benchpkg{}'.format(i)
+        _write(os.path.join(pcdir, name + '.pc'), pc_file.format(
+            prefix=os.path.join(srcdir, 'prefix'), name=name, index=i,
+            macro=name.upper(),
+            requires='benchpkg{}'.format(i - 1) if i else '',
+        ))
+
+    _write(os.path.join(srcdir, 'build.bfg'), '\n'.join([
+        '# -*- python -*-',
+        '',
+        "project('bench', lang='c')",
+        '',
+        "libs = submodule('modules/m0')['libs']",
+        "pkgs = [package('benchpkg{{}}'.format(i)) for i in range({})]"
+        .format(shape.packages),
+        "wide = static_library('wide', find_files('wide', '*.c'))",
+        '',
+        "executable('app', ['main.c'], libs=libs[-1:] + [wide],",
+        '           packages=pkgs)',
+        '',
+    ]))
+    _write(os.path.join(srcdir, 'main.c'), 'int main(void) { return 0; }\n')
+    return pcdir
+
+
+def write_stub_toolchain(bindir, libdir, flavor='gcc'):
+    """Write a stub compiler to `bindir` and return the environment variables
+    to use it for C (and as a stand-in for linkers and other tools). `flavor`
+    is either "gcc" or "msvc"; `libdir` is reported as the GCC-like compiler's
+    library search path."""
+    os.makedirs(bindir, exist_ok=True)
+    script = os.path.join(bindir, 'stubcc.py')
+    _write(script, stub_compiler.format(libdir=libdir))
+
+    name = 'cl' if flavor == 'msvc' else 'stubcc'
+    if sys.platform == 'win32':
+        wrapper = os.path.join(bindir, name + '.bat')
+        _write(wrapper, '@"{}" "{}" {} %*\n'.format(
+            sys.executable, script, flavor
+        ))
+    else:
+        wrapper = os.path.join(bindir, name)
+        _write(wrapper, '#!/bin/sh\nexec "{}" "{}" {} "$@"\n'.format(
+            sys.executable, script, flavor
+        ))
+        os.chmod(wrapper, os.stat(wrapper).st_mode | stat.S_IEXEC)
+
+    return {i: wrapper for i in ('CC', 'LD', 'AR', 'PATCHELF', 'DOPPEL')}
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import time
+from itertools import chain
+
+from bfg9000 import build, driver, log
+from bfg9000.arguments import parser as argparse
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_memory():
+    if resource is None:
+        return None
+    # `ru_maxrss` is in kilobytes on Linux, but in bytes on macOS.
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def graph_memory(build_inputs):
+    """Return the number of nodes and edges in the build graph and the memory
+    (in bytes) held directly by them, not counting shared objects like paths.
+    Unlike the peak memory, this is exact, so it shows even small changes to
+    the per-object overhead."""
+    objects = chain(build_inputs.sources(), chain.from_iterable(
+        chain([i], i.output, i.extra_deps) for i in build_inputs.edges()
+    ))
+
+    # Keep each object alive while we're counting so that its id is unique.
+    seen = {}
+    total = 0
+    for i in objects:
+        if id(i) not in seen:
+            seen[id(i)] = i
+            total += sys.getsizeof(i)
+            if hasattr(i, '__dict__'):
+                total += sys.getsizeof(vars(i))
+    return len(seen), total
+
+
+def measure(argv):
+    """Configure a project in this process and return wall times (in seconds)
+    and peak memory (in bytes) for doing so. This is meant to be run in a fresh
+    interpreter so that the memory usage only reflects a single configure."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('srcdir', type=argparse.Directory(must_exist=True))
+    parser.add_argument('builddir', type=argparse.Directory())
+    driver.add_configure_args(parser)
+    args = parser.parse_args(argv)
+    log.init('never')
+    log.getLogger().setLevel(log.WARNING)
+    os.makedirs(args.builddir.string(), exist_ok=True)
+
+    # Point bfgdir at the installed bfg9000 scripts (e.g. the depfixer), not
+    # this module's directory.
+    sys.argv[0] = os.path.join(os.path.dirname(sys.executable), 'bfg9000')
+    env, backend = driver.environment_from_args(args)
+    driver.finalize_environment(env, args, [])
+    env.save(args.builddir.string())
+    baseline = peak_memory()
+
+    start = time.perf_counter()
+    build_inputs = build.configure_build(env)
+    configured = time.perf_counter()
+    backend.write(env, build_inputs)
+    written = time.perf_counter()
+    peak = peak_memory()
+    objects, graph_bytes = graph_memory(build_inputs)
+
+    return {
+        'backend': env.backend,
+        'edges': sum(1 for i in build_inputs.edges()),
+        'configure_time': configured - start,
+        'write_time': written - configured,
+        'total_time': written - start,
+        'baseline_memory': baseline,
+        'peak_memory': peak,
+        'graph_objects': objects,
+        'graph_memory': graph_bytes,
+    }
+
+
+if __name__ == '__main__':
+    json.dump(measure(sys.argv[1:]), sys.stdout)
@@ -133,6 +133,23 @@ class TestRefresh(BasicIntegrationTest):
                          'build directory must not contain a build.bfg file')
 
 
+class TestWatch(BasicIntegrationTest):
+    def __init__(self, *args, **kwargs):
+        super().__init__(os.path.join(examples_dir, '01_executable'),
+                         configure=False, *args, **kwargs)
+
+    def test_watch_extra_args(self):
+        output = self.assertPopen(['bfg9000', 'watch', '--foo'],
+                                  returncode=2)
+        self.assertRegex(output, 'unrecognized arguments: --foo')
+
+    def test_watch_in_srcdir(self):
+        os.chdir(self.srcdir)
+        output = self.assertPopen(['bfg9000', 'watch'], returncode=2)
+        self.assertRegex(output,
+                         'build directory must not contain a build.bfg file')
+
+
 class TestEnv(BasicIntegrationTest):
     def __init__(self, *args, **kwargs):
         super().__init__(os.path.join(examples_dir, '01_executable'),
@@ -3,6 +3,10 @@ from os.path import join as pjoin
 
 from . import *
 
+from bfg9000.build import bfgfile, code_cache_name
+from bfg9000.builtins.regenerate import state_name
+from bfg9000.cache import CodeCache
+
 
 class TestExecutable(IntegrationTest):
     def __init__(self, *args, **kwargs):
@@ -37,14 +41,18 @@ class TestExecutable(IntegrationTest):
         self.build()
         self.clean()
 
+        # `clean` only removes build outputs, so the regeneration state and
+        # the cached build script should still be around.
+        common = {'.bfg_environ', state_name,
+                  CodeCache(code_cache_name)._filename(bfgfile)}
         files = {
-            'ninja': {'.bfg_environ', '.ninja_deps', '.ninja_log',
-                      'build.ninja'},
-            'make': {'.bfg_environ', 'Makefile', pjoin('simple.int', '.dir')},
+            'ninja': {'.ninja_deps', '.ninja_log', 'build.ninja'},
+            'make': {'Makefile', 'Makefile.stamp',
+                     pjoin('simple.int', '.dir')},
             'msbuild': {
-                '.bfg_environ', '.bfg_uuid', 'simple.sln',
+                '.bfg_uuid', 'simple.sln',
                 pjoin('simple', 'simple.vcxproj'),
                 pjoin('simple', 'Default', 'simple.Build.CppClean.log')
             },
         }
-        self.assertDirectory('.', files[self.backend])
+        self.assertDirectory('.', common | files[self.backend])
@@ -508,6 +508,12 @@ class TestMakefile(TestCase):
         self.assertEqual(out.stream.getvalue(),
                          'empty-target:\n\n')
 
+        self.makefile.rule('empty-recipe', recipe=[])
+        out = Writer(StringIO())
+        self.makefile._write_rule(out, self.makefile._rules[-1])
+        self.assertEqual(out.stream.getvalue(),
+                         'empty-recipe: ;\n\n')
+
         # Test duplicate targets.
         self.assertRaises(ValueError, self.makefile.rule, 'target')
         self.assertRaises(ValueError, self.makefile.rule,
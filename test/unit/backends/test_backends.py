@@ -0,0 +1,97 @@
+import os
+import sys
+from collections import OrderedDict
+from unittest import mock
+
+from .. import *
+
+from bfg9000 import backends
+from bfg9000.versioning import Version
+
+
+class MockBackend:
+    def __init__(self, priority, version=None, command=None):
+        self.priority = priority
+        self._version = version
+        self._command = command
+
+    def command(self, env=os.environ):
+        if self._command is None:
+            raise IOError()
+        return [self._command]
+
+    def version(self, env=os.environ):
+        return self._version
+
+
+class TestListBackends(TestCase):
+    def test_list(self):
+        result = backends.list_backends()
+        self.assertEqual(list(result.keys()), ['ninja', 'make', 'msbuild'])
+
+
+class TestProgramIdentity(TestCase):
+    def test_found(self):
+        stat = os.stat(sys.executable)
+        self.assertEqual(
+            backends.program_identity(MockBackend(1, command=sys.executable)),
+            [sys.executable, stat.st_size, stat.st_mtime_ns]
+        )
+
+    def test_not_found(self):
+        self.assertEqual(backends.program_identity(MockBackend(1)), None)
+
+
+class TestCheckVersion(TestCase):
+    def test_uncached(self):
+        backend = MockBackend(1, Version('1.0'), sys.executable)
+        version, identity = backends.check_version(backend)
+        self.assertEqual(version, Version('1.0'))
+        self.assertEqual(identity, backends.program_identity(backend))
+
+    def test_cached(self):
+        backend = MockBackend(1, Version('1.0'), sys.executable)
+        cached = (Version('0.9'), backends.program_identity(backend))
+        with mock.patch.object(backend, 'version') as m:
+            self.assertEqual(backends.check_version(backend, cached=cached),
+                             cached)
+            m.assert_not_called()
+
+    def test_changed(self):
+        backend = MockBackend(1, Version('1.0'), sys.executable)
+        cached = (Version('0.9'), ['/path/to/program', 1, 1])
+        self.assertEqual(backends.check_version(backend, cached=cached),
+                         (Version('1.0'), backends.program_identity(backend)))
+
+    def test_not_found(self):
+        backend = MockBackend(1)
+        self.assertEqual(backends.check_version(backend, cached=(None, None)),
+                         (None, None))
+
+
+class TestChooseBackend(TestCase):
+    def setUp(self):
+        self.backends = OrderedDict([
+            ('better', MockBackend(3, None)),
+            ('good', MockBackend(2, Version('2.0'), sys.executable)),
+        ])
+
+    def test_explicit(self):
+        with mock.patch('bfg9000.backends.list_backends',
+                        return_value=self.backends):
+            self.assertEqual(backends.choose_backend('better'),
+                             ('better', (None, None)))
+
+    def test_default(self):
+        identity = backends.program_identity(self.backends['good'])
+        with mock.patch('bfg9000.backends.list_backends',
+                        return_value=self.backends):
+            self.assertEqual(backends.choose_backend(),
+                             ('good', (Version('2.0'), identity)))
+
+    def test_none_installed(self):
+        self.backends['good'] = MockBackend(2, None)
+        with mock.patch('bfg9000.backends.list_backends',
+                        return_value=self.backends):
+            self.assertEqual(backends.choose_backend(),
+                             ('better', (None, None)))
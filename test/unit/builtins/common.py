@@ -3,6 +3,7 @@ from .. import AttrDict, make_env, TestCase  # noqa
 from bfg9000 import file_types
 from bfg9000.builtins import builtin
 from bfg9000.build_inputs import BuildInputs
+from bfg9000.objutils import slot_names
 from bfg9000.path import Path, Root
 
 
@@ -27,7 +28,7 @@ class BuiltinTest(TestCase):
         seen.add(id(a))
 
         self.assertEqual(type(a), type(b))
-        keys = ((set(a.__dict__.keys()) | set(b.__dict__.keys())) -
+        keys = ((set(slot_names(type(a))) | set(slot_names(type(b)))) -
                 exclude - {'creator'})
 
         for i in keys:
@@ -4,7 +4,8 @@ from unittest import mock
 
 from .common import BuiltinTest
 from bfg9000.builtins import core  # noqa
-from bfg9000 import exceptions
+from bfg9000 import exceptions, file_types
+from bfg9000.build_inputs import Edge
 from bfg9000.path import Path, Root
 from bfg9000.safe_str import safe_str, safe_format
 
@@ -110,6 +111,89 @@ class TestCore(BuiltinTest):
             m.assert_called_once_with(self.context,
                                       Path('dir/sub/build.bfg', Root.srcdir))
 
+    def test_submodule_multiple(self):
+        def mock_execute(context, path):
+            return context.PathEntry(path)
+
+        with mock.patch('bfg9000.build.execute_file',
+                        mock.MagicMock(wraps=mock_execute)) as m:
+            self.assertEqual(self.context['submodule'](['foo', 'bar']),
+                             [{}, {}])
+            m.assert_has_calls([
+                mock.call(self.context, Path('foo/build.bfg', Root.srcdir)),
+                mock.call(self.context, Path('bar/build.bfg', Root.srcdir)),
+            ])
+
+    def mock_independent(self, context, path):
+        entry = context.PathEntry(path)
+        name = path.parent().basename()
+        if name == 'bad':
+            raise ValueError('bad')
+        elif name == 'modify':
+            # Change an object created by the parent module.
+            self.parent.creator.extra_deps += [
+                file_types.File(Path('dep.txt'))
+            ]
+
+        output = file_types.File(Path('file.txt') if name.startswith('same')
+                                 else Path(name).append('file.txt'))
+        Edge(context.build, output)
+        entry.exports['output'] = output
+        return entry
+
+    def test_submodule_independent(self):
+        self.env.jobs = 2
+        with mock.patch('bfg9000.build.execute_file',
+                        mock.MagicMock(wraps=self.mock_independent)) as m:
+            exports = self.context['submodule'](['foo', 'bar', 'baz'],
+                                                independent=True)
+            # The submodules were executed in other processes.
+            m.assert_not_called()
+
+        outputs = list(self.build.targets())
+        self.assertEqual(outputs, [i['output'] for i in exports])
+        self.assertEqual([i.path for i in outputs], [
+            Path('foo/file.txt'), Path('bar/file.txt'), Path('baz/file.txt'),
+        ])
+
+    def test_submodule_independent_error(self):
+        self.env.jobs = 2
+        with mock.patch('bfg9000.build.execute_file',
+                        mock.MagicMock(wraps=self.mock_independent)) as m:
+            with self.assertRaises(ValueError):
+                self.context['submodule'](['foo', 'bad'], independent=True)
+            # The failing submodule was executed again here to report the
+            # error.
+            m.assert_called_once_with(self.context,
+                                      Path('bad/build.bfg', Root.srcdir))
+
+    def test_submodule_independent_modify_parent(self):
+        self.env.jobs = 2
+        self.parent = parent = file_types.File(Path('parent.txt'))
+        Edge(self.build, parent)
+
+        with mock.patch('bfg9000.build.execute_file',
+                        mock.MagicMock(wraps=self.mock_independent)) as m:
+            self.context['submodule'](['foo', 'modify'], independent=True)
+            # The worker couldn't merge its change to the parent's edge, so
+            # the submodule was executed again here.
+            m.assert_called_once_with(self.context,
+                                      Path('modify/build.bfg', Root.srcdir))
+
+        self.assertEqual(parent.creator.extra_deps,
+                         [file_types.File(Path('dep.txt'))])
+        self.assertEqual([i.path for i in self.build.targets()], [
+            Path('parent.txt'), Path('foo/file.txt'), Path('modify/file.txt'),
+        ])
+
+    def test_submodule_independent_conflict(self):
+        self.env.jobs = 2
+        with mock.patch('bfg9000.build.execute_file',
+                        mock.MagicMock(wraps=self.mock_independent)):
+            with self.assertRaises(ValueError):
+                self.context['submodule'](['same1', 'same2'],
+                                          independent=True)
+
     def test_export(self):
         with self.context.push_path(Path('foo/build.bfg', Root.srcdir)) as p:
             self.context['export'](foo='foo')
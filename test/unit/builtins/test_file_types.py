@@ -249,11 +249,11 @@ class TestDirectory(TestGenericFile):
     filename = 'dir'
 
     def test_include(self):
-        def mock_walk(path, variables=None):
+        def mock_walk(path, variables=None, prune=None, cache=None):
             p = srcpath
             return [
-                (p('dir'), [p('dir/sub')], [p('dir/file.txt')]),
-                (p('dir/sub'), [], [p('dir/sub/file2.txt')]),
+                (p('dir'), ['sub'], ['file.txt']),
+                (p('dir/sub'), [], ['file2.txt']),
             ]
 
         expected = self.type(srcpath(self.filename), [
@@ -275,11 +275,11 @@ class TestHeaderDirectory(TestDirectory):
     filename = 'include'
 
     def test_include(self):
-        def mock_walk(path, variables=None):
+        def mock_walk(path, variables=None, prune=None, cache=None):
             p = srcpath
             return [
-                (p('include'), [p('include/sub')], [p('include/file.hpp')]),
-                (p('include/sub'), [], [p('include/sub/file2.hpp')]),
+                (p('include'), ['sub'], ['file.hpp']),
+                (p('include/sub'), [], ['file2.hpp']),
             ]
 
         expected = self.type(srcpath(self.filename), [
@@ -20,46 +20,81 @@ def srcpath(p):
     return Path(p, Root.srcdir)
 
 
-def mock_listdir(path):
-    if os.path.basename(path) == 'dir':
-        return ['file2.txt']
-    return ['file.cpp', 'dir']
+class MockDirEntry:
+    def __init__(self, name, is_dir=False, is_symlink=False):
+        self.name = name
+        self._is_dir = is_dir
+        self._is_symlink = is_symlink
+
+    def is_dir(self):
+        return self._is_dir
 
+    def is_symlink(self):
+        return self._is_symlink
 
-def mock_isdir(path, variables=None):
-    return not path.basename().startswith('file')
+
+def mock_scandir(path):
+    if os.path.basename(path) == 'dir':
+        return [MockDirEntry('file2.txt')]
+    return [MockDirEntry('file.cpp'), MockDirEntry('dir', True)]
 
 
 @contextmanager
 def mock_context():
     find = 'bfg9000.builtins.find'
-    with mock.patch('os.listdir', mock_listdir) as a, \
-         mock.patch(find + '.exists', return_value=True) as b, \
-         mock.patch(find + '.isdir', mock_isdir) as c, \
-         mock.patch(find + '.islink', return_value=False) as d:  # noqa
-        yield a, b, c, d
+    with mock.patch('os.scandir', mock_scandir) as a, \
+         mock.patch(find + '.exists', return_value=True) as b:  # noqa
+        yield a, b
 
 
 class TestListdir(TestCase):
     def test_listdir(self):
         with mock_context():
             self.assertEqual(find._listdir(Path('.'), path_vars), (
-                [Path('dir')], [Path('file.cpp')],
+                ['dir'], ['file.cpp'], set(),
             ))
 
+    def test_link(self):
+        def mock_scandir(path):
+            return [MockDirEntry('dir', True, True)]
+
+        with mock.patch('os.scandir', mock_scandir):
+            self.assertEqual(find._listdir(Path('.'), path_vars),
+                             (['dir'], [], {'dir'}))
+
+    def test_stat_error(self):
+        class BrokenDirEntry(MockDirEntry):
+            def is_dir(self):
+                raise OSError()
+
+        def mock_scandir(path):
+            return [BrokenDirEntry('broken')]
+
+        with mock.patch('os.scandir', mock_scandir):
+            self.assertEqual(find._listdir(Path('.'), path_vars),
+                             ([], ['broken'], set()))
+
+    def test_cache(self):
+        cache = mock.Mock()
+        cache.listdir.return_value = [['dir'], ['file.cpp'], ['dir']]
+        self.assertEqual(find._listdir(Path('.'), path_vars, cache),
+                         (['dir'], ['file.cpp'], {'dir'}))
+        cache.listdir.assert_called_once_with('.', find._scandir)
+
     def test_not_found(self):
-        def mock_listdir(path):
+        def mock_scandir(path):
             raise OSError()
 
-        with mock.patch('os.listdir', mock_listdir):
-            self.assertEqual(find._listdir(Path('.'), path_vars), ([], []))
+        with mock.patch('os.scandir', mock_scandir):
+            self.assertEqual(find._listdir(Path('.'), path_vars),
+                             ([], [], set()))
 
 
 class TestWalkFlat(TestCase):
     def test_exists(self):
         with mock_context():
             self.assertEqual(list(find._walk_flat(Path('.'), path_vars)), [
-                (Path('.'), [Path('dir')], [Path('file.cpp')]),
+                (Path('.'), ['dir'], ['file.cpp']),
             ])
 
     def test_not_exists(self):
@@ -72,8 +107,8 @@ class TestWalkRecursive(TestCase):
         with mock_context():
             self.assertEqual(
                 list(find._walk_recursive(Path('.'), path_vars)),
-                [ (Path('.'), [Path('dir')], [Path('file.cpp')]),
-                  (Path('dir'), [], [Path('dir/file2.txt')]) ]
+                [ (Path('.'), ['dir'], ['file.cpp']),
+                  (Path('dir'), [], ['file2.txt']) ]
             )
 
     def test_not_exists(self):
@@ -82,61 +117,116 @@ class TestWalkRecursive(TestCase):
                              [])
 
     def test_link(self):
-        def mock_islink(path, variables=None):
-            return path.basename() == 'dir'
+        def mock_scandir(path):
+            return [MockDirEntry('file.cpp'), MockDirEntry('dir', True, True)]
 
-        with mock.patch('os.listdir', mock_listdir), \
-             mock.patch('bfg9000.builtins.find.exists', return_value=True), \
-             mock.patch('bfg9000.builtins.find.isdir', mock_isdir), \
-             mock.patch('bfg9000.builtins.find.islink', mock_islink):  # noqa
+        with mock.patch('os.scandir', mock_scandir), \
+             mock.patch('bfg9000.builtins.find.exists', return_value=True):  # noqa
             self.assertEqual(
                 list(find._walk_recursive(Path('.'), path_vars)),
-                [ (Path('.'), [Path('dir')], [Path('file.cpp')]) ]
+                [ (Path('.'), ['dir'], ['file.cpp']) ]
             )
 
 
-class TestMakeFilterFromGlob(TestCase):
+class TestGlobMatcher(TestCase):
     def test_file(self):
-        f = find._make_filter_from_glob('f', '*', None, None)
-        self.assertEqual(f(Path('foo'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo'), 'd'), find.FindResult.exclude)
+        f = find._GlobMatcher('f', '*', None, None)
+        self.assertEqual(f('foo', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo', 'd'), find.FindResult.exclude)
 
     def test_dir(self):
-        f = find._make_filter_from_glob('d', '*', None, None)
-        self.assertEqual(f(Path('foo'), 'f'), find.FindResult.exclude)
-        self.assertEqual(f(Path('foo'), 'd'), find.FindResult.include)
+        f = find._GlobMatcher('d', '*', None, None)
+        self.assertEqual(f('foo', 'f'), find.FindResult.exclude)
+        self.assertEqual(f('foo', 'd'), find.FindResult.include)
 
     def test_either(self):
-        f = find._make_filter_from_glob('*', '*', None, None)
-        self.assertEqual(f(Path('foo'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo'), 'd'), find.FindResult.include)
+        f = find._GlobMatcher('*', '*', None, None)
+        self.assertEqual(f('foo', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo', 'd'), find.FindResult.include)
 
     def test_match(self):
-        f = find._make_filter_from_glob('*', '*.hpp', None, None)
-        self.assertEqual(f(Path('foo.hpp'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo.cpp'), 'f'), find.FindResult.exclude)
+        f = find._GlobMatcher('*', '*.hpp', None, None)
+        self.assertEqual(f('foo.hpp', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f'), find.FindResult.exclude)
 
     def test_extra(self):
-        f = find._make_filter_from_glob('*', None, '*.hpp', None)
-        self.assertEqual(f(Path('foo.hpp'), 'f'), find.FindResult.not_now)
-        self.assertEqual(f(Path('foo.cpp'), 'f'), find.FindResult.exclude)
+        f = find._GlobMatcher('*', None, '*.hpp', None)
+        self.assertEqual(f('foo.hpp', 'f'), find.FindResult.not_now)
+        self.assertEqual(f('foo.cpp', 'f'), find.FindResult.exclude)
 
     def test_match_extra(self):
-        f = find._make_filter_from_glob('*', '*.hpp', '*.?pp', None)
-        self.assertEqual(f(Path('foo.hpp'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo.cpp'), 'f'), find.FindResult.not_now)
-        self.assertEqual(f(Path('foo.cxx'), 'f'), find.FindResult.exclude)
+        f = find._GlobMatcher('*', '*.hpp', '*.?pp', None)
+        self.assertEqual(f('foo.hpp', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f'), find.FindResult.not_now)
+        self.assertEqual(f('foo.cxx', 'f'), find.FindResult.exclude)
 
     def test_exclude(self):
-        f = find._make_filter_from_glob('*', '*.?pp', None, '*.cpp')
-        self.assertEqual(f(Path('foo.hpp'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo.cpp'), 'f'), find.FindResult.exclude)
+        f = find._GlobMatcher('*', '*.?pp', None, '*.cpp')
+        self.assertEqual(f('foo.hpp', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f'), find.FindResult.exclude)
 
     def test_match_extra_exclude(self):
-        f = find._make_filter_from_glob('*', '*.c??', '*.?pp', '*.hpp')
-        self.assertEqual(f(Path('foo.hpp'), 'f'), find.FindResult.exclude)
-        self.assertEqual(f(Path('foo.cpp'), 'f'), find.FindResult.include)
-        self.assertEqual(f(Path('foo.ipp'), 'f'), find.FindResult.not_now)
+        f = find._GlobMatcher('*', '*.c??', '*.?pp', '*.hpp')
+        self.assertEqual(f('foo.hpp', 'f'), find.FindResult.exclude)
+        self.assertEqual(f('foo.cpp', 'f'), find.FindResult.include)
+        self.assertEqual(f('foo.ipp', 'f'), find.FindResult.not_now)
+
+    def test_path(self):
+        f = find._GlobMatcher('*', 'src/*.cpp', None, None)
+        self.assertEqual(f('foo.cpp', 'f', ['src']), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f', []), find.FindResult.exclude)
+        self.assertEqual(f('foo.cpp', 'f', ['src', 'sub']),
+                         find.FindResult.exclude)
+        self.assertEqual(f('src', 'd', None), find.FindResult.exclude)
+
+    def test_recursive_path(self):
+        f = find._GlobMatcher('*', 'src/**/*.cpp', None, None)
+        self.assertEqual(f('foo.cpp', 'f', ['src']), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f', ['src', 'a', 'b']),
+                         find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f', ['lib', 'src']),
+                         find.FindResult.exclude)
+
+        f = find._GlobMatcher('*', '**/*.cpp', None, None)
+        self.assertEqual(f('foo.cpp', 'f', []), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f', ['a', 'b']),
+                         find.FindResult.include)
+
+    def test_negated(self):
+        f = find._GlobMatcher('*', ['*.cpp', '!**/test/**'], None, None)
+        self.assertEqual(f('foo.cpp', 'f', ['src']), find.FindResult.include)
+        self.assertEqual(f('foo.cpp', 'f', ['src', 'test']),
+                         find.FindResult.exclude)
+        self.assertEqual(f('foo.cpp', 'f', ['test', 'sub']),
+                         find.FindResult.exclude)
+
+    def test_can_match_below(self):
+        f = find._GlobMatcher('*', '*.cpp', None, None)
+        self.assertEqual(f.can_match_below(['src']), True)
+
+        f = find._GlobMatcher('*', 'src/**/*.cpp', None, None)
+        self.assertEqual(f.can_match_below(['src']), True)
+        self.assertEqual(f.can_match_below(['src', 'sub']), True)
+        self.assertEqual(f.can_match_below(['doc']), False)
+
+        f = find._GlobMatcher('*', 'src/*/*.cpp', '*.hpp', None)
+        self.assertEqual(f.can_match_below(['doc']), True)
+
+        f = find._GlobMatcher('*', 'src/*/*.cpp', None, None)
+        self.assertEqual(f.can_match_below(['src', 'sub']), True)
+        self.assertEqual(f.can_match_below(['src', 'sub', 'sub']), False)
+
+    def test_can_match_below_exclude(self):
+        f = find._GlobMatcher('*', '*.cpp', None,
+                              ['.git', 'third_party/*/test/**'])
+        self.assertEqual(f.can_match_below(['.git']), True)
+        self.assertEqual(f.can_match_below(['third_party', 'foo']), True)
+        self.assertEqual(f.can_match_below(['third_party', 'foo', 'test']),
+                         False)
+
+        f = find._GlobMatcher('*', '*.cpp', None, '.git/**')
+        self.assertEqual(f.can_match_below(['.git']), False)
+        self.assertEqual(f.can_match_below(['sub', '.git']), True)
 
 
 class TestFilterByPlatform(BuiltinTest):
@@ -329,6 +419,7 @@ class TestFindFiles(BuiltinTest):
             self.assertFound(self.find(filter=my_filter), expected, [
                 self.bfgfile, Directory(srcpath('dir'))
             ] + expected)
+            self.assertEqual(self.build['regenerate'].searches, [None])
 
     def test_combine_filters(self):
         def my_filter(path, type):
@@ -340,6 +431,21 @@ class TestFindFiles(BuiltinTest):
             self.assertFound(self.find(name='*.cpp', filter=my_filter),
                              expected)
 
+    def test_path_glob(self):
+        expected = [File(srcpath('dir/file2.txt'))]
+        with mock_context():
+            self.assertFound(self.find('.', 'dir/*'), expected)
+            self.assertEqual(self.build['find_dirs'], {
+                srcpath('.'), srcpath('dir')
+            })
+
+    def test_prune(self):
+        expected = [SourceFile(srcpath('file.cpp'), 'c++')]
+        with mock_context():
+            self.assertFound(self.find('.', '*.cpp', exclude='dir/**'),
+                             expected)
+            self.assertEqual(self.build['find_dirs'], {srcpath('.')})
+
     def test_file_types(self):
         expected = [
             HeaderDirectory(srcpath('.')),
@@ -375,6 +481,7 @@ class TestFindFiles(BuiltinTest):
         with mock_context():
             self.assertFound(self.find(cache=False), expected)
             self.assertEqual(self.build['find_dirs'], set())
+            self.assertEqual(self.build['regenerate'].searches, [])
 
 
 class TestFindPaths(TestFindFiles):
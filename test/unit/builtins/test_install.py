@@ -3,7 +3,7 @@ from unittest import mock
 from .common import BuiltinTest
 
 from bfg9000.builtins import default, install  # noqa
-from bfg9000.file_types import Executable, Phony
+from bfg9000.file_types import Executable, Phony, SharedLibrary
 from bfg9000.path import Path, Root, InstallRoot
 
 
@@ -40,6 +40,25 @@ class TestInstall(BuiltinTest):
         self.assertEqual(self.build['install'].explicit, [exe1, exe2])
         self.assertEqual(self.build['install'].implicit, [exe1, exe2])
 
+    def test_install_deps(self):
+        lib = SharedLibrary(Path('lib', Root.srcdir), None)
+        left = SharedLibrary(Path('left', Root.srcdir), None)
+        right = SharedLibrary(Path('right', Root.srcdir), None)
+        exe = Executable(Path('exe', Root.srcdir), None)
+        left.runtime_deps = [lib]
+        right.runtime_deps = [lib]
+        exe.runtime_deps = [left, right]
+
+        self.context['install'](exe)
+        self.assertEqual(self.build['install'].explicit, [exe])
+        self.assertEqual(self.build['install'].implicit,
+                         [exe, left, right, lib])
+
+        self.context['install'](right)
+        self.assertEqual(self.build['install'].explicit, [exe, right])
+        self.assertEqual(self.build['install'].implicit,
+                         [exe, left, right, lib])
+
     def test_install_add_to_default(self):
         exe = Executable(Path('exe', Root.srcdir), None)
         exe.creator = 'creator'
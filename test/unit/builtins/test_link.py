@@ -58,6 +58,25 @@ class TestExecutable(LinkTest):
                             expected)
         self.assertEqual(list(self.build.sources()), [self.bfgfile])
 
+    def test_transitive_static_libs(self):
+        static_library = self.context['static_library']
+        base = static_library('base', ['base.cpp'])
+        left = static_library('left', ['left.cpp'], libs=[base])
+        right = static_library('right', ['right.cpp'], libs=[base])
+        top = static_library('top', ['top.cpp'], libs=[left, right])
+        self.assertEqual(top.forward_opts['libs'], [left, right, base])
+
+        # The user's libraries should stay in the order they were passed, with
+        # each forwarded library appended once after them.
+        result = self.context['executable']('exe', ['main.cpp'],
+                                            libs=[left, right])
+        self.assertEqual(result.creator.libs, [left, right, base])
+
+        result = self.context['executable']('exe2', ['main.cpp'],
+                                            libs=[base, top])
+        self.assertEqual(result.creator.user_libs, [base, top])
+        self.assertEqual(result.creator.libs, [base, top, left, right, base])
+
     def test_make_simple(self):
         result = self.context['executable']('exe', ['main.cpp'])
         self.assertSameFile(result, self.output_file('exe'))
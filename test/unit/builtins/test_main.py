@@ -1,5 +1,8 @@
+import json
+from io import StringIO
+
 from .common import BuiltinTest
-from bfg9000 import builtins
+from bfg9000 import builtins, profiler
 from bfg9000.builtins.builtin import BuildContext
 
 
@@ -9,3 +12,19 @@ class TestBuiltin(BuiltinTest):
         context = BuildContext(self.env, self.build, None)
         self.assertTrue('project' in context.builtins)
         self.assertTrue('executable' in context.builtins)
+
+    def test_profile(self):
+        builtins.init()
+        context = BuildContext(self.env, self.build, None)
+        profiler.init(True)
+        try:
+            context['project']('name')
+            out = StringIO()
+            profiler.write(out)
+        finally:
+            profiler.init(False)
+
+        event = json.loads(out.getvalue())['traceEvents'][0]
+        self.assertEqual(event['name'], 'project')
+        self.assertEqual(event['cat'], 'builtin')
+        self.assertRegex(event['args']['site'], r'test_main\.py:\d+$')
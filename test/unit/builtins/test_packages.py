@@ -202,7 +202,7 @@ class TestBoostPackage(TestCase):
         context = self._make_context(env)
 
         def mock_exists(x):
-            x = x.string()
+            x = x.string() if isinstance(x, Path) else x
             return bool(re.search(r'[/\\]boost[/\\]version.hpp$', x) or
                         re.search(r'[/\\]libboost_thread', x) or
                         x in ['/usr/include', '/usr/lib'])
@@ -211,7 +211,9 @@ class TestBoostPackage(TestCase):
                         return_value=Version('1.23')), \
              mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_execute), \
-             mock.patch('bfg9000.tools.cc.exists', mock_exists):  # noqa
+             mock.patch('bfg9000.tools.cc.exists', mock_exists), \
+             mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        lambda self, x: mock_exists(x)):  # noqa
             pkg = context['boost_package']('thread')
             self.assertEqual(pkg.name, 'boost(thread)')
             self.assertEqual(pkg.version, Version('1.23'))
@@ -221,11 +223,8 @@ class TestBoostPackage(TestCase):
         context = self._make_context(env)
         boost_incdir = r'C:\Boost\include\boost-1.23'
 
-        def mock_walk(top, variables=None):
-            yield (top,) + (
-                [top.append('boost-1.23')],
-                []
-            )
+        def mock_walk(top, variables=None, prune=None, cache=None):
+            yield top, ['boost-1.23'], []
 
         def mock_execute(*args, **kwargs):
             if args[0][1] == '/?':
@@ -233,14 +232,17 @@ class TestBoostPackage(TestCase):
             raise ValueError()
 
         def mock_exists(x):
-            return bool(re.search(r'[/\\]boost[/\\]version.hpp$', x.string()))
+            x = x.string() if isinstance(x, Path) else x
+            return bool(re.search(r'[/\\]boost[/\\]version.hpp$', x))
 
         with mock.patch('bfg9000.builtins.find._walk_flat', mock_walk), \
              mock.patch('bfg9000.builtins.packages._boost_version',
                         return_value=Version('1.23')), \
              mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_execute), \
-             mock.patch('bfg9000.tools.msvc.exists', mock_exists):  # noqa
+             mock.patch('bfg9000.tools.msvc.exists', mock_exists), \
+             mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        lambda self, x: mock_exists(x)):  # noqa
             pkg = context['boost_package']('thread')
             self.assertEqual(pkg.name, 'boost(thread)')
             self.assertEqual(pkg.version, Version('1.23'))
@@ -255,11 +257,8 @@ class TestBoostPackage(TestCase):
         env = make_env('winnt', clear_variables=True)
         context = self._make_context(env)
 
-        def mock_walk(top, variables=None):
-            yield (top,) + (
-                [top.append('boost-1.23')],
-                []
-            )
+        def mock_walk(top, variables=None, prune=None, cache=None):
+            yield top, ['boost-1.23'], []
 
         def mock_execute(*args, **kwargs):
             if args[0][1] == '/?':
@@ -272,7 +271,9 @@ class TestBoostPackage(TestCase):
         with mock.patch('bfg9000.builtins.find._walk_flat', mock_walk), \
              mock.patch('bfg9000.shell.which', return_value=['command']), \
              mock.patch('bfg9000.shell.execute', mock_execute), \
-             mock.patch('bfg9000.tools.msvc.exists', mock_exists):  # noqa
+             mock.patch('bfg9000.tools.msvc.exists', mock_exists), \
+             mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        lambda self, x: mock_exists(x)):  # noqa
             self.assertRaises(PackageResolutionError, context['boost_package'],
                               'thread')
 
@@ -76,6 +76,8 @@ class TestPath(BuiltinTest):
                          Path('dir/dir/foo', Root.srcdir))
         self.assertEqual(within(Path('dir/foo/bar', Root.srcdir), directory),
                          Path('dir/dir/foo/bar', Root.srcdir))
+        self.assertEqual(within(Path('ab/cd', Root.srcdir), directory),
+                         Path('dir/ab/cd', Root.srcdir))
 
         self.assertEqual(within(Path('foo', Root.srcdir), subdir),
                          Path('dir/sub/PAR/foo', Root.srcdir))
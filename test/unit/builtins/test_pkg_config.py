@@ -7,6 +7,7 @@ from bfg9000.builtins.pkg_config import *
 from bfg9000.file_types import PkgConfigPcFile
 from bfg9000.path import Path
 from bfg9000.safe_str import safe_str, shell_literal
+from bfg9000.tools.builtin_pkg_config import PcFile
 
 
 class TestPkgConfigRequirement(TestCase):
@@ -188,3 +189,16 @@ class TestPkgConfig(BuiltinTest):
 
         with self.assertRaises(TypeError):
             pkg = PkgConfigInfo(self.context, requires=[1])
+
+    def test_parse(self):
+        pkg = PkgConfigInfo(
+            self.context, name='package', version='1.0',
+            requires=['req', ('vreq', '>=1.0')]
+        )
+
+        out = StringIO()
+        pkg.write(out, self.env)
+        pc = PcFile.parse('package', StringIO(out.getvalue()))
+        self.assertEqual(pc.version, '1.0')
+        self.assertEqual(pc.requires(), [('req', None, None),
+                                         ('vreq', '>=', '1.0')])
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from .common import BuiltinTest
 
 from bfg9000.builtins import project  # noqa
@@ -41,3 +43,9 @@ class TestProject(BuiltinTest):
     def test_invalid_option(self):
         with self.assertRaises(KeyError):
             self.context['project'](unknown=True)
+
+    def test_lang(self):
+        with mock.patch.object(self.env, 'preload_builders') as m:
+            self.context['project'](lang='c++')
+            m.assert_called_once_with(['c++'])
+        self.assertEqual(self.build['project']['lang'], 'c++')
@@ -0,0 +1,177 @@
+import os
+import sys
+import tempfile
+
+from .common import BuiltinTest
+
+from bfg9000 import regen_state
+from bfg9000.builtins import find, regenerate
+from bfg9000.path import abspath, Path, Root
+
+
+class TestRegenerate(BuiltinTest):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env.srcdir = abspath(os.path.join(self.tmpdir.name, 'src'))
+        self.env.builddir = abspath(os.path.join(self.tmpdir.name, 'build'))
+        self.builddir = self.env.builddir.string()
+        for i in ('src', 'src/dir', 'build'):
+            os.mkdir(os.path.join(self.tmpdir.name, i))
+        for i in ('build.bfg', 'file.cpp', 'dir/file2.txt'):
+            self.write(i)
+
+        self.env.save(self.builddir)
+        self.output = os.path.join(self.builddir, 'Makefile')
+        open(self.output, 'w').close()
+        self.context['find_files']('.', '*.cpp')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content='', age=10):
+        filename = os.path.join(self.env.srcdir.string(), name)
+        with open(filename, 'w') as out:
+            out.write(content)
+        # Backdate the files so that their directory listings can be cached.
+        mtime = os.stat(filename).st_mtime_ns - age * 10**9
+        os.utime(filename, ns=(mtime, mtime))
+
+    def age_dirs(self, age=10):
+        # Backdate the source directories so that their listings can be
+        # trusted without listing them again.
+        for i in ('', 'dir'):
+            dirname = os.path.join(self.env.srcdir.string(), i)
+            mtime = os.stat(dirname).st_mtime_ns - age * 10**9
+            os.utime(dirname, ns=(mtime, mtime))
+
+    def write_state(self, touch=[]):
+        regenerate.write_state(self.build, self.env, touch)
+
+    def test_searches(self):
+        srcdir = Path('.', Root.srcdir)
+        self.assertEqual(self.build['regenerate'].searches, [{
+            'path': [srcdir.to_json()],
+            'name': ['*.cpp'],
+            'type': '*',
+            'extra': [],
+            'exclude': find.exclude_globs,
+            'flat': False,
+            'digest': find.find_digest(self.env.base_dirs, [srcdir],
+                                       '*.cpp'),
+        }])
+
+    def test_unchanged(self):
+        self.write_state()
+        self.assertTrue(regenerate.is_current(self.builddir))
+
+    def test_write_state_touch(self):
+        stamp = os.path.join(self.builddir, 'Makefile.stamp')
+        self.write_state([Path('Makefile.stamp')])
+        self.assertTrue(os.path.exists(stamp))
+
+    def test_touch(self):
+        self.write_state([Path('Makefile')])
+        mtime = os.stat(self.output).st_mtime_ns - 10 * 10**9
+        os.utime(self.output, ns=(mtime, mtime))
+
+        self.assertTrue(regenerate.is_current(self.builddir))
+        self.assertGreater(os.stat(self.output).st_mtime_ns, mtime)
+
+    def test_touched_script(self):
+        self.write_state()
+        self.write('build.bfg', age=0)
+        self.assertTrue(regenerate.is_current(self.builddir))
+
+    def test_changed_script(self):
+        self.write_state()
+        self.write('build.bfg', 'project("foo")\n')
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_changed_environment(self):
+        self.write_state()
+        self.env.variables['CFLAGS'] = '-O2'
+        self.env.save(self.builddir)
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_changed_program(self):
+        self.env.programs.add(sys.executable)
+        self.write_state()
+        self.assertTrue(regenerate.is_current(self.builddir))
+
+        state_file = os.path.join(self.builddir, regenerate.state_name)
+        with open(state_file) as inp:
+            state = inp.read().replace(sys.executable, sys.executable + 'x')
+        with open(state_file, 'w') as out:
+            out.write(state)
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_unrelated_file(self):
+        self.write_state()
+        self.write('dir/file.swp', age=0)
+        self.assertTrue(regenerate.is_current(self.builddir))
+
+    def test_added_file(self):
+        self.write_state()
+        self.write('dir/new.cpp', age=0)
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_removed_file(self):
+        self.write_state()
+        os.remove(os.path.join(self.env.srcdir.string(), 'file.cpp'))
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_quick_check(self):
+        self.age_dirs()
+        self.context['find_files']('.', '*.cpp')
+        self.write_state()
+        self.assertIs(regen_state.check(self.builddir), True)
+
+        self.write('dir/new.cpp')
+        self.assertIs(regen_state.check(self.builddir), None)
+        self.assertFalse(regenerate.is_current(self.builddir))
+
+    def test_quick_check_changed_environment(self):
+        self.age_dirs()
+        self.context['find_files']('.', '*.cpp')
+        self.write_state()
+        self.env.variables['CFLAGS'] = '-O2'
+        self.env.save(self.builddir)
+        self.assertIs(regen_state.check(self.builddir), False)
+
+    def test_quick_check_racy(self):
+        # The directories were just modified, so we need to search them again
+        # to tell if anything's changed.
+        self.write_state()
+        self.assertIs(regen_state.check(self.builddir), None)
+        self.assertTrue(regenerate.is_current(self.builddir))
+        self.assertIs(regen_state.check(self.builddir), None)
+
+        # Once the searches have been checked with old enough directories, the
+        # quick check can vouch for them.
+        self.age_dirs()
+        self.assertTrue(regenerate.is_current(self.builddir))
+        self.assertIs(regen_state.check(self.builddir), True)
+
+    def test_filter(self):
+        def my_filter(path, type):
+            return find.FindResult.include
+
+        self.context['find_files']('.', filter=my_filter)
+        self.write_state()
+        self.assertFalse(regenerate.is_current(self.builddir))
+        self.assertIs(regen_state.check(self.builddir), False)
+
+    def test_no_state(self):
+        self.assertFalse(regenerate.is_current(self.builddir))
+        self.assertIs(regen_state.check(self.builddir), False)
+        self.assertEqual(regenerate.watched_paths(self.builddir), [])
+
+    def test_watched_paths(self):
+        self.write_state()
+        srcdir = self.env.srcdir.string()
+        self.assertEqual(regenerate.watched_paths(self.builddir), [
+            os.path.join(srcdir, 'build.bfg'),
+            srcdir,
+            os.path.join(srcdir, 'dir'),
+        ])
@@ -0,0 +1,101 @@
+import os
+import stat
+import tempfile
+from unittest import mock
+
+from .. import *
+
+from bfg9000 import shell
+
+
+class TestWhich(TestCase):
+    def setUp(self):
+        shell.clear_path_cache()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.bindirs = [os.path.join(self.tmpdir.name, i)
+                        for i in ('bin1', 'bin2')]
+        for i in self.bindirs:
+            os.mkdir(i)
+        self.env = {'PATH': os.pathsep.join(self.bindirs), 'PATHEXT': ''}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        shell.clear_path_cache()
+
+    def make_program(self, dirname, name):
+        filename = os.path.join(dirname, name)
+        with open(filename, 'w'):
+            pass
+        os.chmod(filename, stat.S_IRWXU)
+        return filename
+
+    def test_found(self):
+        self.make_program(self.bindirs[1], 'prog')
+        self.assertEqual(shell.which('prog', self.env), ['prog'])
+        self.assertEqual(shell.which(['nonexist', 'prog'], self.env),
+                         ['prog'])
+        self.assertEqual(shell.which([['prog', '--arg']], self.env),
+                         ['prog', '--arg'])
+
+    def test_resolve(self):
+        filename = self.make_program(self.bindirs[1], 'prog')
+        self.assertEqual(shell.which('prog', self.env, resolve=True),
+                         [filename])
+
+    def test_order(self):
+        self.make_program(self.bindirs[1], 'prog')
+        filename = self.make_program(self.bindirs[0], 'prog')
+        self.assertEqual(shell.which('prog', self.env, resolve=True),
+                         [filename])
+
+    def test_absolute(self):
+        filename = self.make_program(self.bindirs[1], 'prog')
+        self.assertEqual(shell.which(filename, self.env), [filename])
+
+    def test_not_found(self):
+        with self.assertRaisesRegex(IOError, "unable to find executable "
+                                             "'prog'"):
+            shell.which('prog', self.env)
+        with self.assertRaisesRegex(IOError, "unable to find compiler; " +
+                                             "tried 'foo', 'bar'"):
+            shell.which(['foo', 'bar'], self.env, kind='compiler')
+
+    def test_cached_listing(self):
+        self.make_program(self.bindirs[1], 'prog')
+        with mock.patch('os.listdir', wraps=os.listdir) as m:
+            shell.which('prog', self.env)
+            shell.which('prog', self.env)
+            with self.assertRaises(IOError):
+                shell.which('nonexist', self.env)
+            self.assertEqual(m.call_count, 2)
+
+    def test_unlistable_dir(self):
+        filename = self.make_program(self.bindirs[1], 'prog')
+        real_listdir = os.listdir
+
+        def listdir(path):
+            if path == self.bindirs[1]:
+                raise PermissionError('permission denied')
+            return real_listdir(path)
+
+        with mock.patch('os.listdir', side_effect=listdir), \
+             mock.patch('os.path.exists', wraps=os.path.exists) as m:
+            self.assertEqual(shell.which('prog', self.env, resolve=True),
+                             [filename])
+            m.assert_called_with(filename)
+            with self.assertRaises(IOError):
+                shell.which('nonexist', self.env)
+
+    def test_case_insensitive_listing(self):
+        filename = self.make_program(self.bindirs[1], 'prog')
+        with mock.patch('os.listdir', return_value=['PROG']):
+            self.assertEqual(shell.which('prog', self.env, resolve=True),
+                             [filename])
+
+    def test_new_path(self):
+        self.make_program(self.bindirs[1], 'prog')
+        with self.assertRaises(IOError):
+            shell.which('prog', {'PATH': self.bindirs[0], 'PATHEXT': ''})
+
+        env = {'PATH': self.bindirs[1], 'PATHEXT': ''}
+        self.assertEqual(shell.which('prog', env), ['prog'])
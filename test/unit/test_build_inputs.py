@@ -1,9 +1,10 @@
 from . import *
 
-from bfg9000 import file_types
+from bfg9000 import builtins, file_types
 from bfg9000.build_inputs import BuildInputs, Edge
-from bfg9000.iterutils import default_sentinel, listify
+from bfg9000.iterutils import default_sentinel, empty_list, listify
 from bfg9000.path import Path, Root
+from bfg9000.snapshot import Snapshot
 
 
 class TestEdge(TestCase):
@@ -68,3 +69,49 @@ class TestEdge(TestCase):
         output = file_types.File(Path('file.txt'))
         self.assertEdge(Edge(self.build, output, description='desc'),
                         output, description='desc')
+
+    def test_no_extra_deps(self):
+        output = file_types.File(Path('file.txt'))
+        self.assertIs(Edge(self.build, output).extra_deps, empty_list)
+
+    def test_slots(self):
+        def subclasses(cls):
+            for i in cls.__subclasses__():
+                yield i
+                yield from subclasses(i)
+
+        # Make sure all the Edge subclasses have been defined.
+        builtins.init()
+        for i in [Edge] + list(subclasses(Edge)):
+            self.assertEqual(i.__dictoffset__, 0,
+                             '{} has a __dict__'.format(i.__name__))
+
+
+class TestBuildInputs(TestCase):
+    def setUp(self):
+        self.env = make_env()
+        self.build = BuildInputs(self.env, Path('build.bfg'))
+
+    def test_state(self):
+        snapshot = Snapshot(self.build.state())
+        src = self.build.add_source(file_types.File(Path('src.txt')))
+        bfgpath = self.build.add_bootstrap(Path('dir/build.bfg'))
+
+        state = self.build.state()[0]
+        self.assertEqual(snapshot.changes(), [
+            (state['_sources'], 'setitem', src.path, src),
+            (state['bootstrap_paths'], 'extend', [bfgpath]),
+        ])
+
+    def test_merge(self):
+        output = file_types.File(Path('file.txt'))
+        edge = Edge(BuildInputs(self.env, Path('build.bfg')), output)
+        target = file_types.File(Path('target.txt'))
+
+        state = self.build.state()[0]
+        self.assertEqual(self.build.merge([
+            (state['_edges'], 'extend', [edge]),
+            (state['_extra_targets'], 'extend', [target]),
+        ]), [output, target])
+        self.assertEqual(list(self.build.edges()), [edge])
+        self.assertEqual(list(self.build.targets()), [output, target])
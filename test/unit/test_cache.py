@@ -0,0 +1,315 @@
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from . import *
+
+from bfg9000 import shell
+from bfg9000.cache import (CodeCache, DirectoryCache, DirectoryIndex,
+                           ListingCache, ProbeCache, user_cache_dir)
+
+
+class TestUserCacheDir(TestCase):
+    def test_xdg(self):
+        self.assertEqual(user_cache_dir({'XDG_CACHE_HOME': '/cache'}),
+                         os.path.join('/cache', 'bfg9000'))
+
+    def test_default(self):
+        self.assertEqual(user_cache_dir({}), os.path.join(
+            os.path.expanduser('~'), '.cache', 'bfg9000'
+        ))
+
+
+class TestProbeCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ProbeCache(self.tmpdir.name)
+        self.env = make_env()
+        self.program = sys.executable
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def probe(self, args, **kwargs):
+        return self.cache.execute(self.env, [self.program] + args, **kwargs)
+
+    def test_cached(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            self.assertEqual(self.probe(['--version']), 'output')
+            self.assertEqual(self.probe(['--version']), 'output')
+            self.assertEqual(m.call_count, 1)
+
+            self.assertEqual(self.probe(['--help']), 'output')
+            self.assertEqual(m.call_count, 2)
+
+    def test_persistent(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value=('out', 'err')) as m:
+            self.assertEqual(self.probe(['-v']), ('out', 'err'))
+            self.cache = ProbeCache(self.tmpdir.name)
+            self.assertEqual(self.probe(['-v']), ('out', 'err'))
+            self.assertEqual(m.call_count, 1)
+
+    def test_failure(self):
+        err = shell.CalledProcessError(1, [self.program, '--bad'])
+        with mock.patch('bfg9000.shell.execute', side_effect=err) as m:
+            for i in range(2):
+                with self.assertRaises(shell.CalledProcessError):
+                    self.probe(['--bad'])
+            self.assertEqual(m.call_count, 1)
+
+    def test_variables(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            self.probe(['--version'])
+            self.env.variables['LDFLAGS'] = '-L/foo'
+            self.probe(['--version'])
+            self.assertEqual(m.call_count, 2)
+
+    def test_path_variables(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            self.probe(['--version'])
+            for i, var in enumerate(['PATH', 'COMPILER_PATH',
+                                     'GCC_EXEC_PREFIX']):
+                self.env.variables[var] = self.tmpdir.name
+                self.probe(['--version'])
+                self.assertEqual(m.call_count, i + 2)
+
+    def test_wrapped_program(self):
+        compiler = os.path.join(self.tmpdir.name, 'compiler')
+        with open(compiler, 'w') as f:
+            f.write('old')
+
+        args = [compiler, '--version']
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            self.probe(args)
+            self.probe(args)
+            self.assertEqual(m.call_count, 1)
+
+            os.remove(compiler)
+            with open(compiler, 'w') as f:
+                f.write('new compiler')
+            self.probe(args)
+            self.assertEqual(m.call_count, 2)
+
+    def test_mode(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            self.probe(['--version'], stdout=shell.Mode.pipe)
+            self.probe(['--version'], stderr=shell.Mode.pipe)
+            self.assertEqual(m.call_count, 2)
+
+    def test_unknown_program(self):
+        with mock.patch('bfg9000.shell.execute',
+                        return_value='output') as m:
+            for i in range(2):
+                self.assertEqual(self.cache.execute(
+                    self.env, ['nonexist-program', '--version']
+                ), 'output')
+            self.assertEqual(m.call_count, 2)
+
+
+class TestDirectoryIndex(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirname = os.path.join(self.tmpdir.name, 'dir')
+        os.mkdir(self.dirname)
+        for i in ('foo.h', 'libfoo.so'):
+            with open(os.path.join(self.dirname, i), 'w'):
+                pass
+
+        # Make the directory old enough that its listing can be cached.
+        stat = os.stat(self.dirname)
+        os.utime(self.dirname, ns=(stat.st_atime_ns,
+                                   stat.st_mtime_ns - 10 * 10**9))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exists(self):
+        index = DirectoryIndex()
+        self.assertTrue(index.exists(os.path.join(self.dirname, 'foo.h')))
+        self.assertFalse(index.exists(os.path.join(self.dirname, 'bar.h')))
+        self.assertFalse(index.exists(os.path.join(self.tmpdir.name,
+                                                   'nonexist', 'foo.h')))
+
+    def test_list_once(self):
+        index = DirectoryIndex()
+        with mock.patch('os.listdir', wraps=os.listdir) as m:
+            for i in ('foo.h', 'bar.h', 'libfoo.so', 'libbar.so'):
+                index.exists(os.path.join(self.dirname, i))
+            self.assertEqual(m.call_count, 1)
+
+    def test_broken_symlink(self):
+        os.symlink(os.path.join(self.dirname, 'nonexist'),
+                   os.path.join(self.dirname, 'libbar.so'))
+        index = DirectoryIndex()
+        self.assertFalse(index.exists(os.path.join(self.dirname,
+                                                   'libbar.so')))
+
+    def test_unlistable_dir(self):
+        index = DirectoryIndex()
+        with mock.patch('os.listdir', side_effect=PermissionError()) as m:
+            self.assertTrue(index.exists(os.path.join(self.dirname,
+                                                      'foo.h')))
+            self.assertFalse(index.exists(os.path.join(self.dirname,
+                                                       'bar.h')))
+            self.assertEqual(m.call_count, 1)
+
+    def test_case_insensitive_listing(self):
+        index = DirectoryIndex()
+        with mock.patch('os.listdir', return_value=['FOO.h']), \
+             mock.patch('os.path.exists', return_value=True):
+            self.assertTrue(index.exists(os.path.join(self.dirname,
+                                                      'foo.h')))
+
+    def test_persistent(self):
+        cache = DirectoryCache(self.tmpdir.name)
+        DirectoryIndex(cache).listing(self.dirname)
+        with mock.patch('os.listdir', wraps=os.listdir) as m:
+            index = DirectoryIndex(cache)
+            self.assertTrue(index.exists(os.path.join(self.dirname,
+                                                      'foo.h')))
+            self.assertEqual(m.call_count, 0)
+
+    def test_persistent_changed(self):
+        cache = DirectoryCache(self.tmpdir.name)
+        DirectoryIndex(cache).listing(self.dirname)
+        stat = os.stat(self.dirname)
+        filename = os.path.join(self.dirname, 'bar.h')
+        with open(filename, 'w'):
+            pass
+        os.utime(self.dirname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        index = DirectoryIndex(cache)
+        self.assertTrue(index.exists(filename))
+
+    def test_persistent_racy(self):
+        os.utime(self.dirname)
+        cache = DirectoryCache(self.tmpdir.name)
+        DirectoryIndex(cache).listing(self.dirname)
+        with mock.patch('os.listdir', wraps=os.listdir) as m:
+            DirectoryIndex(cache).listing(self.dirname)
+            self.assertEqual(m.call_count, 1)
+
+
+class TestListingCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirname = os.path.join(self.tmpdir.name, 'dir')
+        self.filename = os.path.join(self.tmpdir.name, 'cache.json')
+        os.mkdir(self.dirname)
+
+        # Make the directory old enough that its listing can be cached.
+        stat = os.stat(self.dirname)
+        os.utime(self.dirname, ns=(stat.st_atime_ns,
+                                   stat.st_mtime_ns - 10 * 10**9))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_uncached(self):
+        cache = ListingCache(self.filename)
+        list_fn = mock.Mock(return_value=['listing'])
+        self.assertEqual(cache.listdir(self.dirname, list_fn), ['listing'])
+        list_fn.assert_called_once_with(self.dirname)
+
+    def test_persistent(self):
+        cache = ListingCache(self.filename)
+        cache.listdir(self.dirname, lambda x: ['listing'])
+        cache.save()
+
+        cache = ListingCache(self.filename)
+        list_fn = mock.Mock(return_value=['new listing'])
+        self.assertEqual(cache.listdir(self.dirname, list_fn), ['listing'])
+        list_fn.assert_not_called()
+
+    def test_persistent_changed(self):
+        cache = ListingCache(self.filename)
+        cache.listdir(self.dirname, lambda x: ['listing'])
+        cache.save()
+
+        stat = os.stat(self.dirname)
+        os.utime(self.dirname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        cache = ListingCache(self.filename)
+        self.assertEqual(cache.listdir(self.dirname, lambda x: ['new']),
+                         ['new'])
+
+    def test_racy(self):
+        os.utime(self.dirname)
+        cache = ListingCache(self.filename)
+        cache.listdir(self.dirname, lambda x: ['listing'])
+        cache.save()
+
+        cache = ListingCache(self.filename)
+        self.assertEqual(cache.listdir(self.dirname, lambda x: ['new']),
+                         ['new'])
+
+    def test_only_save_used(self):
+        cache = ListingCache(self.filename)
+        cache.listdir(self.dirname, lambda x: ['listing'])
+        cache.save()
+
+        ListingCache(self.filename).save()
+        cache = ListingCache(self.filename)
+        self.assertEqual(cache.listdir(self.dirname, lambda x: ['new']),
+                         ['new'])
+
+    def test_nonexistent(self):
+        cache = ListingCache(self.filename)
+        with self.assertRaises(OSError):
+            cache.listdir(os.path.join(self.tmpdir.name, 'nonexist'),
+                          os.listdir)
+
+
+class TestCodeCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'code')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_code(self, code):
+        scope = {}
+        exec(code, scope)
+        return scope['x']
+
+    def test_compile(self):
+        code = CodeCache(self.path).compile('x = 1\n', 'build.bfg')
+        self.assertEqual(code.co_filename, 'build.bfg')
+        self.assertEqual(self.run_code(code), 1)
+
+    def test_persistent(self):
+        CodeCache(self.path).compile('x = 1\n', 'build.bfg')
+        with mock.patch('builtins.compile') as m:
+            code = CodeCache(self.path).compile('x = 1\n', 'build.bfg')
+            m.assert_not_called()
+        self.assertEqual(self.run_code(code), 1)
+
+    def test_persistent_changed(self):
+        CodeCache(self.path).compile('x = 1\n', 'build.bfg')
+        code = CodeCache(self.path).compile('x = 2\n', 'build.bfg')
+        self.assertEqual(self.run_code(code), 2)
+
+    def test_different_file(self):
+        CodeCache(self.path).compile('x = 1\n', 'build.bfg')
+        code = CodeCache(self.path).compile('x = 1\n', 'sub/build.bfg')
+        self.assertEqual(code.co_filename, 'sub/build.bfg')
+
+    def test_corrupt(self):
+        cache = CodeCache(self.path)
+        cache.compile('x = 1\n', 'build.bfg')
+        for i in os.listdir(self.path):
+            with open(os.path.join(self.path, i), 'wb') as out:
+                out.write(b'garbage')
+        self.assertEqual(self.run_code(cache.compile('x = 1\n', 'build.bfg')),
+                         1)
+
+    def test_syntax_error(self):
+        with self.assertRaises(SyntaxError):
+            CodeCache(self.path).compile('x = \n', 'build.bfg')
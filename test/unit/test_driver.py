@@ -1,12 +1,15 @@
 import argparse
+import json
 import logging
+import os
 import re
+import tempfile
 from io import StringIO
 from unittest import mock
 
 from . import *
 
-from bfg9000 import driver, log, path
+from bfg9000 import driver, log, path, profiler, trace
 from bfg9000.environment import EnvVersionError
 
 
@@ -26,6 +29,8 @@ class TestEnvironmentFromArgs(TestCase):
 
             shared=True,
             static=False,
+            probe_cache=False,
+            jobs=1,
         )
 
     def test_basic(self):
@@ -114,3 +119,74 @@ class TestReloadException(TestCase):
         self.assertRegex(self.stream.getvalue(),
                          'Unable to reload environment\n' +
                          '  Please re-run bfg9000 manually\n')
+
+
+class TestRunTraced(TestCase):
+    def setUp(self):
+        trace.init(False)
+        self.stream = StringIO()
+        log.init(stream=self.stream)
+
+    def tearDown(self):
+        trace.init(None)
+        profiler.init(False)
+        for i in logging.root.handlers[:]:
+            logging.root.removeHandler(i)
+
+    def make_args(self, trace_subprocesses=False, trace_file=None,
+                  subprocess_budget=None, profile=None):
+        return argparse.Namespace(trace_subprocesses=trace_subprocesses,
+                                  trace_file=trace_file,
+                                  subprocess_budget=subprocess_budget,
+                                  profile=profile)
+
+    def run_commands(self, count, result=None):
+        for i in range(count):
+            with trace.command(['cmd']):
+                pass
+        return result
+
+    def test_disabled(self):
+        self.assertEqual(driver.run_traced(
+            argparse.Namespace(), self.run_commands, 2
+        ), None)
+        self.assertFalse(trace.is_enabled())
+
+    def test_summary(self):
+        with mock.patch('sys.stderr', StringIO()) as stderr:
+            self.assertEqual(driver.run_traced(
+                self.make_args(trace_subprocesses=True), self.run_commands, 2
+            ), None)
+        self.assertRegex(stderr.getvalue(), '^2 subprocesses in ')
+
+    def test_trace_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'trace.json')
+            driver.run_traced(self.make_args(trace_file=filename),
+                              self.run_commands, 2)
+            with open(filename) as f:
+                self.assertEqual(json.load(f)['count'], 2)
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'profile.json')
+            driver.run_traced(self.make_args(profile=filename),
+                              self.run_commands, 2)
+            with open(filename) as f:
+                events = json.load(f)['traceEvents']
+            self.assertEqual([i['name'] for i in events], ['run_commands'])
+        self.assertFalse(profiler.is_enabled())
+
+    def test_within_budget(self):
+        self.assertEqual(driver.run_traced(
+            self.make_args(subprocess_budget=2), self.run_commands, 2
+        ), None)
+
+    def test_over_budget(self):
+        with mock.patch('sys.stderr', StringIO()) as stderr:
+            self.assertEqual(driver.run_traced(
+                self.make_args(subprocess_budget=1), self.run_commands, 2
+            ), 1)
+        self.assertRegex(stderr.getvalue(), '^2 subprocesses in ')
+        self.assertRegex(self.stream.getvalue(),
+                         'ran 2 subprocesses, exceeding the budget of 1')
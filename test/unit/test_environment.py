@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from . import *
 
@@ -30,6 +32,49 @@ class TestEnvironment(TestCase):
         with self.assertRaises(ValueError):
             env.builder('nonexist')
 
+    def test_preload_builders(self):
+        env = self.make_env()
+        env.jobs = 2
+        builder = object()
+        with mock.patch('bfg9000.tools.get_builder',
+                        return_value=builder) as m:
+            env.preload_builders(['c', 'c++'])
+            self.assertIs(env.builder('c'), builder)
+            self.assertIs(env.builder('c++'), builder)
+            self.assertIs(env.builder('c'), builder)
+            self.assertEqual(m.call_count, 2)
+
+    def test_preload_builders_error(self):
+        env = self.make_env()
+        env.jobs = 2
+        env.preload_builders(['nonexist'])
+        with self.assertRaises(ValueError):
+            env.builder('nonexist')
+
+    def test_wait_for_builders(self):
+        env = self.make_env()
+        env.jobs = 2
+        env.preload_builders(['nonexist'])
+        with mock.patch('concurrent.futures.ThreadPoolExecutor.shutdown',
+                        autospec=True,
+                        side_effect=ThreadPoolExecutor.shutdown) as m:
+            env.wait_for_builders()
+            m.assert_called_once_with(mock.ANY, wait=True)
+        with self.assertRaises(ValueError):
+            env.builder('nonexist')
+
+        # Preloading more builders afterward starts a new pool.
+        env.preload_builders(['nonexist2'])
+        env.wait_for_builders()
+        with self.assertRaises(ValueError):
+            env.builder('nonexist2')
+
+    def test_preload_builders_serial(self):
+        env = self.make_env()
+        with mock.patch('bfg9000.tools.get_builder') as m:
+            env.preload_builders(['c'])
+            m.assert_not_called()
+
     def test_tool(self):
         env = self.make_env()
         self.assertIsInstance(env.tool('rm'), rm.Rm)
@@ -43,6 +88,22 @@ class TestEnvironment(TestCase):
         with self.assertRaises(TypeError):
             env.run_arguments(src, 'nonexist')
 
+    def test_programs(self):
+        env = self.make_env()
+        with mock.patch('bfg9000.shell.execute'):
+            env.execute(['cc', '--version'])
+            env.execute('ld --version', shell=True)
+        self.assertEqual(env.programs, {'cc'})
+
+    def test_clear_caches(self):
+        env = self.make_env()
+        index = env.directory_index
+        self.assertIs(env.directory_index, index)
+        with mock.patch('bfg9000.shell.clear_path_cache') as m:
+            env.clear_caches()
+            m.assert_called_once_with()
+        self.assertIsNot(env.directory_index, index)
+
     def test_upgrade_from_v4(self):
         env = Environment.load(
             os.path.join(test_data_dir, 'environment', 'v4')
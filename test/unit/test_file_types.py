@@ -1,6 +1,8 @@
 from . import *
 
 from bfg9000.file_types import *
+from bfg9000.iterutils import empty_list
+from bfg9000.objutils import slot_names
 from bfg9000.path import Path, Root
 
 
@@ -15,7 +17,7 @@ class FileTest(TestCase):
         seen.add(id(a))
 
         self.assertEqual(type(a), type(b))
-        keys = ((set(a.__dict__.keys()) | set(b.__dict__.keys())) -
+        keys = ((set(slot_names(type(a))) | set(slot_names(type(b)))) -
                 getattr(a, '_clone_exclude', set())) | {'path'} | extra
 
         for i in keys:
@@ -40,6 +42,22 @@ class TestNode(TestCase):
         self.assertFalse(Node('foo') == Node('bar'))
         self.assertTrue(Node('foo') != Node('bar'))
 
+    def test_slots(self):
+        def subclasses(cls):
+            for i in cls.__subclasses__():
+                yield i
+                yield from subclasses(i)
+
+        for i in subclasses(Node):
+            self.assertEqual(i.__dictoffset__, 0,
+                             '{} has a __dict__'.format(i.__name__))
+
+    def test_private(self):
+        self.assertFalse(File(Path('a')).private)
+        self.assertTrue(ExportFile(Path('a')).private)
+        self.assertTrue(DllBinary(Path('a.dll'), 'elf', 'c',
+                                  Path('a.lib')).private)
+
 
 class TestFile(FileTest):
     def test_clone(self):
@@ -155,6 +173,20 @@ class TestObjectFile(FileTest):
                          ObjectFile(Path('a'), 'elf', 'c'))
 
 
+class TestLinkedBinary(TestCase):
+    def test_deps(self):
+        a = Executable(Path('a'), 'elf', 'c')
+        b = Executable(Path('b'), 'elf', 'c')
+        self.assertIs(a.runtime_deps, empty_list)
+        self.assertEqual(a.install_deps, [])
+
+        a.runtime_deps += [b]
+        a.linktime_deps += [b]
+        self.assertEqual(a.runtime_deps, [b])
+        self.assertEqual(a.install_deps, [b, b])
+        self.assertEqual(empty_list, [])
+
+
 class TestExecutable(FileTest):
     def test_clone(self):
         self.assertClone(Executable(Path('a', Root.srcdir), 'elf', 'c'),
@@ -1,3 +1,4 @@
+import pickle
 from collections import namedtuple
 
 from . import *
@@ -199,6 +200,49 @@ class TestRecursiveWalk(TestCase):
         )
 
 
+class TestTransitiveClosure(TestCase):
+    def closure(self, things, graph):
+        return iterutils.transitive_closure(things, lambda i: graph.get(i, []))
+
+    def test_empty(self):
+        self.assertEqual(self.closure([], {}), [])
+
+    def test_no_children(self):
+        self.assertEqual(self.closure(['a', 'b', 'a'], {}), ['a', 'b'])
+
+    def test_children(self):
+        graph = {'a': ['c'], 'b': ['d'], 'c': ['e']}
+        self.assertEqual(self.closure(['a', 'b'], graph),
+                         ['a', 'b', 'c', 'd', 'e'])
+
+    def test_diamond(self):
+        graph = {'a': ['b', 'c'], 'b': ['d'], 'c': ['d']}
+        self.assertEqual(self.closure(['a'], graph), ['a', 'b', 'c', 'd'])
+
+    def test_deep_diamonds(self):
+        # Each level depends on both nodes of the next level; walking this
+        # without memoization would take exponential time.
+        graph = {}
+        for i in range(100):
+            graph[(i, 0)] = graph[(i, 1)] = [(i + 1, 0), (i + 1, 1)]
+        result = self.closure([(0, 0)], graph)
+        self.assertEqual(len(result), 201)
+        self.assertEqual(result[:3], [(0, 0), (1, 0), (1, 1)])
+        self.assertEqual(result[-1], (100, 1))
+
+    def test_topological(self):
+        graph = {'b': ['a'], 'a': ['c']}
+        self.assertEqual(self.closure(['a', 'b'], graph), ['b', 'a', 'c'])
+
+    def test_cycle(self):
+        graph = {'a': ['b'], 'b': ['c'], 'c': ['a']}
+        self.assertEqual(self.closure(['a'], graph), ['a', 'b', 'c'])
+        self.assertEqual(self.closure(['b'], graph), ['b', 'c', 'a'])
+
+        graph = {'a': ['a', 'b']}
+        self.assertEqual(self.closure(['a'], graph), ['a', 'b'])
+
+
 class TestMergeIntoDict(TestCase):
     def test_merge_empty(self):
         d = {}
@@ -295,6 +339,36 @@ class TestMergeDicts(TestCase):
         self.assertEqual(d, {'foo': [1]})
 
 
+class TestEmptyList(TestCase):
+    def test_empty(self):
+        self.assertEqual(iterutils.empty_list, [])
+        self.assertEqual(len(iterutils.empty_list), 0)
+        self.assertEqual(iterutils.empty_list + [1], [1])
+        self.assertEqual([1] + iterutils.empty_list, [1])
+
+    def test_immutable(self):
+        with self.assertRaises(TypeError):
+            iterutils.empty_list.append(1)
+        with self.assertRaises(TypeError):
+            iterutils.empty_list.extend([1])
+        with self.assertRaises(TypeError):
+            iterutils.empty_list.insert(0, 1)
+        with self.assertRaises(TypeError):
+            iterutils.empty_list[:] = [1]
+        self.assertEqual(iterutils.empty_list, [])
+
+    def test_iadd(self):
+        x = iterutils.empty_list
+        x += (i for i in [1, 2])
+        self.assertEqual(x, [1, 2])
+        self.assertEqual(type(x), list)
+        self.assertEqual(iterutils.empty_list, [])
+
+    def test_pickle(self):
+        self.assertIs(pickle.loads(pickle.dumps(iterutils.empty_list)),
+                      iterutils.empty_list)
+
+
 class TestSliceDict(TestCase):
     def test_present(self):
         d = {'foo': 1, 'bar': 2, 'baz': 3}
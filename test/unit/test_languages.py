@@ -67,6 +67,11 @@ class TestLanguages(TestCase):
         self.assertEqual(g.extkind('.h'), 'header')
         self.assertEqual(g.extkind('.none'), None)
 
+    def test_iter(self):
+        with self.known_langs.make('c++') as x:
+            x.vars(compiler='CXX')
+        self.assertEqual([i.name for i in self.known_langs], ['c', 'c++'])
+
     def test_make_duplicate_ext(self):
         msg = r"^'\.c' already used by 'c'$"
         with self.assertRaisesRegex(ValueError, msg):
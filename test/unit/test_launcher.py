@@ -0,0 +1,42 @@
+from unittest import mock
+
+from . import *
+
+from bfg9000 import launcher
+
+
+class TestLauncher(TestCase):
+    def main(self, args, check_result=True):
+        with mock.patch('sys.argv', ['bfg9000'] + args), \
+             mock.patch('os.path.isdir', return_value=True), \
+             mock.patch('bfg9000.regen_state.check',
+                        return_value=check_result) as check, \
+             mock.patch('bfg9000.driver.main', return_value=1) as driver:
+            return launcher.main(), check, driver
+
+    def test_current(self):
+        result, check, driver = self.main(['refresh', 'build'])
+        self.assertEqual(result, 0)
+        check.assert_called_once_with('build')
+        driver.assert_not_called()
+
+    def test_current_default_dir(self):
+        result, check, driver = self.main(['refresh'])
+        self.assertEqual(result, 0)
+        check.assert_called_once_with('.')
+        driver.assert_not_called()
+
+    def test_not_current(self):
+        for i in (False, None):
+            result, check, driver = self.main(['refresh', 'build'], i)
+            self.assertEqual(result, 1)
+            check.assert_called_once_with('build')
+            driver.assert_called_once_with()
+
+    def test_other_args(self):
+        for args in (['configure', 'build'], ['refresh', '--force'],
+                     ['refresh', 'build', '--force'], []):
+            result, check, driver = self.main(args)
+            self.assertEqual(result, 1)
+            check.assert_not_called()
+            driver.assert_called_once_with()
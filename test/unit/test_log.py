@@ -62,7 +62,7 @@ class TestStackfulStreamHandler(TestCase):
         self.assertEqual(record.full_stack, [
             (this_file, lineno, 'test_internal_error',
              "iterutils.first(None)"),
-            (iterutils_file, 63, 'first', 'raise LookupError()'),
+            (iterutils_file, 64, 'first', 'raise LookupError()'),
         ])
         self.assertEqual(record.stack_pre, '')
         self.assertEqual(record.stack, (
@@ -72,7 +72,7 @@ class TestStackfulStreamHandler(TestCase):
         ).format(this_file, lineno))
         self.assertEqual(record.stack_post, (
             '\n' +
-            '  File "{}", line 63, in first\n' +
+            '  File "{}", line 64, in first\n' +
             "    raise LookupError()"
         ).format(iterutils_file))
         self.assertEqual(record.user_pathname, this_file)
@@ -118,12 +118,12 @@ class TestStackfulStreamHandler(TestCase):
 
         iterutils_file = iterutils.__file__.rstrip('c')
         self.assertEqual(record.full_stack, [
-            (iterutils_file, 63, 'first', 'raise LookupError()'),
+            (iterutils_file, 64, 'first', 'raise LookupError()'),
         ])
 
         self.assertEqual(record.stack_pre, (
             '\n' +
-            '  File "{}", line 63, in first\n' +
+            '  File "{}", line 64, in first\n' +
             "    raise LookupError()"
         ).format(iterutils_file))
         self.assertEqual(record.stack, '')
@@ -382,3 +382,21 @@ class TestInit(TestCase):
             with mock.patch('logging.root.setLevel') as setLevel:
                 log.init(debug=True)
                 setLevel.assert_called_once_with(log.DEBUG)
+
+
+class TestRedirect(TestCase):
+    def test_redirect(self):
+        old_stream, new_stream = mock.Mock(), mock.Mock()
+        handler = logging.StreamHandler(old_stream)
+        with mock.patch('logging.root.handlers', [handler]):
+            with log.redirect(new_stream):
+                self.assertIs(handler.stream, new_stream)
+            self.assertIs(handler.stream, old_stream)
+
+    def test_write_output(self):
+        stream = mock.Mock()
+        handlers = [logging.StreamHandler(stream),
+                    logging.StreamHandler(stream)]
+        with mock.patch('logging.root.handlers', handlers):
+            log.write_output('output')
+        stream.write.assert_called_once_with('output')
@@ -1,6 +1,6 @@
 from . import *
 
-from bfg9000.objutils import objectify
+from bfg9000.objutils import memoize_method, objectify, slot_items
 
 
 class TestObjectify(TestCase):
@@ -22,3 +22,52 @@ class TestObjectify(TestCase):
     def test_extra_args(self):
         self.assertEqual(objectify('foo', list, lambda x, y: [x, y], y='bar'),
                          ['foo', 'bar'])
+
+
+class TestMemoizeMethod(TestCase):
+    class Thing:
+        def __init__(self):
+            self.calls = 0
+
+        @memoize_method
+        def method(self, x, y=None):
+            self.calls += 1
+            return (x, y)
+
+    def test_memoize(self):
+        t = self.Thing()
+        self.assertEqual(t.method(1), (1, None))
+        self.assertEqual(t.method(1), (1, None))
+        self.assertEqual(t.calls, 1)
+
+        self.assertEqual(t.method(1, y=[2]), (1, [2]))
+        self.assertEqual(t.method(1, y=[2]), (1, [2]))
+        self.assertEqual(t.calls, 2)
+
+    def test_per_instance(self):
+        t1, t2 = self.Thing(), self.Thing()
+        t1.method(1)
+        t2.method(1)
+        self.assertEqual(t1.calls, 1)
+        self.assertEqual(t2.calls, 1)
+
+
+class TestSlotItems(TestCase):
+    class Base:
+        __slots__ = ('foo', 'bar')
+
+    class Derived(Base):
+        __slots__ = 'baz'
+
+    def test_items(self):
+        t = self.Derived()
+        t.foo = 1
+        t.baz = 3
+        self.assertEqual(list(slot_items(t)), [('foo', 1), ('baz', 3)])
+
+        t.bar = 2
+        self.assertEqual(list(slot_items(t)),
+                         [('foo', 1), ('bar', 2), ('baz', 3)])
+
+    def test_no_slots(self):
+        self.assertEqual(list(slot_items(object())), [])
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from . import *
 
 from bfg9000 import options
@@ -29,6 +31,37 @@ class TestOptionList(TestCase):
         opts.append('-v')
         self.assertEqual(list(opts), ['-v', '-v'])
 
+        opts = options.option_list()
+        opts.append(options.warning('all', 'error'))
+        opts.append(options.warning('all'))
+        opts.append(options.warning('all', 'error'))
+        self.assertEqual(list(opts), [options.warning('all', 'error'),
+                                      options.warning('all')])
+
+    def test_append_unhashable(self):
+        my_option = options.option('my_option', ['value'])
+        opts = options.option_list()
+        opts.append(my_option({'foo': 1}))
+        opts.append(my_option('foo'))
+        opts.append(my_option({'foo': 1}))
+        opts.append(my_option('foo'))
+        self.assertEqual(list(opts), [my_option({'foo': 1}),
+                                      my_option('foo')])
+
+    def test_append_custom_matches(self):
+        class my_option(options.Option):
+            _fields = [('name', str), ('value', str)]
+
+            def matches(self, rhs):
+                return isinstance(rhs, my_option) and self.name == rhs.name
+
+        opts = options.option_list()
+        opts.append(my_option('foo', 'value'))
+        opts.append(my_option('foo', 'other'))
+        opts.append(my_option('bar', 'value'))
+        self.assertEqual(list(opts), [my_option('foo', 'value'),
+                                      my_option('bar', 'value')])
+
     def test_extend(self):
         opts = options.option_list()
         opts.extend([options.pthread(), options.pic()])
@@ -57,6 +90,19 @@ class TestOptionList(TestCase):
         self.assertTrue(opts is not opts2)
         self.assertEqual(opts, opts2)
 
+        opts2.append(options.debug())
+        opts2.append(options.pthread())
+        self.assertEqual(list(opts), [options.pthread(), options.pic()])
+        self.assertEqual(list(opts2), [options.pthread(), options.pic(),
+                                       options.debug()])
+
+        opts.append('-v')
+        opts.append(options.debug())
+        self.assertEqual(list(opts), [options.pthread(), options.pic(), '-v',
+                                      options.debug()])
+        self.assertEqual(list(opts2), [options.pthread(), options.pic(),
+                                       options.debug()])
+
     def test_filter(self):
         opts = options.option_list(options.pthread(), options.pic())
         opts2 = opts.filter(options.pic)
@@ -86,6 +132,11 @@ class TestOptionList(TestCase):
         opts[0:] = [options.define('name')]
         self.assertEqual(opts, options.option_list(options.define('name')))
 
+        opts.append(options.pic())
+        opts.append(options.define('name'))
+        self.assertEqual(opts, options.option_list(options.define('name'),
+                                                   options.pic()))
+
     def test_eq(self):
         opts1 = options.option_list(options.pthread())
         opts2 = options.option_list(options.pthread())
@@ -117,6 +168,14 @@ class TestOptionList(TestCase):
             opts += [options.pic()]
 
 
+class TestIndexedOptionList(TestOptionList):
+    def setUp(self):
+        patcher = mock.patch.object(options.option_list, '_index_threshold',
+                                    0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
 class TestOption(TestCase):
     def test_create(self):
         my_option = options.option('my_option', ['value'])
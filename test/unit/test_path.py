@@ -1,5 +1,6 @@
 import errno
 import os
+import tempfile
 from collections import namedtuple
 from unittest import mock
 
@@ -326,6 +327,20 @@ class TestPath(PathTestCase):
             ValueError, lambda: p.relpath(self.Path('foo', path.Root.builddir))
         )
 
+    def test_relpath_common_prefix(self):
+        p = self.Path('foo/bar/baz', path.Root.srcdir)
+        self.assertEqual(p.relpath(self.Path('foo/quux', path.Root.srcdir),
+                                   localize=False), '../bar/baz')
+        self.assertEqual(p.relpath(self.Path('foo/b', path.Root.srcdir),
+                                   localize=False), '../bar/baz')
+        self.assertEqual(p.relpath(self.Path('foo/bar/baz/quux',
+                                             path.Root.srcdir),
+                                   localize=False), '..')
+
+        p = self.Path('foobar', path.Root.srcdir)
+        self.assertEqual(p.relpath(self.Path('foo', path.Root.srcdir),
+                                   localize=False), '../foobar')
+
     def test_relpath_absolute(self):
         p = self.Path('/foo/bar')
         self.assertEqual(p.relpath(self.Path('start')),
@@ -649,6 +664,57 @@ class TestMakedirs(TestCase):
             self.assertRaises(OSError, path.makedirs, 'file')
 
 
+class TestWriteIfChanged(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'file.txt')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, content, mode='w'):
+        with path.write_if_changed(self.filename, mode) as out:
+            out.write(content)
+
+    def backdate(self):
+        mtime = os.stat(self.filename).st_mtime_ns - 10 * 10**9
+        os.utime(self.filename, ns=(mtime, mtime))
+        return mtime
+
+    def read(self):
+        with open(self.filename) as inp:
+            return inp.read()
+
+    def test_new_file(self):
+        self.write('content')
+        self.assertEqual(self.read(), 'content')
+        self.assertEqual(os.listdir(self.tmpdir.name), ['file.txt'])
+
+    def test_unchanged(self):
+        self.write('content')
+        mtime = self.backdate()
+        self.write('content')
+        self.assertEqual(os.stat(self.filename).st_mtime_ns, mtime)
+        self.assertEqual(os.listdir(self.tmpdir.name), ['file.txt'])
+
+    def test_changed(self):
+        self.write('content')
+        mtime = self.backdate()
+        self.write(b'new content', 'wb')
+        self.assertEqual(self.read(), 'new content')
+        self.assertGreater(os.stat(self.filename).st_mtime_ns, mtime)
+        self.assertEqual(os.listdir(self.tmpdir.name), ['file.txt'])
+
+    def test_error(self):
+        self.write('content')
+        with self.assertRaises(ValueError):
+            with path.write_if_changed(self.filename) as out:
+                out.write('new content')
+                raise ValueError()
+        self.assertEqual(self.read(), 'content')
+        self.assertEqual(os.listdir(self.tmpdir.name), ['file.txt'])
+
+
 class TestPushd(TestCase):
     def test_basic(self):
         with mock.patch('os.getcwd', return_value='cwd'), \
@@ -659,6 +725,16 @@ class TestPushd(TestCase):
                 mock.call('foo'), mock.call('cwd')
             ])
 
+    def test_exception(self):
+        with mock.patch('os.getcwd', return_value='cwd'), \
+             mock.patch('os.chdir') as os_chdir:  # noqa
+            with self.assertRaises(ValueError):
+                with path.pushd('foo'):
+                    raise ValueError()
+            self.assertEqual(os_chdir.mock_calls, [
+                mock.call('foo'), mock.call('cwd')
+            ])
+
     def test_makedirs(self):
         with mock.patch('os.makedirs') as os_makedirs, \
              mock.patch('os.getcwd', return_value='cwd'), \
@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+
+from . import *
+
+from bfg9000 import profiler
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        profiler.init(True)
+
+    def tearDown(self):
+        profiler.init(False)
+
+    def events(self):
+        out = StringIO()
+        profiler.write(out)
+        return json.loads(out.getvalue())['traceEvents']
+
+    def test_disabled(self):
+        profiler.init(False)
+        self.assertFalse(profiler.is_enabled())
+        with profiler.span('name'):
+            pass
+        self.assertEqual(self.events(), [])
+
+    def test_span(self):
+        with profiler.span('name', 'category', arg='value'):
+            pass
+        events = self.events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['name'], 'name')
+        self.assertEqual(events[0]['cat'], 'category')
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['args'], {'arg': 'value'})
+        self.assertGreaterEqual(events[0]['dur'], 0)
+
+    def test_nested(self):
+        with profiler.span('outer'):
+            with profiler.span('inner'):
+                pass
+        inner, outer = self.events()
+        self.assertEqual([inner['name'], outer['name']], ['inner', 'outer'])
+        self.assertGreaterEqual(inner['ts'], outer['ts'])
+        self.assertLessEqual(inner['ts'] + inner['dur'],
+                             outer['ts'] + outer['dur'])
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            with profiler.span('name'):
+                raise ValueError()
+        self.assertEqual(len(self.events()), 1)
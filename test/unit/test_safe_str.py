@@ -122,6 +122,11 @@ class TestJbos(TestCase):
         s = jbos(shell_literal('foo'), shell_literal('bar'))
         self.assertEqual(s.bits, (shell_literal('foobar'),))
 
+        s = jbos('a', 'b', '', 'c', literal('d'), literal('e'), MySafeStr(1),
+                 MySafeStr(2), shell_literal('f'), 'g', 'h')
+        self.assertEqual(s.bits, ('abc', literal('de'), MySafeStr(1),
+                                  MySafeStr(2), shell_literal('f'), 'gh'))
+
     def test_construct_invalid(self):
         self.assertRaises(TypeError, jbos, 123)
 
@@ -203,6 +208,15 @@ class TestJoin(TestCase):
         s = safe_str.join([shell_literal('foo'), 'bar'], shell_literal(','))
         self.assertEqual(s.bits, (shell_literal('foo,'), 'bar'))
 
+    def test_join_objects(self):
+        s = safe_str.join([MyString(), MyLiteral(), MySafeStr(1)], ',')
+        self.assertEqual(s.bits, ('foo,', literal('foo'), ',', MySafeStr(1)))
+
+    def test_join_many(self):
+        s = safe_str.join([literal(str(i)) for i in range(1000)], ',')
+        self.assertEqual(len(s.bits), 1999)
+        self.assertEqual(s.bits[:3], (literal('0'), ',', literal('1')))
+
 
 class TestSafeFormat(TestCase):
     def test_simple(self):
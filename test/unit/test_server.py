@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+from unittest import mock
+
+from . import *
+
+from bfg9000 import server
+
+
+@skip_if(not server.is_supported, 'Unix domain sockets are not supported')
+class TestServer(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'server.sock')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def serve(self, handler, count=1):
+        srv = server.Server(self.path, handler)
+
+        def run():
+            try:
+                for i in range(count):
+                    srv.handle_one()
+            finally:
+                srv.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_request(self):
+        def handler(message, stream):
+            stream.write('hello ')
+            stream.write(message['name'] + '\n')
+            return 42
+
+        thread = self.serve(handler)
+        out = io.StringIO()
+        self.assertEqual(server.request(self.path, {'name': 'world'}, out), 42)
+        self.assertEqual(out.getvalue(), 'hello world\n')
+        thread.join()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_no_server(self):
+        out = io.StringIO()
+        self.assertEqual(server.request(self.path, {}, out), None)
+
+    def test_stale_socket(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        sock.close()
+
+        out = io.StringIO()
+        self.assertEqual(server.request(self.path, {}, out), None)
+
+        thread = self.serve(lambda message, stream: 0)
+        self.assertEqual(server.request(self.path, {}, out), 0)
+        thread.join()
+
+    def test_already_running(self):
+        thread = self.serve(lambda message, stream: 0)
+        with self.assertRaises(OSError):
+            server.Server(self.path, lambda message, stream: 0)
+        server.request(self.path, {}, io.StringIO())
+        thread.join()
+
+    def raw_request(self, data):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+            sock.sendall((data + '\n').encode('utf-8'))
+            with sock.makefile('r', encoding='utf-8') as f:
+                return json.loads(f.readline())
+        finally:
+            sock.close()
+
+    def test_handler_error(self):
+        def handler(message, stream):
+            stream.write('working\n')
+            if message.get('fail'):
+                raise RuntimeError('oops')
+            return 0
+
+        thread = self.serve(handler, count=2)
+        out = io.StringIO()
+        self.assertEqual(server.request(self.path, {'fail': True}, out), None)
+        self.assertEqual(out.getvalue(), 'working\n')
+
+        # The server should keep running after the error.
+        self.assertEqual(server.request(self.path, {}, out), 0)
+        thread.join()
+
+    def test_version_mismatch(self):
+        handler = mock.Mock(return_value=0)
+        thread = self.serve(handler)
+        self.assertEqual(self.raw_request(json.dumps({
+            'version': {'bfg9000': '0.0', 'environment': 0},
+            'message': {},
+        })), {'error': mock.ANY})
+        thread.join()
+        handler.assert_not_called()
+
+    def test_malformed_request(self):
+        handler = mock.Mock(return_value=0)
+        thread = self.serve(handler, count=3)
+        for i in ('garbage', '[]', json.dumps({'message': None})):
+            self.assertEqual(self.raw_request(i), {'error': mock.ANY})
+        thread.join()
+        handler.assert_not_called()
+
+    def test_socket_path(self):
+        self.assertEqual(server.socket_path({'BFG9000_SERVER': self.path}),
+                         self.path)
+        self.assertEqual(server.socket_path({'XDG_CACHE_HOME': '/cache'}),
+                         os.path.join('/cache', 'bfg9000', 'server.sock'))
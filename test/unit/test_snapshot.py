@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+from . import *
+
+from bfg9000.snapshot import KnownObjects, Snapshot
+
+
+class Thing:
+    def __init__(self, value):
+        self.value = value
+
+
+class SlotThing:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TestSnapshot(TestCase):
+    def test_list(self):
+        value = [1, 2]
+        snapshot = Snapshot([value])
+        value.extend([3, 4])
+        changes = snapshot.changes()
+        self.assertEqual(changes, [(value, 'extend', [3, 4])])
+
+        other = [1, 2]
+        Snapshot.apply([(other, 'extend', [3, 4])])
+        self.assertEqual(other, [1, 2, 3, 4])
+
+    def test_set(self):
+        value = {1, 2}
+        snapshot = Snapshot([value])
+        value.add(3)
+        self.assertEqual(snapshot.changes(), [(value, 'update', {3})])
+
+    def test_dict(self):
+        old = Thing(1)
+        value = {'old': old, 'replaced': 1}
+        snapshot = Snapshot([value])
+        value['new'] = 2
+        value['replaced'] = 3
+        self.assertEqual(snapshot.changes(), [
+            (value, 'setitem', 'replaced', 3),
+            (value, 'setitem', 'new', 2),
+        ])
+
+    def test_nested(self):
+        nested = [1]
+        value = defaultdict(list, {'nested': nested})
+        snapshot = Snapshot([value])
+        nested.append(2)
+        value['new'].append(3)
+        self.assertEqual(snapshot.changes(), [
+            (nested, 'extend', [2]),
+            (value, 'setitem', 'new', [3]),
+        ])
+
+    def test_unchanged(self):
+        snapshot = Snapshot([[1], {2}, {'3': [4]}])
+        self.assertEqual(snapshot.changes(), [])
+
+    def test_replaced_item(self):
+        value = [Thing(1), Thing(2)]
+        snapshot = Snapshot([value])
+        value[0] = Thing(3)
+        self.assertRaises(ValueError, snapshot.changes)
+
+    def test_removed_item(self):
+        for value, remove in (([1, 2], list.pop), ({1, 2}, set.pop),
+                              ({'1': 1, '2': 2}, dict.popitem)):
+            snapshot = Snapshot([value])
+            remove(value)
+            self.assertRaises(ValueError, snapshot.changes)
+
+    def test_watched_object(self):
+        for thing in (Thing(1), SlotThing(1)):
+            snapshot = Snapshot([[thing]], (Thing, SlotThing))
+            self.assertEqual(snapshot.changes(), [])
+            thing.value = 2
+            self.assertRaises(ValueError, snapshot.changes)
+
+    def test_watched_container(self):
+        nested = [1]
+        thing = Thing({'nested': nested})
+        snapshot = Snapshot([{'thing': thing}], (Thing,))
+        nested.append(2)
+        self.assertRaises(ValueError, snapshot.changes)
+
+    def test_unwatched_object(self):
+        thing = Thing(1)
+        snapshot = Snapshot([[thing]])
+        thing.value = 2
+        self.assertEqual(snapshot.changes(), [])
+
+
+class TestKnownObjects(TestCase):
+    def test_known(self):
+        old = Thing(1)
+        container = [old]
+        known = KnownObjects([container])
+
+        new = Thing(old)
+        result = known.loads(known.dumps([container, new]))
+        self.assertIs(result[0], container)
+        self.assertIsNot(result[1], new)
+        self.assertIs(result[1].value, old)
+
+    def test_untracked_dict(self):
+        old = Thing('untracked')
+        known = KnownObjects([old])
+        self.assertIs(known.loads(known.dumps(vars(old))), vars(old))
+
+    def test_unreachable(self):
+        old = Thing(1)
+        known = KnownObjects([[Thing(2)]])
+        result = known.loads(known.dumps(old))
+        self.assertIsNot(result, old)
+        self.assertEqual(result.value, 1)
+
+    def test_unnamed_function(self):
+        def fn():  # pragma: no cover
+            pass
+
+        fn.__qualname__ = 'not_found'
+        known = KnownObjects([Thing(fn)])
+        self.assertIs(known.loads(known.dumps(fn)), fn)
@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+
+from . import *
+
+from bfg9000 import shell, trace
+
+
+class TestTrace(TestCase):
+    def setUp(self):
+        # Clear out any commands recorded before tracing was enabled.
+        trace.init(False)
+        trace.init(True)
+
+    def tearDown(self):
+        trace.init(None)
+
+    def test_disabled(self):
+        trace.init(False)
+        shell.execute([sys.executable, '-c', 'pass'])
+        self.assertEqual(trace.records(), [])
+        self.assertFalse(trace.is_enabled())
+
+    def test_execute(self):
+        shell.execute([sys.executable, '-c', 'print("hello")'],
+                      stdout=shell.Mode.pipe)
+        records = trace.records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].args,
+                         [sys.executable, '-c', 'print("hello")'])
+        self.assertEqual(records[0].returncode, 0)
+        self.assertEqual(records[0].output_size, 6)
+        self.assertRegex(records[0].site, r'test_trace\.py:\d+$')
+        self.assertGreaterEqual(records[0].duration, 0)
+
+    def test_execute_failed(self):
+        with self.assertRaises(shell.CalledProcessError):
+            shell.execute([sys.executable, '-c', 'exit(1)'])
+        self.assertEqual(trace.records()[0].returncode, 1)
+
+    def test_called_process_error(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            with trace.command(['cmd']):
+                raise subprocess.CalledProcessError(2, ['cmd'])
+        self.assertEqual(trace.records()[0].returncode, 2)
+
+    def test_bfg_site(self):
+        code = compile('with trace.command(["cmd"]): pass', 'build.bfg',
+                       'exec')
+        exec(code, {'trace': trace})
+        self.assertEqual(trace.records()[0].site, 'build.bfg:1')
+
+    def test_pending(self):
+        trace.init(False)
+        trace.init(None)
+        for i in range(trace._max_pending + 1):
+            with trace.command(['cmd']):
+                pass
+        self.assertEqual(len(trace.records()), trace._max_pending)
+
+    def test_format_table(self):
+        with trace.command(['cmd', 'arg']) as record:
+            record.returncode = 0
+        table = trace.format_table(trace.records())
+        self.assertRegex(table, r'^1 subprocesses in \d+\.\d{3}s\n')
+        self.assertRegex(table, r'\n +\d+\.\d{3}s +0 +- +\S+ +cmd arg$')
+
+    def test_dump_json(self):
+        with trace.command(['cmd']):
+            pass
+        out = StringIO()
+        trace.dump_json(trace.records(), out)
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['subprocesses'][0]['args'], ['cmd'])
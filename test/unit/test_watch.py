@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from . import *
+
+from bfg9000.watch import InotifyWatcher, PollingWatcher, make_watcher
+
+is_linux = sys.platform.startswith('linux')
+
+
+class WatcherTest:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirname = os.path.join(self.tmpdir.name, 'dir')
+        self.filename = os.path.join(self.tmpdir.name, 'file')
+        os.mkdir(self.dirname)
+        self.write(self.filename)
+
+        self.watcher = self.make_watcher([self.dirname, self.filename])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmpdir.cleanup()
+
+    def write(self, filename, content=''):
+        with open(filename, 'w') as out:
+            out.write(content)
+        # Make sure the modification time changes, even on filesystems with
+        # coarse timestamps.
+        mtime = os.stat(filename).st_mtime_ns + 10**9
+        os.utime(filename, ns=(mtime, mtime))
+
+    def test_unchanged(self):
+        self.assertFalse(self.watcher.wait(0))
+
+    def test_modify_file(self):
+        self.write(self.filename, 'foo')
+        self.assertTrue(self.watcher.wait(1))
+        self.assertFalse(self.watcher.wait(0))
+
+    def test_add_to_dir(self):
+        self.write(os.path.join(self.dirname, 'new'))
+        self.assertTrue(self.watcher.wait(1))
+        self.assertFalse(self.watcher.wait(0))
+
+    def test_remove_file(self):
+        os.remove(self.filename)
+        self.assertTrue(self.watcher.wait(1))
+
+
+class TestPollingWatcher(WatcherTest, TestCase):
+    def make_watcher(self, paths):
+        return PollingWatcher(paths, interval=0.01)
+
+
+@skip_if(not is_linux, 'inotify is only supported on Linux')
+class TestInotifyWatcher(WatcherTest, TestCase):
+    def make_watcher(self, paths):
+        return InotifyWatcher(paths)
+
+    def test_missing_dir(self):
+        watcher = InotifyWatcher([
+            os.path.join(self.dirname, 'nonexist', 'file')
+        ])
+        watcher.close()
+
+
+class TestMakeWatcher(TestCase):
+    def test_poll(self):
+        watcher = make_watcher([], poll=True)
+        self.assertIsInstance(watcher, PollingWatcher)
+
+    @skip_if(not is_linux, 'inotify is only supported on Linux')
+    def test_inotify(self):
+        watcher = make_watcher([])
+        self.assertIsInstance(watcher, InotifyWatcher)
+        watcher.close()
+
+    def test_fallback(self):
+        with mock.patch('bfg9000.watch.InotifyWatcher', side_effect=OSError):
+            watcher = make_watcher([])
+        self.assertIsInstance(watcher, PollingWatcher)
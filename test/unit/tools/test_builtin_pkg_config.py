@@ -0,0 +1,206 @@
+import os
+import tempfile
+
+from .. import *
+
+from bfg9000.exceptions import PackageResolutionError
+from bfg9000.packages import PackageKind
+from bfg9000.tools.builtin_pkg_config import (BuiltinPkgConfig, PcFile,
+                                              PcFileError, vercmp)
+from bfg9000.tools.pkg_config import PkgConfigPackage
+from bfg9000.versioning import SpecifierSet, Version
+
+pc_files = {
+    'foo': ('prefix=/opt/foo\n'
+            'libdir=${prefix}/lib\n'
+            'includedir=${prefix}/include # comment\n'
+            '\n'
+            'Name: foo\n'
+            'Description: the foo library\n'
+            'Version: 1.2.3\n'
+            'Requires: bar >= 1.0\n'
+            'Requires.private: baz\n'
+            'Cflags: -I${includedir} -DFOO\n'
+            'Libs: -L${libdir} -lfoo\n'
+            'Libs.private: -lm\n'),
+    'bar': ('prefix=/opt/bar\n'
+            'Name: bar\n'
+            'Description: the bar library\n'
+            'Version: 1.1\n'
+            'Cflags: -I${prefix}/include -I/usr/include\n'
+            'Libs: -L${prefix}/lib -L/usr/lib -lbar \\\n'
+            '  -lm\n'),
+    'baz': ('Name: baz\n'
+            'Description: the baz library\n'
+            'Version: 2.0\n'
+            'CFlags: -DBAZ\n'
+            'Cflags.private: -DBAZ_STATIC\n'
+            'Libs: -lbaz\n'
+            'Libs.private: -lz\n'),
+    'broken': ('Name: broken\n'
+               'Description: a broken library\n'
+               'Version: 1.0\n'
+               'Requires: bar > 2.0\n'),
+}
+
+
+class TestVercmp(TestCase):
+    def test_equal(self):
+        self.assertEqual(vercmp('1.0', '1.0'), 0)
+        self.assertEqual(vercmp('1.0', '1-0'), 0)
+
+    def test_numeric(self):
+        self.assertEqual(vercmp('1.10', '1.9'), 1)
+        self.assertEqual(vercmp('1.9', '1.10'), -1)
+        self.assertEqual(vercmp('1.0.1', '1.0'), 1)
+        self.assertEqual(vercmp('1.0', '1.0.1'), -1)
+
+    def test_alpha(self):
+        self.assertEqual(vercmp('1.0b', '1.0a'), 1)
+        self.assertEqual(vercmp('1.0a', '1.0.1'), -1)
+
+
+class TestPcFile(TestCase):
+    def test_parse(self):
+        pc = PcFile.parse('foo', pc_files['foo'].splitlines(True))
+        self.assertEqual(pc.version, '1.2.3')
+        self.assertEqual(pc.variables, {
+            'prefix': '/opt/foo',
+            'libdir': '/opt/foo/lib',
+            'includedir': '/opt/foo/include',
+        })
+        self.assertEqual(pc.flags('Cflags'), ['-I/opt/foo/include', '-DFOO'])
+        self.assertEqual(pc.flags('Libs'), ['-L/opt/foo/lib', '-lfoo'])
+        self.assertEqual(pc.flags('Nonexistent'), [])
+        self.assertEqual(pc.requires(), [('bar', '>=', '1.0')])
+        self.assertEqual(pc.requires(private=True), [('baz', None, None)])
+
+    def test_continuation(self):
+        pc = PcFile.parse('bar', pc_files['bar'].splitlines(True))
+        self.assertEqual(pc.flags('Libs'), [
+            '-L/opt/bar/lib', '-L/usr/lib', '-lbar', '-lm'
+        ])
+
+    def test_escapes(self):
+        pc = PcFile.parse('foo', [
+            'Name: foo\n', 'Description: cost: $$5 \\# 1\n', 'Version: 1\n',
+        ])
+        self.assertEqual(pc.fields['Description'], 'cost: $5 # 1')
+
+    def test_requires_list(self):
+        pc = PcFile.parse('foo', [
+            'Name: foo\n', 'Description: foo\n', 'Version: 1\n',
+            'Requires: a, b>=1.0 c  <  2,d\n',
+        ])
+        self.assertEqual(pc.requires(), [
+            ('a', None, None), ('b', '>=', '1.0'), ('c', '<', '2'),
+            ('d', None, None),
+        ])
+
+    def test_undefined_variable(self):
+        with self.assertRaises(PcFileError):
+            PcFile.parse('foo', [
+                'Name: foo\n', 'Description: foo\n', 'Version: ${ver}\n',
+            ])
+
+    def test_missing_field(self):
+        with self.assertRaises(PcFileError):
+            PcFile.parse('foo', ['Name: foo\n', 'Version: 1.0\n'])
+
+
+class TestBuiltinPkgConfig(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        for name, data in pc_files.items():
+            with open(os.path.join(self.tmpdir.name, name + '.pc'), 'w') as f:
+                f.write(data)
+
+        self.env = make_env(clear_variables=True, variables={
+            'PKG_CONFIG': 'builtin',
+            'PKG_CONFIG_LIBDIR': self.tmpdir.name,
+        })
+        self.pkg_config = BuiltinPkgConfig(self.env)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_tool(self):
+        self.assertIsInstance(self.env.tool('pkg_config'), BuiltinPkgConfig)
+
+    def test_search_path(self):
+        self.env.variables['PKG_CONFIG_PATH'] = os.pathsep.join(['/a', '/b'])
+        self.assertEqual(self.pkg_config.search_path(),
+                         ['/a', '/b', self.tmpdir.name])
+
+    def test_index(self):
+        self.assertEqual(self.pkg_config.index, {
+            i: os.path.join(self.tmpdir.name, i + '.pc') for i in pc_files
+        })
+
+    def test_info(self):
+        self.assertEqual(self.pkg_config.run('foo', 'info'),
+                         '1.2.3\n{}\n'.format(self.tmpdir.name))
+        self.assertEqual(self.pkg_config.run('foo', 'version'), '1.2.3\n')
+        self.assertEqual(self.pkg_config.run('foo', 'path'),
+                         self.tmpdir.name + '\n')
+
+    def test_not_found(self):
+        with self.assertRaises(PackageResolutionError):
+            self.pkg_config.run('nonexist', 'info')
+
+    def test_cflags(self):
+        self.assertEqual(self.pkg_config.cflags('foo', self.env.variables), [
+            '-I/opt/foo/include', '-DFOO', '-I/opt/bar/include', '-DBAZ'
+        ])
+
+    def test_cflags_static(self):
+        self.assertEqual(
+            self.pkg_config.cflags('foo', self.env.variables, static=True),
+            ['-I/opt/foo/include', '-DFOO', '-I/opt/bar/include', '-DBAZ',
+             '-DBAZ_STATIC']
+        )
+
+    def test_cflags_allow_system(self):
+        self.assertEqual(self.pkg_config.cflags('bar', {
+            'PKG_CONFIG_ALLOW_SYSTEM_CFLAGS': '1',
+        }), ['-I/opt/bar/include', '-I/usr/include'])
+
+    def test_libs(self):
+        self.assertEqual(self.pkg_config.libs('foo', self.env.variables), [
+            '-L/opt/foo/lib', '-lfoo', '-L/opt/bar/lib', '-lbar', '-lm'
+        ])
+
+    def test_libs_static(self):
+        self.assertEqual(
+            self.pkg_config.libs('foo', self.env.variables, static=True),
+            ['-L/opt/foo/lib', '-lfoo', '-L/opt/bar/lib', '-lbar', '-lm',
+             '-lbaz', '-lz']
+        )
+
+    def test_libs_allow_system(self):
+        self.assertEqual(self.pkg_config.libs('bar', {
+            'PKG_CONFIG_ALLOW_SYSTEM_LIBS': '1',
+        }), ['-L/opt/bar/lib', '-L/usr/lib', '-lbar', '-lm'])
+
+    def test_libs_msvc(self):
+        self.assertEqual(
+            self.pkg_config.libs('bar', self.env.variables, msvc_syntax=True),
+            ['/libpath:/opt/bar/lib', 'bar.lib', 'm.lib']
+        )
+
+    def test_sysroot(self):
+        variables = {'PKG_CONFIG_SYSROOT_DIR': '/sysroot'}
+        self.assertEqual(self.pkg_config.cflags('bar', variables),
+                         ['-I/sysroot/opt/bar/include'])
+        self.assertEqual(self.pkg_config.libs('bar', variables),
+                         ['-L/sysroot/opt/bar/lib', '-lbar', '-lm'])
+
+    def test_version_mismatch(self):
+        with self.assertRaises(PackageResolutionError):
+            self.pkg_config.run('broken', 'cflags')
+
+    def test_package(self):
+        pkg = PkgConfigPackage('foo', 'elf', SpecifierSet('>=1.2'),
+                               PackageKind.any, self.pkg_config)
+        self.assertEqual(pkg.version, Version('1.2.3'))
+        self.assertEqual(pkg.path(), self.tmpdir.name)
@@ -791,7 +791,8 @@ class TestCcPackageResolver(CrossPlatformTestCase):
                                       'version').packages
 
     def test_header_not_found(self):
-        with mock.patch('bfg9000.tools.cc.exists', return_value=False):
+        with mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.header('foo.hpp')
 
@@ -800,7 +801,8 @@ class TestCcPackageResolver(CrossPlatformTestCase):
             self.packages.header('foo.hpp', [Path('dir', Root.srcdir)])
 
     def test_library_not_found(self):
-        with mock.patch('bfg9000.tools.cc.exists', return_value=False):
+        with mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.library('foo')
 
@@ -571,7 +571,8 @@ class TestMsvcPackageResolver(CrossPlatformTestCase):
                                         'version').packages
 
     def test_header_not_found(self):
-        with mock.patch('bfg9000.tools.msvc.exists', return_value=False):
+        with mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.header('foo.hpp')
 
@@ -580,7 +581,8 @@ class TestMsvcPackageResolver(CrossPlatformTestCase):
             self.packages.header('foo.hpp', [Path('dir', Root.srcdir)])
 
     def test_library_not_found(self):
-        with mock.patch('bfg9000.tools.msvc.exists', return_value=False):
+        with mock.patch('bfg9000.cache.DirectoryIndex.exists',
+                        return_value=False):
             with self.assertRaises(PackageResolutionError):
                 self.packages.library('foo')
 
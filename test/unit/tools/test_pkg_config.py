@@ -0,0 +1,102 @@
+from unittest import mock
+
+from . import *
+
+from bfg9000 import options as opts
+from bfg9000.exceptions import PackageResolutionError
+from bfg9000.packages import PackageKind
+from bfg9000.path import Path, Root
+from bfg9000.shell import CalledProcessError
+from bfg9000.tools.pkg_config import PkgConfig, PkgConfigPackage
+from bfg9000.versioning import SpecifierSet, Version
+
+
+def mock_execute(args, **kwargs):
+    if '--modversion' in args and '--variable=pcfiledir' in args:
+        return '1.0\n/path/to/pkgconfig\n'
+    elif '--cflags' in args:
+        return '-I/path/to/include -DFOO\n'
+    elif '--libs' in args:
+        return '-L/path/to/lib -pthread -lfoo -lbar\n'
+    elif '--libs-only-L' in args:
+        return '-L/path/to/lib\n'
+    raise OSError('unknown command: {}'.format(args))
+
+
+class TestPkgConfigPackage(ToolTestCase):
+    tool_type = PkgConfig
+
+    def make_package(self, kind=PackageKind.any, execute=mock_execute):
+        with mock.patch('bfg9000.shell.execute', execute):
+            return PkgConfigPackage('foo', 'elf', SpecifierSet(), kind,
+                                    self.tool)
+
+    def test_info(self):
+        pkg = self.make_package()
+        self.assertEqual(pkg.version, Version('1.0'))
+        self.assertEqual(pkg.path(), '/path/to/pkgconfig')
+
+    def test_info_fallback(self):
+        def execute(args, **kwargs):
+            if args[-1] == '--modversion':
+                return '1.0\n'
+            return '/path/to/pkgconfig\n'
+
+        pkg = self.make_package(execute=execute)
+        self.assertEqual(pkg.version, Version('1.0'))
+        self.assertEqual(pkg.path(), '/path/to/pkgconfig')
+
+    def test_not_found(self):
+        def execute(args, **kwargs):
+            raise CalledProcessError(1, args)
+
+        with self.assertRaises(PackageResolutionError):
+            self.make_package(execute=execute)
+
+    def test_compile_options(self):
+        pkg = self.make_package()
+        compiler = AttrDict(flavor='cc')
+        with mock.patch('bfg9000.shell.execute',
+                        side_effect=mock_execute) as m:
+            self.assertEqual(pkg.compile_options(compiler), opts.option_list(
+                '-I/path/to/include', '-DFOO'
+            ))
+            pkg.compile_options(compiler)
+            self.assertEqual(m.call_count, 1)
+
+    def test_link_options(self):
+        pkg = self.make_package()
+        linker = AttrDict(flavor='cc', builder=AttrDict(object_format='elf'))
+        with mock.patch('bfg9000.shell.execute',
+                        side_effect=mock_execute) as m:
+            self.assertEqual(pkg.link_options(linker), opts.option_list(
+                '-L/path/to/lib', '-pthread', opts.lib_literal('-lfoo'),
+                opts.lib_literal('-lbar'),
+                opts.rpath_dir(Path('/path/to/lib', Root.absolute))
+            ))
+            pkg.link_options(linker)
+            self.assertEqual(m.call_count, 2)
+
+    def test_link_options_static(self):
+        pkg = self.make_package(PackageKind.static)
+        linker = AttrDict(flavor='cc', builder=AttrDict(object_format='elf'))
+        with mock.patch('bfg9000.shell.execute',
+                        side_effect=mock_execute) as m:
+            self.assertEqual(pkg.link_options(linker), opts.option_list(
+                '-L/path/to/lib', '-pthread', opts.lib_literal('-lfoo'),
+                opts.lib_literal('-lbar')
+            ))
+            self.assertEqual(m.call_count, 1)
+
+    def test_link_options_msvc(self):
+        def execute(args, **kwargs):
+            return '/libpath:/path/to/lib -pthread foo.lib bar.lib\n'
+
+        pkg = self.make_package()
+        linker = AttrDict(flavor='msvc',
+                          builder=AttrDict(object_format='coff'))
+        with mock.patch('bfg9000.shell.execute', execute):
+            self.assertEqual(pkg.link_options(linker), opts.option_list(
+                '/libpath:/path/to/lib', '-pthread',
+                opts.lib_literal('foo.lib'), opts.lib_literal('bar.lib')
+            ))